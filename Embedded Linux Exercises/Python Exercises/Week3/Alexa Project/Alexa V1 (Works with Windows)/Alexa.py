@@ -10,11 +10,11 @@ from abc import ABC, abstractmethod  # For creating abstract base classes
 import pygame  # For audio playback
 import pyautogui  # For GUI automation
 import time  # For adding delays
+import queue  # For handing the recognized commands to the command worker
+import re  # For removing the wake word from the recognized commands
+import threading  # For executing commands while the next one is being recognized
 import requests
 import config
-import scapy.all as scapy
-from scapy.layers import http
-import pandas as pd
 from openpyxl import Workbook
 import tkinter as tk
 from tkinter import messagebox
@@ -24,6 +24,49 @@ from googletrans import Translator
 import psutil
 from PIL import ImageGrab
 import datetime
+from intent_matcher import WORD, IntentMatcher, intent  # Table-driven dispatch of the voice commands
+from audio_capture import ContinuousListener  # Always-open microphone with VAD segmentation
+from wake_word import WakeWordGate  # Offline wake word detection in front of the online recognizer
+from stt_backends import RecognitionFailed, SpeechNotUnderstood, create_backend  # Pluggable (online or offline) speech-to-text
+from tts_cache import TTSCache  # On-disk cache of the synthesized phrases
+from speech_queue import SpeechQueue  # Non-blocking, prioritized speech output
+try:
+    import comtypes  # COM of the SAPI5 voices used by pyttsx3 on Windows
+except ImportError:
+    comtypes = None
+from network_analysis import capture_traffic, analyze_packets, save_network_analyze_to_excel, analyze_traffic_streaming
+from report_writers import report_path  # Name of the report in the configured format
+
+
+
+
+
+
+
+
+# Constant prompts spoken by the assistant, Synthesized ahead of time so they play instantly
+STATIC_PROMPTS = [
+    "Hi Ali",
+    "I am Alexa",
+    "I hope I can help you today",
+    "Sorry, I didn't catch that.",
+    "Unknown command for me",
+    "I'm not sure how to handle that command.",
+    "Please enter the name of the file you want to read.",
+    "Please enter the name of the file you want to write to.",
+    "Please enter the content you want to write.",
+    "Please enter the name of the file you want to delete.",
+    "Please enter the name of the file you want to create.",
+    "Please enter the name of the file you want to parse.",
+    "Starting network analysis. This may take a few moments.",
+    "Prayer times retrieved successfully. Displaying them now.",
+    "Sorry, I couldn't retrieve the prayer times.",
+    "Finished searching",
+    "Calculator is opened",
+    "Calendar is opened",
+    "I will exit now",
+    "Goodbye Ali",
+]
 
 
 
@@ -38,6 +81,12 @@ class TextToSpeech(ABC):
     This class defines the interface for converting text to speech,
     allowing for different concrete implementations.
     """
+    def __init__(self):
+        """
+        Initialize the state shared by all engines.
+        """
+        self.speaking = threading.Event()  # Set while a phrase is played, So the microphone can ignore the assistant
+
     @abstractmethod
     def speak(self, text: str, lang: str = 'en'):
         """
@@ -48,6 +97,40 @@ class TextToSpeech(ABC):
 
         pass
 
+    def prepare(self, text: str, lang: str = 'en'):
+        """
+        Synthesize a phrase without playing it, So SpeechQueue can prepare the next phrase while one is playing.
+        Engines that synthesize while they play just return the text.
+
+        Returns:
+        The audio (or text) to give to play()
+        """
+        return text
+
+    def play(self, audio, lang: str = 'en'):
+        """
+        Play a phrase returned by prepare(), Blocking until it ends or stop() is called.
+        """
+        self.speak(audio, lang)
+
+    def stop(self):
+        """
+        Stop the phrase being played, Called from another thread.
+        """
+        pass
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait until everything was said, speak() already blocks so there is nothing to wait for.
+        """
+        return True
+
+    def interrupt(self):
+        """
+        Stop speaking (barge-in).
+        """
+        self.stop()
+
 
 class Pyttsx3TTS(TextToSpeech):
     """
@@ -55,16 +138,36 @@ class Pyttsx3TTS(TextToSpeech):
     This class provides a local, offline solution for text-to-speech
     conversion, which can be faster and more reliable in situations
     without internet connectivity.
+    pyttsx3 (and SAPI5/COM behind it) isn't thread-safe, So the engine is created by the thread that speaks first
+    (the SpeechQueue player thread with ASYNC_SPEECH) and is only ever used from that thread.
     """
     def __init__(self):
         """
-        Initialize the pyttsx3 engine with specific voice and speech settings.
+        Initialize the engine state, The pyttsx3 engine itself is created on first use.
+        """
+        super().__init__()
+        self.engine = None
+        self._stop_requested = threading.Event()  # Set by stop() from another thread, Acted on by the speaking thread
+
+    def _create_engine(self):
+        """
+        Initialize the pyttsx3 engine with specific voice and speech settings, In the calling thread.
         """
+        if comtypes is not None:
+            comtypes.CoInitialize()  # COM is initialized per thread
         self.engine = pyttsx3.init()  # Initialize pyttsx3 engine
         voices = self.engine.getProperty('voices')  # Get available voices
         self.engine.setProperty('voice', voices[2].id)  # Set voice (index 2)
         self.engine.setProperty('rate', 200)  # Set speech rate
         self.engine.setProperty('volume', 1.0)  # Set volume to maximum
+        self.engine.connect('started-word', self._on_word)  # Called inside runAndWait(), Where stopping is safe
+
+    def _on_word(self, name, location, length):
+        """
+        pyttsx3 callback before every word: stop the phrase if stop() was called.
+        """
+        if self._stop_requested.is_set():
+            self.engine.stop()
 
     def speak(self, text: str, lang: str = 'en'):
         """
@@ -72,8 +175,21 @@ class Pyttsx3TTS(TextToSpeech):
         This method queues the given text and immediately speaks it
         using the configured pyttsx3 engine.
         """
-        self.engine.say(text)  # Queue the text to be spoken
-        self.engine.runAndWait()  # Speak the queued text
+        if self.engine is None:
+            self._create_engine()
+        self._stop_requested.clear()
+        self.speaking.set()
+        try:
+            self.engine.say(text)  # Queue the text to be spoken
+            self.engine.runAndWait()  # Speak the queued text
+        finally:
+            self.speaking.clear()
+
+    def stop(self):
+        """
+        Stop the phrase being spoken, At its next word. Safe to call from any thread.
+        """
+        self._stop_requested.set()
 
 
 class GttsTTS(TextToSpeech):
@@ -81,21 +197,83 @@ class GttsTTS(TextToSpeech):
     Online text-to-speech implementation using Google Text-to-Speech.
     This class provides an internet-dependent solution for text-to-speech
     conversion, which can offer a wider range of voices and languages.
+    Every synthesized phrase is kept in an on-disk cache, So a repeated phrase plays instantly and without network access.
     """
+    def __init__(self, cache: TTSCache = None):
+        """
+        Initialize the engine.
+
+        Args:
+        cache (TTSCache): Cache of the synthesized phrases, Defaults to the cache configured in config.py
+        """
+        super().__init__()
+        self.cache = cache or TTSCache(config.TTS_CACHE_DIR, config.TTS_CACHE_MAX_MB * 1024 * 1024)
+        self.slow = False  # gTTS speaking speed, Part of the cache key
+
+    def prepare(self, text: str, lang: str = 'en') -> str:
+        """
+        Get the audio file of a phrase, Synthesizing it with gTTS only if it isn't cached yet.
+
+        Args:
+        text (str): The phrase
+        lang (str): Its language
+
+        Returns:
+        str: Path of the audio file
+        """
+        key = TTSCache.key(text, lang=lang, engine="gtts", slow=self.slow)
+        return self.cache.get_or_create(key, lambda path: gTTS(text=text, lang=lang, slow=self.slow).save(path))
+
+    def prewarm(self, phrases, lang: str = 'en'):
+        """
+        Synthesize phrases into the cache in a background thread, So they play instantly when they are first needed.
+
+        Args:
+        phrases (list): The phrases
+        lang (str): Their language
+
+        Returns:
+        threading.Thread: The background thread
+        """
+        def warm():
+            for phrase in phrases:
+                try:
+                    self.prepare(phrase, lang)
+                except Exception as e:  # No network: the phrase is synthesized when it is first spoken instead
+                    print(f"Could not pre-warm the speech cache: {e}")
+                    return
+
+        thread = threading.Thread(target=warm, name="tts-prewarm", daemon=True)
+        thread.start()
+        return thread
+
     def speak(self, text: str, lang: str = 'en'):
         """
         Convert text to speech using gTTS and play it.
-        This method creates an audio file, saves it temporarily,
-        plays it using pygame, and then removes the file.
+        This method gets the audio file from the cache (synthesizing and caching it on a miss)
+        and plays it using pygame.
+        """
+        self.play(self.prepare(text, lang))  # Cached audio file of the phrase
+
+    def play(self, audio: str, lang: str = 'en'):
+        """
+        Play an audio file using pygame, Until it ends or stop() is called.
         """
-        tts = gTTS(text=text, lang=lang, slow=False)  # Create gTTS object
-        audio = "output.mp3"  # Temporary audio file name
-        tts.save(audio)  # Save speech to audio file
-        pygame.mixer.music.load(audio)  # Load audio file
-        pygame.mixer.music.play()  # Play audio
-        while pygame.mixer.music.get_busy():  # Wait for audio to finish
-            pygame.time.Clock().tick(10)
-        os.remove(audio)  # Remove temporary audio file
+        self.speaking.set()
+        try:
+            pygame.mixer.music.load(audio)  # Load audio file
+            pygame.mixer.music.play()  # Play audio
+            while pygame.mixer.music.get_busy():  # Wait for audio to finish (or to be stopped)
+                pygame.time.Clock().tick(10)
+            pygame.mixer.music.unload()  # Release the file, So the cache can evict it
+        finally:
+            self.speaking.clear()
+
+    def stop(self):
+        """
+        Stop the audio being played.
+        """
+        pygame.mixer.music.stop()
 
 
 
@@ -107,36 +285,108 @@ class GttsTTS(TextToSpeech):
 class SpeechRecognizer:
     """
     Class for recognizing speech input.
-    This class utilizes the speech_recognition library to capture
-    and interpret voice commands from the user.
+    This class utilizes the speech_recognition library to capture voice commands from the user,
+    and the speech-to-text backend selected in config.STT_BACKEND to interpret them.
     """
     def __init__(self):
         """
         Initialize the speech recognizer.
         """
-        self.recognizer = sr.Recognizer()  # Initialize speech recognizer
+        self.recognizer = sr.Recognizer()  # Initialize speech recognizer (microphone capture and noise calibration)
+        self.backend = create_backend()  # Speech-to-text engine, e.g. Google Web Speech or offline Vosk
+        self.listener = None  # Continuous capture, Only used in streaming mode
+        self.gate = WakeWordGate.from_config()  # None when disabled or the wake word wasn't enrolled, Then everything is recognized
+        wake_words = WORD.findall(config.WAKE_WORD.lower())  # Whole words of config.WAKE_WORD, e.g. "hey alexa"
+        self.wake_word = re.compile(r"\b" + r"\W+".join(map(re.escape, wake_words)) + r"\b", re.IGNORECASE) if wake_words else None
 
     def catch_command(self):
         """
         Listen for a voice command and return the recognized text.
-        This method adjusts for ambient noise, listens for voice input,
+        This method opens the microphone, adjusts for ambient noise, listens for voice input,
         and uses Google Speech Recognition to interpret the command.
+        """
+        with sr.Microphone() as source:  # Use microphone as audio source
+            print("Listening...")
+            self.recognizer.adjust_for_ambient_noise(source)  # Adjust for ambient noise
+            voice = self.recognizer.listen(source)  # Listen for voice input
+        voice = self._gate(voice)
+        return self._recognize(voice) if voice is not None else None
+
+    def start_streaming(self, speaking=None):
+        """
+        Open the microphone once and keep capturing in the background.
+        The noise calibration runs once here, and every utterance cut by the VAD is queued for next_command().
+
+        Args:
+        speaking (threading.Event): Set while the assistant is talking, The microphone ignores it meanwhile
+        """
+        self.listener = ContinuousListener(speaking=speaking)
+        self.listener.start()
+        print("Listening...")
+
+    def stop_streaming(self):
+        """
+        Stop the background capture and close the microphone.
+        """
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def next_command(self, timeout=None):
+        """
+        Recognize the next utterance captured in streaming mode.
+
+        Args:
+        timeout (float): Seconds to wait for an utterance, None waits forever
+
+        Returns:
+        str: The recognized command, or None if nothing was said in time or it didn't start with the wake word
+        """
+        voice = self.listener.get(timeout)
+        if voice is not None:
+            voice = self._gate(voice)
+        return self._recognize(voice) if voice is not None else None
+
+    def _gate(self, voice):
+        """
+        Pass an utterance through the offline wake word gate, Before any network round-trip.
+
+        Args:
+        voice (sr.AudioData): The captured audio
+
+        Returns:
+        sr.AudioData: The audio following the wake word, or None if nothing has to be recognized
+        """
+        if self.gate is None:
+            return voice
+        audio = self.gate.process(voice.frame_data, voice.sample_rate)
+        if audio is None:
+            if self.gate.is_open:
+                print("Wake word heard, Listening for the command...")
+            return None
+        return sr.AudioData(audio, voice.sample_rate, voice.sample_width)
+
+    def _recognize(self, voice):
+        """
+        Convert captured audio to a command with the speech-to-text backend.
         It also handles potential errors during the recognition process.
+
+        Args:
+        voice (sr.AudioData): The captured audio
+
+        Returns:
+        str: The recognized command, "UNKNOWN_COMMAND" if the speech wasn't understood
         """
         command = ""
         try:
-            with sr.Microphone() as source:  # Use microphone as audio source
-                print("Listening...")
-                self.recognizer.adjust_for_ambient_noise(source)  # Adjust for ambient noise
-                voice = self.recognizer.listen(source)  # Listen for voice input
-                command = self.recognizer.recognize_google(voice).lower()  # Recognize speech using Google Speech Recognition
-                if "alexa" in command:
-                    command = command.replace('alexa', '').strip()  # Remove 'alexa' from command
-                print(f"Recognized command: {command}")
-        except sr.UnknownValueError:
+            command = self.backend.transcribe(voice.frame_data, voice.sample_rate, voice.sample_width)  # Recognize speech with the configured backend
+            if self.wake_word is not None:
+                command = " ".join(self.wake_word.sub(" ", command).split())  # Remove the wake word, Not the words containing it
+            print(f"Recognized command: {command}")
+        except SpeechNotUnderstood:
             print("Recognized command: UNKNOWN_COMMAND")
             return "UNKNOWN_COMMAND"
-        except sr.RequestError as e:
+        except RecognitionFailed as e:
             print(f"Speech recognition request failed: {e}")
         return command
 
@@ -224,179 +474,6 @@ def get_weather(city):
 
 
 
-def capture_traffic(duration):
-    """
-    Capture network traffic for a specified duration.
-    This function uses scapy to sniff network packets for the given time period.
-    
-    Args:
-    duration (int): Duration in seconds for which to capture traffic
-    
-    Returns:
-    list: Captured network packets
-    """
-    packets = scapy.sniff(timeout=duration)
-    return packets
-
-
-def analyze_packets(packets):
-    """
-    Analyze captured network packets.
-    This function processes the captured packets, extracting relevant information
-    such as timestamp, source/destination IP, protocol, and packet details.
-    It handles various protocols including TCP, UDP, ICMP, ARP, and HTTP.
-    
-    Args:
-    packets (list): List of captured network packets
-    
-    Returns:
-    list: Analyzed packet data in a structured format
-    """
-    
-    # Initialize an empty list to store the analyzed packet data.
-    data = []
-
-    # Set the start_time to the timestamp of the first packet, or 0 if the packets list is empty.
-    start_time = packets[0].time if packets else 0
-
-    # Iterate over each packet in the packets list, with the index starting from 1.
-    for i, pkt in enumerate(packets, start=1):
-        
-        # Calculate the relative timestamp of the packet by subtracting the start_time.
-        timestamp = f"{pkt.time - start_time:.6f}"
-
-        # Extract the source IP address if the packet contains an IP layer; otherwise, use the default src attribute.
-        src_ip = pkt[scapy.IP].src if scapy.IP in pkt else pkt.src
-
-        # Extract the destination IP address if the packet contains an IP layer; otherwise, use the default dst attribute.
-        dst_ip = pkt[scapy.IP].dst if scapy.IP in pkt else pkt.dst
-
-        # Initialize the protocol as "Unknown" for packets that do not match known protocols.
-        protocol = "Unknown"
-
-        # Determine the length of the packet.
-        length = len(pkt)
-
-        # Initialize an empty string to store additional packet information.
-        info = ""
-
-        # Check if the packet contains a TCP layer.
-        if scapy.TCP in pkt:
-            protocol = "TCP"  # Set the protocol to TCP.
-
-            # Extract source and destination ports, TCP flags, sequence number, acknowledgment number, and window size.
-            sport, dport = pkt[scapy.TCP].sport, pkt[scapy.TCP].dport
-            flags = pkt[scapy.TCP].flags
-            seq, ack = pkt[scapy.TCP].seq, pkt[scapy.TCP].ack
-            win = pkt[scapy.TCP].window
-
-            # Construct the info string with TCP-specific details.
-            info = f"{sport} → {dport} [{flags}] Seq={seq} Ack={ack} Win={win} Len={length}"
-
-            # Check if the ports match known MQTT ports (1883 or 8883).
-            if sport == 1883 or dport == 1883 or sport == 8883 or dport == 8883:
-                protocol = "MQTT"  # Set the protocol to MQTT.
-
-                # Check if the TCP payload is not empty.
-                if bytes(pkt[scapy.TCP].payload):
-                    mqtt_type = bytes(pkt[scapy.TCP].payload)[0] >> 4  # Extract MQTT message type.
-
-                    # Dictionary mapping MQTT types to their names.
-                    mqtt_types = {1: "CONNECT", 3: "PUBLISH", 4: "PUBACK", 8: "SUBSCRIBE", 13: "PINGREQ"}
-
-                    # Append MQTT-specific information to the info string.
-                    info = f"{mqtt_types.get(mqtt_type, 'Unknown')} {info}"
-
-        # Check if the packet contains a UDP layer.
-        elif scapy.UDP in pkt:
-            protocol = "UDP"  # Set the protocol to UDP.
-
-            # Extract source and destination ports.
-            sport, dport = pkt[scapy.UDP].sport, pkt[scapy.UDP].dport
-
-            # Construct the info string with UDP-specific details.
-            info = f"{sport} → {dport} Len={length}"
-
-            # Check if the ports match the DNS port (53).
-            if sport == 53 or dport == 53:
-                protocol = "DNS"  # Set the protocol to DNS.
-
-                # Check if the packet contains a DNS layer.
-                if scapy.DNS in pkt:
-                    # Determine if the packet is a DNS query or response.
-                    qr = "Response" if pkt[scapy.DNS].qr else "Query"
-
-                    # Extract the queried domain name.
-                    if pkt[scapy.DNS].qd:
-                        qname = pkt[scapy.DNS].qd.qname.decode()
-
-                        # Append DNS-specific information to the info string.
-                        info = f"{qr} {qname}"
-
-        # Check if the packet contains an ICMP layer.
-        elif scapy.ICMP in pkt:
-            protocol = "ICMP"  # Set the protocol to ICMP.
-
-            # Extract the ICMP type and code.
-            icmp_type = pkt[scapy.ICMP].type
-            icmp_code = pkt[scapy.ICMP].code
-
-            # Construct the info string with ICMP-specific details.
-            info = f"Type={icmp_type} Code={icmp_code}"
-
-        # Check if the packet contains an ARP layer.
-        elif scapy.ARP in pkt:
-            protocol = "ARP"  # Set the protocol to ARP.
-
-            # Determine if the ARP packet is a request or reply.
-            op = "Request" if pkt[scapy.ARP].op == 1 else "Reply"
-
-            # Extract source and destination MAC addresses.
-            src_mac = pkt[scapy.ARP].hwsrc
-            dst_mac = pkt[scapy.ARP].hwdst
-
-            # Construct the info string with ARP-specific details.
-            info = f"{op} {src_mac} → {dst_mac}"
-
-        # Check if the packet contains an HTTP layer.
-        elif http.HTTP in pkt:
-            protocol = "HTTP"  # Set the protocol to HTTP.
-
-            # Check if the packet is an HTTP request and extract the method and path.
-            if pkt[http.HTTP].Method:
-                info = f"{pkt[http.HTTP].Method} {pkt[http.HTTP].Path}"
-
-            # Check if the packet is an HTTP response and extract the status code.
-            elif pkt[http.HTTP].Status_Code:
-                info = f"Status: {pkt[http.HTTP].Status_Code}"
-
-        # Append the analyzed packet data as a list to the data list.
-        data.append([i, timestamp, src_ip, dst_ip, protocol, length, info])
-
-    # Return the list containing the analyzed packet data.
-    return data
-
-
-def save_network_analyze_to_excel(data, filename):
-    """
-    Save analyzed network data to an Excel file.
-    This function takes the structured network analysis data and saves it
-    to an Excel file for easy viewing and further analysis.
-    
-    Args:
-    data (list): Analyzed network data
-    filename (str): Name of the Excel file to save
-    """
-    df = pd.DataFrame(data, columns=["No.", "Time", "Source", "Destination", "Protocol", "Length", "Info"])
-    df.to_excel(filename, index=False, engine='openpyxl')
-
-
-
-
-
-
-
-
 def get_prayer_times(city, country, method=5):
     """
     Retrieve prayer times for a specified city and country.
@@ -453,142 +530,86 @@ class CommandExecutor:
     voice commands, including file operations, web searches, system commands,
     and custom actions like weather retrieval and FOTA operations.
     """
+    # FOTA phrase -> (action name, key of the button image in config.IMAGE_PATHS)
+    FOTA_ACTIONS = {
+        "get version": ("get version", "get_version"),
+        "select first application": ("select first application", "select_app1"),
+        "select second application": ("select second application", "select_app2"),
+        "erase memory": ("erase memory", "erase_memory"),
+        "jump to app": ("jump to application", "jump_to_app"),
+        "jump to application": ("jump to application", "jump_to_app"),
+        "jump to bootloader": ("jump to bootloader", "jump_to_bootloader"),
+        "write to memory": ("write to memory", "upload_code"),
+        "select ecu master": ("select ecu master", "select_ecu_master"),
+        "select ecu slave": ("select ecu slave", "select_ecu_slave"),
+    }
+
     def __init__(self, tts: TextToSpeech):
         """
         Initialize the CommandExecutor with a text-to-speech engine.
         """
         self.tts = tts  # Text-to-speech engine
+        self.intents = IntentMatcher.from_handlers(self)  # Every @intent method of this class, Compiled into one matcher
 
     def execute(self, command: str):
         """
         Execute the given voice command.
-        This method interprets the voice command and calls the appropriate
-        method to handle the requested action.
+        The command is matched against the @intent phrases of this class in a single scan,
+        and the handler of the most specific phrase is called with the match.
         """
         if command == "UNKNOWN_COMMAND":
             self.tts.speak("Sorry, I didn't catch that.")
             return
 
-        # Check for various commands and call appropriate methods
-        if "get weather of" in command:
-            self._get_weather(command)
-        elif "read file" in command:
-            self._read_file()
-        elif "write file" in command:
-            self._write_file()
-        elif "delete file" in command:
-            self._delete_file()
-        elif "create file" in command:
-            self._create_file()
-        elif "parsing file" in command:
-            self._parse_file()
-        elif "prayer" in command:
-            self._get_azan_times()   
-        elif "network" in command:
-            self._analyze_network()                      
-        elif "get version" in command:
-            self._perform_fota_action("get version")           
-        elif "select first application" in command:
-            self._perform_fota_action("select first application")
-        elif "select second application" in command:
-            self._perform_fota_action("select second application")
-        elif "erase memory" in command:
-            self._perform_fota_action("erase memory")
-        elif "jump to app" in command:
-            self._perform_fota_action("jump to application")
-        elif "jump to bootloader" in command:
-            self._perform_fota_action("jump to bootloader")
-        elif "write to memory" in command:
-            self._perform_fota_action("write to memory")
-        elif "select ecu master" in command:
-            self._perform_fota_action("select ecu master")
-        elif "select ecu slave" in command:
-            self._perform_fota_action("select ecu slave")
-        elif "play" in command:
-            self._play_song(command)
-        elif "time" in command:
-            self._tell_time()
-        elif "date" in command:
-            self._tell_date()
-        elif "search about" in command:
-            self._search_web(command)
-        elif "open calculator" in command:
-            self._open_calculator()
-        elif "open calendar" in command:
-            self._open_calendar()
-        elif "exit" in command:
-            self._exit()
-        elif "translate" in command:
-            text_to_translate = command.replace("translate", "").strip()
-            translated_text = self._translate_text(text_to_translate)
-            self.tts.speak(f"The translation is: {translated_text}")
-        elif "speak about" in command:
-            topic = command.replace("speak about", "").strip()
-            info = self._get_wikipedia_paragraph(topic)
-            self.tts.speak(info)
-        elif "take screenshot" in command:
-            screenshot_file = self._take_screenshot()
-            self.tts.speak(f"Screenshot saved as {screenshot_file}")
-        elif "battery" in command:
-            battery_status = self._get_battery_status()
-            self.tts.speak(battery_status)            
-        else:
+        if not self.intents.dispatch(command):
             self.tts.speak("Unknown command for me")
             self.tts.speak("I'm not sure how to handle that command.")
 
-    def _perform_fota_action(self, action):
+    @intent(*FOTA_ACTIONS)
+    def _perform_fota_action(self, match):
         """Perform FOTA (Firmware Over The Air) related actions."""
+        action, image_key = self.FOTA_ACTIONS[match.phrase]
         url = config.FOTA_URL
         webbrowser.open_new_tab(url)  # Open FOTA web interface
         time.sleep(2)  # Wait for the page to load
 
         pyautogui.scroll(-650)  # Scroll down
-
-        # Perform specific action based on the command
         if action == "get version":
-            pyautogui.scroll(650)  # Scroll up          
-            locate("GetVersion.png", x_shift=20, y_shift=20, is_clicked=True)
-        elif action == "select first application":
-            locate("SelectApp1.png", x_shift=20, y_shift=20, is_clicked=True)
-        elif action == "select second application":
-            locate("SelectApp2.png", x_shift=20, y_shift=20, is_clicked=True)
-        elif action == "erase memory":
-            locate("EraseMemory.png", x_shift=20, y_shift=20, is_clicked=True)
-        elif action == "jump to application":
-            locate("JumpToApp.png", x_shift=20, y_shift=20, is_clicked=True)
-        elif action == "jump to bootloader":
-            locate("JumpToBootloader.png", x_shift=20, y_shift=20, is_clicked=True)
-        elif action == "write to memory":
-            locate("UploadCode.png", x_shift=20, y_shift=20, is_clicked=True)
-        elif action == "select ecu master":
-            locate("Select_ECU_Master.png", x_shift=20, y_shift=20, is_clicked=True)
-        elif action == "select ecu slave":
-            locate("Select_ECU_Slave.png", x_shift=20, y_shift=20, is_clicked=True)
+            pyautogui.scroll(650)  # Scroll up, The Get Version button is at the top of the page
+        locate(config.IMAGE_PATHS[image_key], x_shift=20, y_shift=20, is_clicked=True)  # Click the button of the action
 
         self.tts.speak(f"Performed {action} action")
 
-    def _play_song(self, command):
+    @intent("play")
+    def _play_song(self, match):
         """Play a song on YouTube."""
-        song = command.replace('play', '').strip()  # Extract song name from command
+        song = match.argument  # Song name after 'play'
         self.tts.speak(f"Playing {song}")
         pywhatkit.playonyt(song)  # Play song on YouTube
 
-    def _analyze_network(self):
+    @intent("network")
+    def _analyze_network(self, match):
         self.tts.speak("Starting network analysis. This may take a few moments.")
         duration = config.NETWORK_ANALYSIS_DURATION
-        print(f"Capturing network traffic for {duration} seconds...")
-        packets = capture_traffic(duration)
+        filename = report_path(config.NETWORK_ANALYSIS_FILE)  # Extension of config.NETWORK_REPORT_FORMAT
+        if config.NETWORK_STREAMING:
+            print(f"Capturing and analyzing network traffic for {duration} seconds...")
+            analyze_traffic_streaming(duration, filename)  # Rows are written while capturing, Memory stays flat
+        else:
+            print(f"Capturing network traffic for {duration} seconds...")
+            packets = capture_traffic(duration)
 
-        print("Analyzing packets...")
-        data = analyze_packets(packets)
+            print("Analyzing packets...")
+            data = analyze_packets(packets)
 
-        filename = "network_analysis.xlsx"
-        print(f"Saving analysis to {filename}...")
-        save_network_analyze_to_excel(data, filename)
+            print(f"Saving analysis to {filename}...")
+            save_network_analyze_to_excel(data, filename)
 
         self.tts.speak(f"Network analysis complete. Results saved to {filename}")
         print("Analysis complete!")
-    def _read_file(self):
+
+    @intent("read file")
+    def _read_file(self, match):
         self.tts.speak("Please enter the name of the file you want to read.")
         file_name = input("Enter file name: ")
         content = read_file(file_name)
@@ -598,7 +619,8 @@ class CommandExecutor:
         else:
             self.tts.speak(f"Unable to read {file_name}")
 
-    def _write_file(self):
+    @intent("write file")
+    def _write_file(self, match):
         self.tts.speak("Please enter the name of the file you want to write to.")
         file_name = input("Enter file name: ")
         self.tts.speak("Please enter the content you want to write.")
@@ -606,13 +628,15 @@ class CommandExecutor:
         write_to_file(file_name, content)
         self.tts.speak(f"Content has been written to {file_name}")
 
-    def _delete_file(self):
+    @intent("delete file")
+    def _delete_file(self, match):
         self.tts.speak("Please enter the name of the file you want to delete.")
         file_name = input("Enter file name: ")
         delete_file(file_name)
         self.tts.speak(f"{file_name} has been deleted")
 
-    def _create_file(self):
+    @intent("create file")
+    def _create_file(self, match):
         self.tts.speak("Please enter the name of the file you want to create.")
         file_name = input("Enter file name: ")
         created_file = create_file(file_name)
@@ -621,7 +645,8 @@ class CommandExecutor:
         else:
             self.tts.speak(f"Unable to create {file_name}")
 
-    def _parse_file(self):
+    @intent("parsing file", "parse file")
+    def _parse_file(self, match):
         self.tts.speak("Please enter the name of the file you want to parse.")
         file_name = input("Enter file name: ")
         functions = parse_c_functions(file_name)
@@ -632,6 +657,26 @@ class CommandExecutor:
         else:
             self.tts.speak(f"Unable to parse {file_name}")
 
+    @intent("translate")
+    def _translate(self, match):
+        translated_text = self._translate_text(match.argument)  # Text after 'translate'
+        self.tts.speak(f"The translation is: {translated_text}")
+
+    @intent("speak about")
+    def _speak_about(self, match):
+        info = self._get_wikipedia_paragraph(match.argument)  # Topic after 'speak about'
+        self.tts.speak(info)
+
+    @intent("take screenshot")
+    def _screenshot(self, match):
+        screenshot_file = self._take_screenshot()
+        self.tts.speak(f"Screenshot saved as {screenshot_file}")
+
+    @intent("battery")
+    def _battery(self, match):
+        battery_status = self._get_battery_status()
+        self.tts.speak(battery_status)
+
     def _translate_text(self, text):
         translator = Translator()
         translation = translator.translate(text, src=config.TRANSLATE_FROM, dest=config.TRANSLATE_TO)
@@ -664,12 +709,14 @@ class CommandExecutor:
         screenshot.save(filepath)
         return filepath
 
-    def _tell_time(self):
+    @intent("time")
+    def _tell_time(self, match):
         """Tell the current time."""
         current_time = datetime.datetime.now().strftime('%I:%M %p')
         self.tts.speak(f"Current time is {current_time}")
 
-    def _get_azan_times(self):
+    @intent("prayer", "prayers", "azan")
+    def _get_azan_times(self, match):
         self.tts.speak(f"Getting prayer times for {config.AZAN_CITY}, {config.AZAN_COUNTRY}")
         prayer_times = get_prayer_times(config.AZAN_CITY, config.AZAN_COUNTRY)
         
@@ -679,36 +726,43 @@ class CommandExecutor:
         else:
             self.tts.speak("Sorry, I couldn't retrieve the prayer times.")        
 
-    def _tell_date(self):
+    @intent("date")
+    def _tell_date(self, match):
         """Tell the current date."""
         today_date = datetime.datetime.now().date().strftime("%Y-%m-%d")
         self.tts.speak(f"Today's date is {today_date}")
 
-    def _search_web(self, command):
+    @intent("search about")
+    def _search_web(self, match):
         """Perform a web search."""
-        query = command.replace("search about", "").strip()  # Extract search query
+        query = match.argument  # Search query after 'search about'
         url = f"https://www.google.com/search?q={query}"
         webbrowser.open(url)  # Open search results in browser
         self.tts.speak("Finished searching")
 
-    def _open_calculator(self):
+    @intent("open calculator")
+    def _open_calculator(self, match):
         """Open the calculator application."""
         subprocess.run("start calculator:", shell=True)
         self.tts.speak("Calculator is opened")
 
-    def _open_calendar(self):
+    @intent("open calendar")
+    def _open_calendar(self, match):
         """Open the calendar application."""
         subprocess.run("start outlookcal:", shell=True)
         self.tts.speak("Calendar is opened")
 
-    def _exit(self):
+    @intent("exit")
+    def _exit(self, match):
         """Exit the application."""
         self.tts.speak("I will exit now")
         self.tts.speak("Goodbye Ali")
+        self.tts.flush()  # Speech is asynchronous, Let it end before exiting
         exit()
 
-    def _get_weather(self, command):
-        city = command.replace("get weather of", "").strip()
+    @intent("get weather of")
+    def _get_weather(self, match):
+        city = match.argument  # City after 'get weather of'
         weather_data = get_weather(city)
         if weather_data:
             weather_message = (
@@ -760,9 +814,54 @@ class Alexa:
         This method keeps the assistant running, constantly listening for
         voice commands and executing them until the program is terminated.
         """
+        if config.STREAMING_CAPTURE:
+            self._run_streaming()
+            return
         while True:
+            self.tts.flush()  # Don't let the microphone hear the assistant's own answer
             command = self.recognizer.catch_command()
-            self.executor.execute(command)
+            if command is not None:  # None: no wake word, Nothing to execute
+                self.executor.execute(command)
+
+    def _run_streaming(self):
+        """
+        Main loop in streaming mode.
+        The microphone stays open and this thread recognizes the utterances, while a worker thread executes the
+        commands in order, So the next command is heard and recognized while the previous one is still running.
+        """
+        commands = queue.Queue()
+        stopped = threading.Event()
+        worker = threading.Thread(target=self._execute_commands, args=(commands, stopped), name="command-worker", daemon=True)
+        worker.start()
+        self.tts.flush()  # Let the greeting end first, So the noise calibration doesn't measure the assistant's voice
+        self.recognizer.start_streaming(self.tts.speaking if config.ECHO_SUPPRESSION else None)
+        try:
+            while not stopped.is_set():
+                command = self.recognizer.next_command(timeout=0.5)  # Wake up regularly to notice the exit command
+                if command is not None:
+                    if config.SPEECH_BARGE_IN and command != "UNKNOWN_COMMAND":
+                        self.tts.interrupt()  # The user talked over the assistant, Stop the previous answer
+                    commands.put(command)
+        finally:
+            self.recognizer.stop_streaming()
+
+    def _execute_commands(self, commands, stopped):
+        """
+        Body of the command worker: execute the queued commands one at a time.
+
+        Args:
+        commands (queue.Queue): Recognized commands, in order
+        stopped (threading.Event): Set when the exit command was executed
+        """
+        while True:
+            command = commands.get()
+            try:
+                self.executor.execute(command)
+            except SystemExit:  # exit() only ends this thread, So tell the main loop to stop
+                stopped.set()
+                return
+            except Exception as e:  # A failing command must not stop the assistant
+                print(f"Command '{command}' failed: {e}")
 
 
 
@@ -780,6 +879,10 @@ def main():
     pygame.mixer.init() # Initialize pygame mixer for audio playback
     use_pyttsx3 = True  # When on Windows, it is preferred to make this True. In Linux, make this False
     tts = Pyttsx3TTS() if use_pyttsx3 else GttsTTS()  # Choose TTS engine based on platform
+    if isinstance(tts, GttsTTS) and config.TTS_PREWARM:
+        tts.prewarm(STATIC_PROMPTS)  # Synthesize the constant prompts in the background while we start up
+    if config.ASYNC_SPEECH:
+        tts = SpeechQueue(tts, lookahead=config.SPEECH_LOOKAHEAD)  # speak() returns at once, Commands don't wait for the speech
     recognizer = SpeechRecognizer()
     executor = CommandExecutor(tts)
     alexa = Alexa(tts, recognizer, executor)
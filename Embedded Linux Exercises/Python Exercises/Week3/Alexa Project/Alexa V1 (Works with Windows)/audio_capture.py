@@ -0,0 +1,354 @@
+import math  # For the RMS energy of the audio frames
+import operator  # For a fast sum of squares
+import queue  # For handing the segmented utterances to the recognizer
+import threading  # For the background capture thread
+from array import array  # For reading 16-bit PCM samples without copying them one by one
+from typing import Optional  # For type hints
+
+import config
+
+try:
+    import speech_recognition as sr  # Microphone access and the AudioData container
+except ImportError:
+    sr = None  # The pure-Python parts (VAD, segmenter) still work, e.g. on WAV files
+
+
+
+
+
+
+
+
+class AudioRingBuffer:
+    """
+    Fixed-size ring buffer of raw audio bytes.
+    Every write gets an absolute position (the total number of bytes written so far), So a span of audio can be read
+    back later by position as long as it wasn't overwritten yet.
+    """
+    def __init__(self, capacity: int):
+        """
+        Initialize the buffer.
+
+        Args:
+        capacity (int): Size of the buffer in bytes
+        """
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self.position = 0  # Absolute position of the next byte to be written
+
+    @property
+    def oldest(self) -> int:
+        """
+        Absolute position of the oldest byte still in the buffer.
+        """
+        return max(0, self.position - self.capacity)
+
+    def write(self, data: bytes) -> int:
+        """
+        Append audio to the buffer, Overwriting the oldest audio when it is full.
+
+        Args:
+        data (bytes): The audio
+
+        Returns:
+        int: Absolute position just after the written audio
+        """
+        data = memoryview(data)[-self.capacity:]  # Only the newest part of an oversized write can be kept
+        offset = self.position % self.capacity
+        first = min(len(data), self.capacity - offset)
+        self._buffer[offset:offset + first] = data[:first]
+        self._buffer[:len(data) - first] = data[first:]  # Wrap around
+        self.position += len(data)
+        return self.position
+
+    def read(self, start: int, end: int) -> bytes:
+        """
+        Read the audio between two absolute positions.
+
+        Args:
+        start (int): Absolute start position
+        end (int): Absolute end position
+
+        Returns:
+        bytes: The audio
+        """
+        if start < self.oldest or end > self.position or start > end:
+            raise ValueError(f"Audio {start}-{end} is not in the buffer (it holds {self.oldest}-{self.position})")
+        first, last = start % self.capacity, end % self.capacity
+        if end - start == 0:
+            return b''
+        if first < last:
+            return bytes(self._buffer[first:last])
+        return bytes(self._buffer[first:]) + bytes(self._buffer[:last])  # The span wraps around
+
+
+
+
+
+
+
+
+class EnergyVAD:
+    """
+    Voice activity detector based on the frame energy.
+    The noise floor is calibrated once on the first frames, and then follows the background noise slowly during
+    silence, So the microphone never has to stop for adjust_for_ambient_noise again.
+    """
+    def __init__(self, sample_width: int = 2, calibration_frames: int = 15, ratio: float = 3.0,
+                 min_energy: float = 100.0, adaptation: float = 0.05):
+        """
+        Initialize the detector.
+
+        Args:
+        sample_width (int): Bytes per sample, Only 16-bit PCM is supported
+        calibration_frames (int): Number of frames used for the initial noise floor
+        ratio (float): A frame is speech when its energy is this many times the noise floor
+        min_energy (float): Lowest speech threshold, For very quiet rooms
+        adaptation (float): Weight of a silent frame in the moving noise floor
+        """
+        if sample_width != 2:
+            raise ValueError("EnergyVAD only supports 16-bit audio")
+        self.calibration_frames = calibration_frames
+        self.ratio = ratio
+        self.min_energy = min_energy
+        self.adaptation = adaptation
+        self.noise_floor = 0.0
+        self._calibrated = 0  # Number of frames used for the calibration so far
+
+    @staticmethod
+    def energy(frame: bytes) -> float:
+        """
+        Compute the RMS energy of a frame.
+
+        Args:
+        frame (bytes): 16-bit little-endian PCM audio
+
+        Returns:
+        float: The RMS energy
+        """
+        samples = array('h')
+        samples.frombytes(frame[:len(frame) - len(frame) % 2])
+        if not samples:
+            return 0.0
+        return math.sqrt(sum(map(operator.mul, samples, samples)) / len(samples))
+
+    @property
+    def threshold(self) -> float:
+        """
+        Energy above which a frame is speech.
+        """
+        return max(self.noise_floor * self.ratio, self.min_energy)
+
+    def is_speech(self, frame: bytes) -> bool:
+        """
+        Classify a frame and update the noise floor.
+
+        Args:
+        frame (bytes): 16-bit PCM audio
+
+        Returns:
+        bool: True if the frame contains speech
+        """
+        energy = self.energy(frame)
+        if self._calibrated < self.calibration_frames:  # Calibration: the first frames are assumed to be background noise
+            self._calibrated += 1
+            self.noise_floor += (energy - self.noise_floor) / self._calibrated  # Running mean
+            return False
+        if energy > self.threshold:
+            return True
+        self.noise_floor += (energy - self.noise_floor) * self.adaptation  # Follow the background noise
+        return False
+
+
+
+
+
+
+
+
+class UtteranceSegmenter:
+    """
+    Cut a continuous stream of frames into utterances with a VAD.
+    The audio is kept in a ring buffer, So an utterance starts a little before the VAD triggered (pre-roll) and its
+    first syllable isn't lost.
+    """
+    def __init__(self, vad: EnergyVAD, frame_bytes: int, bytes_per_second: int, start_seconds: float = 0.09,
+                 end_seconds: float = 0.8, pre_roll_seconds: float = 0.3, max_seconds: float = 10.0):
+        """
+        Initialize the segmenter.
+
+        Args:
+        vad (EnergyVAD): Voice activity detector
+        frame_bytes (int): Size of one frame in bytes
+        bytes_per_second (int): Audio bytes per second (sample rate * sample width)
+        start_seconds (float): Speech needed to start an utterance, Shorter clicks are ignored
+        end_seconds (float): Silence that ends an utterance
+        pre_roll_seconds (float): Audio kept before the start of an utterance
+        max_seconds (float): Longest utterance, Longer speech is cut
+        """
+        self.vad = vad
+        self.frame_bytes = frame_bytes
+        self.start_frames = max(1, round(start_seconds * bytes_per_second / frame_bytes))
+        self.end_frames = max(1, round(end_seconds * bytes_per_second / frame_bytes))
+        self.pre_roll_bytes = int(pre_roll_seconds * bytes_per_second) // frame_bytes * frame_bytes
+        self.max_bytes = int(max_seconds * bytes_per_second)
+        self.ring = AudioRingBuffer(self.max_bytes + self.pre_roll_bytes + frame_bytes * (self.start_frames + 1))  # Always holds a whole utterance
+        self._speech_run = 0  # Consecutive speech frames before an utterance starts
+        self._silence_run = 0  # Consecutive silent frames inside an utterance
+        self._start: Optional[int] = None  # Absolute ring position of the current utterance, None between utterances
+
+    def reset(self):
+        """
+        Abandon the utterance being recorded, e.g. when the assistant starts talking over it.
+        """
+        self._start = None
+        self._speech_run = 0
+        self._silence_run = 0
+
+    @property
+    def in_utterance(self) -> bool:
+        """
+        True while an utterance is being recorded.
+        """
+        return self._start is not None
+
+    def feed(self, frame: bytes) -> Optional[bytes]:
+        """
+        Process one frame of audio.
+
+        Args:
+        frame (bytes): The frame
+
+        Returns:
+        bytes: The audio of an utterance when this frame ended one, otherwise None
+        """
+        end = self.ring.write(frame)
+        speech = self.vad.is_speech(frame)
+        if self._start is None:
+            self._speech_run = self._speech_run + 1 if speech else 0
+            if self._speech_run >= self.start_frames:
+                self._start = max(end - self._speech_run * len(frame) - self.pre_roll_bytes, self.ring.oldest)
+                self._silence_run = 0
+            return None
+        self._silence_run = 0 if speech else self._silence_run + 1
+        if self._silence_run >= self.end_frames or end - self._start >= self.max_bytes:
+            audio = self.ring.read(self._start, end)
+            self._start = None
+            self._speech_run = 0
+            return audio
+        return None
+
+
+
+
+
+
+
+
+class ContinuousListener:
+    """
+    Keep the microphone open in a background thread and queue every utterance it hears.
+    The noise calibration happens once when the stream opens, instead of before every command.
+    While the assistant is talking (speaking is set) the frames are dropped, So it doesn't hear and answer its own voice.
+    """
+    def __init__(self, sample_rate: int = None, frame_ms: int = None, max_queued: int = None,
+                 speaking: threading.Event = None):
+        """
+        Initialize the listener, The microphone is only opened by start().
+
+        Args:
+        sample_rate (int): Sample rate of the capture, Defaults to config.AUDIO_SAMPLE_RATE
+        frame_ms (int): Length of one frame in milliseconds, Defaults to config.AUDIO_FRAME_MS
+        max_queued (int): Utterances kept while the recognizer is busy, Defaults to config.MAX_QUEUED_UTTERANCES
+        speaking (threading.Event): Set while the assistant is talking, None to always listen (e.g. with a headset)
+        """
+        if sr is None:
+            raise RuntimeError("The SpeechRecognition package is needed for microphone capture")
+        self.sample_rate = sample_rate or config.AUDIO_SAMPLE_RATE
+        self.frame_samples = self.sample_rate * (frame_ms or config.AUDIO_FRAME_MS) // 1000
+        self.sample_width = 2  # 16-bit PCM
+        self.utterances = queue.Queue(maxsize=max_queued or config.MAX_QUEUED_UTTERANCES)
+        self._stop = threading.Event()
+        self._thread = None
+        self.speaking = speaking
+        self.dropped = 0  # Utterances dropped because the queue was full
+
+    def start(self):
+        """
+        Open the microphone and start capturing in a background thread.
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._capture, name="audio-capture", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop capturing and close the microphone.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def get(self, timeout: float = None):
+        """
+        Wait for the next utterance.
+
+        Args:
+        timeout (float): Seconds to wait, None waits forever
+
+        Returns:
+        sr.AudioData: The utterance, or None if none came in time
+        """
+        try:
+            return self.utterances.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _capture(self):
+        """
+        Body of the capture thread: read frames, segment them and queue the utterances.
+        """
+        frame_bytes = self.frame_samples * self.sample_width
+        segmenter = UtteranceSegmenter(
+            EnergyVAD(self.sample_width, calibration_frames=max(1, int(config.VAD_CALIBRATION_SECONDS * self.sample_rate / self.frame_samples)),
+                      ratio=config.VAD_ENERGY_RATIO),
+            frame_bytes, self.sample_rate * self.sample_width,
+            end_seconds=config.VAD_END_SILENCE_SECONDS, pre_roll_seconds=config.VAD_PRE_ROLL_SECONDS,
+            max_seconds=config.MAX_UTTERANCE_SECONDS)
+        echo_frames = round(config.ECHO_TAIL_SECONDS * self.sample_rate / self.frame_samples)
+        muted = 0  # Frames still to drop, Counting down after the assistant stopped talking
+        with sr.Microphone(sample_rate=self.sample_rate, chunk_size=self.frame_samples) as source:  # Opened once for the whole session
+            while not self._stop.is_set():
+                frame = source.stream.read(self.frame_samples)  # Always read, So the stream never overflows while muted
+                if self.speaking is not None and self.speaking.is_set():
+                    if not muted:
+                        segmenter.reset()  # The assistant talks over a half-heard utterance, Drop it too
+                    muted = echo_frames + 1
+                if muted:  # Not fed to the VAD either, So the noise floor isn't calibrated on the assistant's voice
+                    muted -= 1
+                    continue
+                audio = segmenter.feed(frame)
+                if audio is None:
+                    continue
+                self._queue(sr.AudioData(audio, self.sample_rate, self.sample_width))
+
+    def _queue(self, utterance):
+        """
+        Queue an utterance for the recognizer, Dropping the oldest one when the queue is full.
+        The latest command matters most, And the microphone thread must never block.
+
+        Args:
+        utterance (sr.AudioData): The utterance
+        """
+        while True:
+            try:
+                self.utterances.put_nowait(utterance)
+                return
+            except queue.Full:  # The recognizer can't keep up
+                try:
+                    self.utterances.get_nowait()
+                except queue.Empty:  # Taken by the recognizer meanwhile, Just try again
+                    continue
+                self.dropped += 1
+                print("Recognizer busy, The oldest utterance was dropped")
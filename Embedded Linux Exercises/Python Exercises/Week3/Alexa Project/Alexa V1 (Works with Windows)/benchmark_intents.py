@@ -0,0 +1,153 @@
+import argparse  # For reading the benchmark options from the command line
+import random  # For generating the synthetic intents and utterances
+import time  # For measuring the dispatch time
+
+from intent_matcher import IntentMatcher  # The matcher used by CommandExecutor
+
+
+
+
+
+
+
+
+def make_words(count, rng):
+    """
+    Generate distinct pseudo-words for the synthetic phrases.
+
+    Args:
+    count (int): Number of words
+    rng (random.Random): Random generator
+
+    Returns:
+    list: The words
+    """
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < count:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(3, 8))))
+    return sorted(words)
+
+
+def make_intents(count, words, rng):
+    """
+    Generate distinct trigger phrases of one to three words.
+
+    Args:
+    count (int): Number of intents
+    words (list): Vocabulary
+    rng (random.Random): Random generator
+
+    Returns:
+    list: The phrases
+    """
+    phrases = set()
+    while len(phrases) < count:
+        phrases.add(" ".join(rng.sample(words, rng.randint(1, 3))))
+    return sorted(phrases)
+
+
+def make_utterances(count, phrases, filler, rng, unknown_ratio=0.1):
+    """
+    Generate utterances: a phrase surrounded by filler words, Some without any phrase.
+
+    Args:
+    count (int): Number of utterances
+    phrases (list): Trigger phrases
+    filler (list): Words that are not part of any phrase
+    rng (random.Random): Random generator
+    unknown_ratio (float): Share of utterances that match no intent
+
+    Returns:
+    list: The utterances
+    """
+    utterances = []
+    for _ in range(count):
+        before = rng.sample(filler, rng.randint(0, 3))
+        after = rng.sample(filler, rng.randint(0, 4))
+        middle = [] if rng.random() < unknown_ratio else [rng.choice(phrases)]
+        utterances.append(" ".join(before + middle + after))
+    return utterances
+
+
+def linear_dispatch(chain, utterance):
+    """
+    Dispatch like the old if/elif chain: the first phrase found as a substring wins.
+
+    Args:
+    chain (list): (phrase, handler) pairs in order
+    utterance (str): The utterance
+
+    Returns:
+    The handler result, or None
+    """
+    for phrase, handler in chain:
+        if phrase in utterance:
+            return handler(phrase)
+    return None
+
+
+def time_dispatch(dispatch, utterances):
+    """
+    Dispatch every utterance once and measure the mean time of one dispatch.
+
+    Args:
+    dispatch (callable): Function dispatching one utterance
+    utterances (list): The utterances
+
+    Returns:
+    float: Mean dispatch time in microseconds
+    """
+    start = time.perf_counter()
+    for utterance in utterances:
+        dispatch(utterance)
+    return (time.perf_counter() - start) * 1e6 / len(utterances)
+
+
+def main():
+    """
+    Compare the Aho-Corasick matcher with a linear if/elif chain for growing numbers of intents.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the intent dispatch of the voice assistant.")
+    parser.add_argument('--utterances', type=int, default=100_000, help="Number of synthetic utterances to dispatch.")
+    parser.add_argument('--intents', type=int, nargs='+', default=[30, 300, 3000], help="Numbers of registered intents.")
+    parser.add_argument('--seed', type=int, default=1, help="Seed of the random generator.")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = make_words(max(args.intents) * 2 + 200, rng)
+    filler, vocabulary = words[:200], words[200:]  # Filler words never appear in a phrase
+
+    report = [["Intents", "Matcher (us)", "Linear chain (us)", "Speedup", "Routed differently"]]
+    for count in args.intents:
+        phrases = make_intents(count, vocabulary, rng)
+        utterances = make_utterances(args.utterances, phrases, filler, rng)
+
+        matcher = IntentMatcher()
+        for phrase in phrases:
+            matcher.register(phrase, lambda match: match.phrase)
+        matcher.match("")  # Compile the automaton outside the measurement
+        chain = [(phrase, lambda phrase: phrase) for phrase in phrases]
+
+        matcher_us = time_dispatch(matcher.dispatch, utterances)
+        linear_us = time_dispatch(lambda utterance: linear_dispatch(chain, utterance), utterances)
+
+        # First-match-wins routes an utterance to whichever phrase comes first, Even inside a longer word or phrase
+        differently = 0
+        for utterance in utterances:
+            match = matcher.match(utterance)
+            if (match.phrase if match else None) != linear_dispatch(chain, utterance):
+                differently += 1
+        report.append([f"{count:,}", f"{matcher_us:.2f}", f"{linear_us:.2f}", f"{linear_us / matcher_us:.1f}x", f"{differently / len(utterances):.1%}"])
+        print(" | ".join(report[-1]))
+
+    # Print the final report as an aligned table
+    widths = [max(len(row[column]) for row in report) for column in range(len(report[0]))]
+    print()
+    for row in report:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+
+
+# Entry point for the benchmark
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import argparse  # For reading the benchmark options from the command line
+import os  # For building the capture paths
+import struct  # For writing the synthetic captures quickly
+import sys  # For the unit of the peak memory
+import tempfile  # For the generated captures
+import time  # For measuring the throughput
+from concurrent.futures import ProcessPoolExecutor  # For measuring the peak memory of every run on its own
+
+from scapy.all import ARP, DNS, DNSQR, DNSRR, ICMP, IP, TCP, UDP, Ether, Raw, rdpcap
+
+from network_analysis import analyze_packets, analyze_pcap, report_sheets, save_network_analyze_to_excel  # The classifier under test
+from report_writers import create_report_writer  # The report formats under test
+
+try:
+    import resource  # Peak memory on Linux and macOS
+except ImportError:
+    resource = None
+
+try:
+    import psutil  # Peak memory on Windows
+except ImportError:
+    psutil = None
+
+
+
+
+
+
+
+
+def template_packets():
+    """
+    Build one packet of every kind the classifier handles: MQTT, HTTP, DNS query/response, plain TCP/UDP, ICMP and ARP.
+
+    Returns:
+    list: The raw packets (bytes)
+    """
+    ether = Ether(src="02:00:00:00:00:01", dst="02:00:00:00:00:02")
+    packets = [
+        ether / IP(src="192.168.1.10", dst="192.168.1.20") / TCP(sport=50000, dport=1883, flags="PA") / Raw(b"\x30\x0c\x00\x04test/hello"),
+        ether / IP(src="192.168.1.10", dst="93.184.216.34") / TCP(sport=50001, dport=80, flags="PA") / Raw(b"GET / HTTP/1.1\r\nHost: example.com\r\n\r\n"),
+        ether / IP(src="192.168.1.10", dst="8.8.8.8") / UDP(sport=50002, dport=53) / DNS(rd=1, qd=DNSQR(qname="example.com")),
+        ether / IP(src="8.8.8.8", dst="192.168.1.10") / UDP(sport=53, dport=50002) / DNS(qr=1, qd=DNSQR(qname="example.com"), an=DNSRR(rrname="example.com", rdata="93.184.216.34")),
+        ether / IP(src="192.168.1.10", dst="192.168.1.30") / TCP(sport=50003, dport=443, flags="A") / Raw(b"\x17\x03\x03" + bytes(200)),
+        ether / IP(src="192.168.1.10", dst="192.168.1.40") / UDP(sport=50004, dport=5683) / Raw(bytes(40)),
+        ether / IP(src="192.168.1.10", dst="192.168.1.1") / ICMP(),
+        Ether(src="02:00:00:00:00:01", dst="ff:ff:ff:ff:ff:ff") / ARP(psrc="192.168.1.10", pdst="192.168.1.1"),
+    ]
+    return [bytes(packet) for packet in packets]
+
+
+def write_capture(path, count, flows=0):
+    """
+    Write a synthetic pcap capture, Cycling through the template packets 1 ms apart.
+
+    Args:
+    path (str): The capture file
+    count (int): Number of packets
+    flows (int): Spread the packets over this many conversations by changing their source port, 0 keeps the templates
+    """
+    templates = template_packets()
+    with open(path, 'wb') as file:
+        file.write(struct.pack('<IHHiIII', 0xa1b2c3d4, 2, 4, 0, 0, 65535, 1))  # pcap header, Ethernet link type
+        for number in range(count):
+            packet = templates[number % len(templates)]
+            if flows and packet[12:14] == b"\x08\x00" and packet[23] in (6, 17):  # TCP/UDP, Port after the 20 bytes IP header
+                packet = packet[:34] + struct.pack('!H', 1024 + number // len(templates) % flows) + packet[36:]
+            microseconds = number * 1000
+            file.write(struct.pack('<IIII', 1700000000 + microseconds // 1000000, microseconds % 1000000, len(packet), len(packet)))
+            file.write(packet)
+
+
+def peak_rss_mb():
+    """
+    Get the peak memory (resident set size) of this process.
+
+    Returns:
+    float: Peak memory in MB, NaN if it can't be measured
+    """
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KB on Linux, Bytes on macOS
+        return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    if psutil is not None:
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    return float('nan')
+
+
+class CountingWriter:
+    """
+    Row writer discarding the rows, So the benchmark measures the reading and decoding only.
+    """
+    def __init__(self):
+        """
+        Initialize the counter.
+        """
+        self.rows = 0
+
+    def write(self, row, sheet=None):
+        """
+        Count a row.
+        """
+        self.rows += 1
+
+    def close(self):
+        """
+        Nothing to save.
+        """
+        pass
+
+
+def run(path, mode, workers, output=None):
+    """
+    Analyze a capture, In a fresh process so the peak memory belongs to this run only.
+
+    Args:
+    path (str): The capture file
+    mode (str): "fast" (raw frames and the fast classifier), "streaming" (PcapReader and the scapy classifier)
+                or "in-memory" (rdpcap and analyze_packets)
+    workers (int): Decoding threads of the streaming mode
+    output (str): Report format to write next to the capture, None only counts the rows
+
+    Returns:
+    tuple: (packets, seconds, decode packets/s, peak RSS in MB, flows)
+    """
+    start = time.perf_counter()
+    if mode in ("fast", "streaming"):
+        writer = create_report_writer(path, report_sheets(), output) if output else CountingWriter()
+        stats = analyze_pcap(path, writer, workers, fast=mode == "fast")
+        packets, decode_pps, flows = stats['decoded'] + stats['failed'], stats['decode_pps'], stats['flows']
+    else:
+        data = analyze_packets(rdpcap(path))
+        if output:
+            save_network_analyze_to_excel(data, path, output)
+        packets, decode_pps, flows = len(data), float('nan'), 0
+    return packets, time.perf_counter() - start, decode_pps, peak_rss_mb(), flows
+
+
+def main():
+    """
+    Measure the throughput and peak memory of the packet classifier on synthetic captures.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the packet analysis on synthetic pcap captures.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000], help="Packets per capture.")
+    parser.add_argument('--modes', nargs='+', default=["fast"], choices=["fast", "streaming", "in-memory"],
+                        help="'streaming' dissects every packet with scapy, 'in-memory' is the old rdpcap path (its memory grows with the capture).")
+    parser.add_argument('--workers', type=int, help="Decoding threads, Defaults to config.NETWORK_DECODE_WORKERS.")
+    parser.add_argument('--flows', type=int, default=0,
+                        help="Spread the TCP/UDP packets over this many conversations, To measure the flow table under load.")
+    parser.add_argument('--output', choices=["xlsx", "csv", "parquet"],
+                        help="Also write the report in this format, By default the rows are only counted.")
+    args = parser.parse_args()
+
+    report = [["Packets", "Mode", "Seconds", "Packets/s", "Decode packets/s", "Peak RSS (MB)", "Flows"]]
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            path = os.path.join(directory, f"synthetic_{size}.pcap")
+            write_capture(path, size, args.flows)
+            for mode in args.modes:
+                with ProcessPoolExecutor(max_workers=1) as pool:  # A fresh process per run
+                    packets, seconds, decode_pps, peak, flows = pool.submit(run, path, mode, args.workers, args.output).result()
+                report.append([str(packets), mode, f"{seconds:.1f}", f"{packets / seconds:.0f}", f"{decode_pps:.0f}", f"{peak:.0f}",
+                               str(flows)])
+                print(" | ".join(report[-1]))
+            os.remove(path)
+
+    # Print the final report as an aligned table
+    widths = [max(len(row[column]) for row in report) for column in range(len(report[0]))]
+    print()
+    for row in report:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+
+
+# Entry point for the benchmark
+if __name__ == "__main__":
+    main()
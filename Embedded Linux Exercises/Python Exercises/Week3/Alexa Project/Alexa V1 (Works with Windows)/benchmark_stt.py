@@ -0,0 +1,142 @@
+import argparse  # For reading the benchmark options from the command line
+import glob  # For finding the WAV files
+import os  # For finding the transcript of every WAV file
+import time  # For measuring the processing time
+
+from intent_matcher import WORD  # Same word splitting as the command dispatch
+from stt_backends import STT_BACKENDS, RecognitionFailed, SpeechNotUnderstood  # The backends under test
+from wake_word import read_wav  # 16-bit mono WAV reader
+
+
+
+
+
+
+
+
+def words(text):
+    """
+    Normalize a text to its lowercase words, So punctuation and case don't count as errors.
+
+    Args:
+    text (str): The text
+
+    Returns:
+    list: The words
+    """
+    return WORD.findall(text.lower())
+
+
+def edit_distance(reference, hypothesis):
+    """
+    Count the word substitutions, deletions and insertions turning the reference into the hypothesis.
+
+    Args:
+    reference (list): Reference words
+    hypothesis (list): Recognized words
+
+    Returns:
+    int: The edit distance
+    """
+    previous = list(range(len(hypothesis) + 1))
+    for i, reference_word in enumerate(reference, start=1):
+        current = [i]
+        for j, hypothesis_word in enumerate(hypothesis, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (reference_word != hypothesis_word)))
+        previous = current
+    return previous[-1]
+
+
+def load_dataset(directory):
+    """
+    Load the WAV files of a directory and their transcripts.
+    Every <name>.wav needs a <name>.txt with what is said in it.
+
+    Args:
+    directory (str): Directory of the recordings
+
+    Returns:
+    list: (name, audio, sample rate, reference words) tuples
+    """
+    dataset = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        transcript = os.path.splitext(path)[0] + ".txt"
+        if not os.path.exists(transcript):
+            print(f"Skipping {path}: no transcript {transcript}")
+            continue
+        with open(transcript, encoding='utf-8') as file:
+            reference = words(file.read())
+        audio, sample_rate = read_wav(path)
+        dataset.append((os.path.basename(path), audio, sample_rate, reference))
+    return dataset
+
+
+def benchmark_backend(name, dataset):
+    """
+    Replay every recording through a backend and measure its speed and accuracy.
+
+    Args:
+    name (str): Name of the backend in STT_BACKENDS
+    dataset (list): The recordings and their transcripts
+
+    Returns:
+    list: One result row of the report
+    """
+    try:
+        start = time.perf_counter()
+        backend = STT_BACKENDS[name]()
+        load_seconds = time.perf_counter() - start
+    except RecognitionFailed as e:
+        return [name, "-", "-", "-", "-", "-", f"unavailable: {e}"]
+
+    audio_seconds = processing_seconds = 0.0
+    errors = reference_words = not_understood = failed = 0
+    for _, audio, sample_rate, reference in dataset:
+        start = time.perf_counter()
+        try:
+            hypothesis = words(backend.transcribe(audio, sample_rate))
+        except SpeechNotUnderstood:
+            hypothesis = []
+            not_understood += 1
+        except RecognitionFailed:
+            hypothesis = []
+            failed += 1
+        processing_seconds += time.perf_counter() - start
+        audio_seconds += len(audio) / 2 / sample_rate
+        errors += edit_distance(reference, hypothesis)
+        reference_words += len(reference)
+
+    return [name, f"{load_seconds:.2f}", f"{processing_seconds / max(audio_seconds, 1e-9):.3f}",
+            f"{processing_seconds * 1000 / max(len(dataset), 1):.0f}", f"{errors / max(reference_words, 1):.1%}",
+            str(not_understood), f"{failed} failed" if failed else "OK"]
+
+
+def main():
+    """
+    Compare the speech-to-text backends on a directory of recordings and print a report.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the speech-to-text backends on WAV recordings.")
+    parser.add_argument('directory', help="Directory of 16-bit mono <name>.wav recordings, each with a <name>.txt transcript.")
+    parser.add_argument('--backends', nargs='+', default=list(STT_BACKENDS), choices=list(STT_BACKENDS), help="Backends to compare.")
+    args = parser.parse_args()
+
+    dataset = load_dataset(args.directory)
+    if not dataset:
+        parser.error(f"No WAV files with transcripts in {args.directory}")
+    print(f"{len(dataset)} recordings, {sum(len(audio) / 2 / rate for _, audio, rate, _ in dataset):.0f} s of audio")
+
+    report = [["Backend", "Load (s)", "Real-time factor", "Per utterance (ms)", "Word error rate", "Not understood", "Result"]]
+    for name in args.backends:
+        report.append(benchmark_backend(name, dataset))
+        print(" | ".join(report[-1]))
+
+    # Print the final report as an aligned table
+    widths = [max(len(row[column]) for row in report) for column in range(len(report[0]))]
+    print()
+    for row in report:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+
+
+# Entry point for the benchmark
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import argparse  # For reading the benchmark options from the command line
+import glob  # For finding the WAV fixtures
+import os  # For building the fixture paths
+import tempfile  # For the generated fixtures
+import time  # For measuring the CPU time
+
+import numpy as np  # For generating the synthetic fixtures
+
+import config
+from wake_word import TemplateWakeWordDetector, WakeWordGate, read_wav, write_wav  # The gate under test
+
+
+
+
+
+
+
+
+# Formants (F1, F2) of the vowels used by the synthetic words
+VOWELS = {'a': (750, 1250), 'e': (500, 1900), 'i': (300, 2300), 'o': (500, 900), 'u': (320, 800)}
+SYNTHETIC_WAKE_WORD = "a-l-e-ks-a"  # Rough phonetic outline of "alexa"
+SYNTHETIC_OTHER_WORDS = ["o-k-e", "i-ks-u", "e-l-o", "a-a-i", "u-l-i-a", "o-ks-a", "e-l-e-ks-i", "a-l-o-ks-u"]
+
+
+def synthesize_word(outline, rng, sample_rate):
+    """
+    Synthesize a word-like sound: voiced vowels with formants, 'l' as a low voiced glide and 'ks'/'k' as noise bursts.
+    Speed, pitch and loudness are randomized, So no two renditions are the same.
+
+    Args:
+    outline (str): Phonemes separated by '-'
+    rng (np.random.Generator): Random generator
+    sample_rate (int): Sample rate
+
+    Returns:
+    np.ndarray: The samples (float)
+    """
+    speed = rng.uniform(0.85, 1.15)
+    pitch = rng.uniform(100, 180)
+    parts = []
+    for phoneme in outline.split('-'):
+        if phoneme in VOWELS:
+            count = int(0.16 * speed * sample_rate)
+            times = np.arange(count) / sample_rate
+            f1, f2 = VOWELS[phoneme]
+            signal = np.zeros(count)
+            for harmonic in range(1, int(4000 / pitch)):
+                frequency = harmonic * pitch
+                amplitude = np.exp(-((frequency - f1) / 150) ** 2) + 0.6 * np.exp(-((frequency - f2) / 200) ** 2) + 0.02
+                signal += amplitude * np.sin(2 * np.pi * frequency * times)
+            parts.append(signal * np.hanning(count))
+        elif phoneme == 'l':
+            count = int(0.07 * speed * sample_rate)
+            times = np.arange(count) / sample_rate
+            parts.append(0.5 * np.sin(2 * np.pi * pitch * times) * np.hanning(count))
+        else:  # 'k' / 'ks': a short noise burst
+            count = int((0.1 if phoneme == 'ks' else 0.04) * speed * sample_rate)
+            parts.append(rng.normal(0, 0.3, count) * np.hanning(count))
+    return np.concatenate(parts)
+
+
+def synthesize_utterance(words, rng, sample_rate, snr_db):
+    """
+    Synthesize an utterance: silence, the words separated by short pauses, silence, and background noise.
+
+    Args:
+    words (list): Phoneme outlines of the words
+    rng (np.random.Generator): Random generator
+    sample_rate (int): Sample rate
+    snr_db (float): Signal to noise ratio
+
+    Returns:
+    bytes: 16-bit PCM audio
+    """
+    pieces = [np.zeros(int(rng.uniform(0.2, 0.35) * sample_rate))]
+    for word in words:
+        pieces += [synthesize_word(word, rng, sample_rate), np.zeros(int(rng.uniform(0.05, 0.15) * sample_rate))]
+    pieces.append(np.zeros(int(0.8 * sample_rate)))  # The silence that ended the utterance
+    signal = np.concatenate(pieces)
+    signal *= rng.uniform(2000, 9000) / np.abs(signal).max()
+    noise = rng.normal(0, np.sqrt((signal ** 2).mean()) / 10 ** (snr_db / 20), len(signal))
+    return np.clip(signal + noise, -32768, 32767).astype('<i2').tobytes()
+
+
+def generate_fixtures(directory, count, sample_rate, rng):
+    """
+    Write synthetic fixtures: templates of the wake word, positives (wake word, often followed by a command) and negatives.
+
+    Args:
+    directory (str): Directory of the fixtures
+    count (int): Number of positive and of negative fixtures
+    sample_rate (int): Sample rate
+    rng (np.random.Generator): Random generator
+    """
+    for name in ("templates", "positive", "negative"):
+        os.makedirs(os.path.join(directory, name), exist_ok=True)
+    for number in range(3):
+        write_wav(os.path.join(directory, "templates", f"{number}.wav"), synthesize_utterance([SYNTHETIC_WAKE_WORD], rng, sample_rate, 30), sample_rate)
+    for number in range(count):
+        command = list(rng.choice(SYNTHETIC_OTHER_WORDS, size=rng.integers(0, 4)))  # Sometimes the wake word alone
+        write_wav(os.path.join(directory, "positive", f"{number}.wav"),
+                  synthesize_utterance([SYNTHETIC_WAKE_WORD] + command, rng, sample_rate, rng.uniform(10, 25)), sample_rate)
+        words = list(rng.choice(SYNTHETIC_OTHER_WORDS, size=rng.integers(1, 5)))
+        write_wav(os.path.join(directory, "negative", f"{number}.wav"), synthesize_utterance(words, rng, sample_rate, rng.uniform(10, 25)), sample_rate)
+
+
+def load_fixtures(directory):
+    """
+    Load the WAV fixtures of a directory with 'positive' and 'negative' subdirectories.
+
+    Args:
+    directory (str): Directory of the fixtures
+
+    Returns:
+    list: (audio, sample rate, has wake word) tuples
+    """
+    fixtures = []
+    for name, expected in (("positive", True), ("negative", False)):
+        for path in sorted(glob.glob(os.path.join(directory, name, "*.wav"))):
+            audio, sample_rate = read_wav(path)
+            fixtures.append((audio, sample_rate, expected))
+    return fixtures
+
+
+def main():
+    """
+    Measure the false accept/reject rates and the CPU load of the wake word gate on WAV fixtures.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the offline wake word gate on WAV fixtures.")
+    parser.add_argument('--fixtures', help="Directory with 'positive' and 'negative' WAV recordings (16-bit mono), Synthetic fixtures are generated if omitted.")
+    parser.add_argument('--templates', help="Directory of the wake word recordings, Defaults to <fixtures>/templates or config.WAKE_WORD_TEMPLATE_DIR/<wake word>.")
+    parser.add_argument('--count', type=int, default=200, help="Number of positive and of negative synthetic fixtures.")
+    parser.add_argument('--thresholds', type=float, nargs='+', help="Thresholds to compare, Defaults to a range around config.WAKE_WORD_THRESHOLD.")
+    parser.add_argument('--seed', type=int, default=1, help="Seed of the synthetic fixtures.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        directory = args.fixtures
+        if directory is None:
+            directory = scratch
+            generate_fixtures(directory, args.count, config.AUDIO_SAMPLE_RATE, np.random.default_rng(args.seed))
+            print(f"Generated {args.count} positive and {args.count} negative synthetic fixtures")
+        templates = args.templates or os.path.join(directory, "templates")
+        if not os.path.isdir(templates):
+            templates = os.path.join(config.WAKE_WORD_TEMPLATE_DIR, config.WAKE_WORD)
+        detector = TemplateWakeWordDetector.from_directory(templates)
+        fixtures = load_fixtures(directory)
+
+    # Score every fixture once, Every threshold is then just a comparison
+    start = time.process_time()
+    scores = [(detector.score(audio, sample_rate)[0], expected) for audio, sample_rate, expected in fixtures]
+    scoring_cpu = time.process_time() - start
+    audio_seconds = sum(len(audio) / 2 / sample_rate for audio, sample_rate, _ in fixtures)
+
+    # Run the whole gate at the configured threshold: how much audio still goes to the online recognizer
+    gate = WakeWordGate(detector, follow_up_seconds=0)
+    start = time.process_time()
+    forwarded = sum(len(gate.process(audio, sample_rate) or b'') for audio, sample_rate, _ in fixtures)
+    gate_cpu = time.process_time() - start
+
+    positives = sum(1 for _, expected in scores if expected)
+    negatives = len(scores) - positives
+    thresholds = args.thresholds or [round(config.WAKE_WORD_THRESHOLD * factor, 2) for factor in (0.6, 0.7, 0.8, 0.9, 1.0, 1.1, 1.2, 1.35, 1.5)]
+    report = [["Threshold", "False accepts", "False rejects"]]
+    for threshold in thresholds:
+        false_accepts = sum(1 for score, expected in scores if not expected and score <= threshold)
+        false_rejects = sum(1 for score, expected in scores if expected and score > threshold)
+        report.append([f"{threshold:.2f}" + (" (config)" if threshold == config.WAKE_WORD_THRESHOLD else ""),
+                       f"{false_accepts / max(negatives, 1):.1%}", f"{false_rejects / max(positives, 1):.1%}"])
+
+    print(f"\nFixtures: {positives} positive, {negatives} negative, {audio_seconds:.0f} s of audio")
+    print(f"Detector CPU: {scoring_cpu * 1000 / audio_seconds:.1f} ms per second of audio ({scoring_cpu / audio_seconds:.1%} of one core)")
+    print(f"Gate CPU: {gate_cpu * 1000 / len(fixtures):.1f} ms per utterance, "
+          f"Audio sent to the recognizer: {forwarded / sum(len(audio) for audio, _, _ in fixtures):.0%} (was 100%)")
+
+    # Print the final report as an aligned table
+    widths = [max(len(row[column]) for row in report) for column in range(len(report[0]))]
+    print()
+    for row in report:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+
+
+# Entry point for the benchmark
+if __name__ == "__main__":
+    main()
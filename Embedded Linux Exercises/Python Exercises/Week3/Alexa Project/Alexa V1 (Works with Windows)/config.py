@@ -16,6 +16,18 @@ AZAN_COUNTRY = "Egypt"
 
 # Network analysis settings
 NETWORK_ANALYSIS_DURATION = 10  # Duration in seconds for network analysis
+NETWORK_ANALYSIS_FILE = "network_analysis.xlsx"  # Report of the network analysis
+NETWORK_STREAMING = True  # Analyze packets while capturing (flat memory), False captures everything first
+NETWORK_DECODE_WORKERS = 2  # Threads decoding the captured packets
+NETWORK_QUEUE_SIZE = 10000  # Packets waiting to be decoded, Packets are dropped (and counted) above this
+NETWORK_FAST_CLASSIFIER = True  # Parse the common headers with struct (same report, ~10x faster), scapy only for rare protocols
+NETWORK_PACKET_SHEET = True  # Write one row per packet in the report
+NETWORK_FLOW_SHEET = True  # Write one row per conversation (5-tuple) in a "Flows" sheet of the report
+NETWORK_FLOW_IDLE_TIMEOUT = 60  # Seconds without packets ending a flow
+NETWORK_FLOW_ACTIVE_TIMEOUT = 600  # Longer flows are cut into rows of this many seconds
+NETWORK_MAX_FLOWS = 100000  # Most flows tracked at once, The least recently used one is ended above this
+NETWORK_REPORT_FORMAT = "xlsx"  # "xlsx", "csv" or "parquet" (needs pyarrow), Rows are streamed to the file in every format
+NETWORK_PARQUET_ROW_GROUP = 65536  # Rows buffered per Parquet row group
 
 
 # FOTA URL
@@ -23,13 +35,42 @@ FOTA_URL = "http://127.0.0.1:1880/ui/#!/0?socketid=QY74zGkuBidAtfaRAAAA" # "Put
 
 # Text-to-Speech settings
 USE_PYTTSX3 = True  # Set to False to use gTTS instead
+TTS_CACHE_DIR = "tts_cache"  # Synthesized gTTS phrases are kept here, So repeated phrases play instantly and offline
+TTS_CACHE_MAX_MB = 50  # Size cap of the speech cache, The least recently used phrases are removed first
+TTS_PREWARM = True  # Synthesize the constant prompts into the cache in the background at startup
+ASYNC_SPEECH = True  # Speak in a background thread, So commands keep working while the assistant talks
+SPEECH_LOOKAHEAD = 2  # Number of phrases synthesized ahead of the one playing
+SPEECH_BARGE_IN = True  # A new command stops the answer being spoken (needs STREAMING_CAPTURE, and ECHO_SUPPRESSION off to hear it)
 
 # Speech recognition settings
 LANGUAGE = 'en-US'
+STT_BACKEND = "google"  # Speech-to-text engine: "google" (online), "vosk" or "sphinx" (offline)
+STT_FALLBACK_BACKEND = "vosk"  # Engine used when STT_BACKEND fails (e.g. no network), "" for none
+VOSK_MODEL_PATH = "vosk-model-small-en-us-0.15"  # Directory of the Vosk model (https://alphacephei.com/vosk/models)
 
 # Alexa wake word
 WAKE_WORD = "alexa"
 
+# Continuous capture settings (the microphone stays open and utterances are cut by a voice activity detector)
+STREAMING_CAPTURE = True  # Set to False to open the microphone again for every command
+AUDIO_SAMPLE_RATE = 16000  # Samples per second of the capture
+AUDIO_FRAME_MS = 30  # Length of one audio frame analysed by the voice activity detector
+VAD_CALIBRATION_SECONDS = 0.5  # Background noise measured once when the microphone opens
+VAD_ENERGY_RATIO = 3.0  # A frame is speech when it is this many times louder than the background noise
+VAD_END_SILENCE_SECONDS = 0.8  # Silence that ends a command
+VAD_PRE_ROLL_SECONDS = 0.3  # Audio kept before the detected start of a command, So the first syllable isn't cut
+MAX_UTTERANCE_SECONDS = 10  # Longest command, Longer speech is cut
+ECHO_SUPPRESSION = True  # Ignore the microphone while the assistant talks, So it doesn't answer itself (False with a headset)
+ECHO_TAIL_SECONDS = 0.3  # The microphone stays ignored this long after the speech ends, For the room echo
+MAX_QUEUED_UTTERANCES = 5  # Commands waiting for recognition, Older audio is dropped when the recognizer falls behind
+
+# Offline wake word gate (only utterances starting with WAKE_WORD are sent to the online recognizer)
+WAKE_WORD_GATE = True  # Set to False to send every utterance to the recognizer
+WAKE_WORD_TEMPLATE_DIR = "wake_word_templates"  # Recordings of the wake word are in <dir>/<WAKE_WORD>, Made with 'python wake_word.py --enroll'
+WAKE_WORD_THRESHOLD = 5.5  # Highest template distance accepted as the wake word, Tune it with benchmark_wake_word.py
+WAKE_WORD_SEARCH_SECONDS = 2.0  # Only the start of an utterance is searched for the wake word
+WAKE_WORD_FOLLOW_UP_SECONDS = 5.0  # After the wake word alone, The next utterance within this time is recognized
+
 # Image paths for GUI automation
 IMAGE_PATHS = {
     "get_version": "GetVersion.png",
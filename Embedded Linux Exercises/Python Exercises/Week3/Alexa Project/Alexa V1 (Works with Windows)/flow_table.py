@@ -0,0 +1,292 @@
+import socket  # For formatting the IP addresses
+import struct  # For parsing the packet headers
+from collections import OrderedDict  # For the least recently used order of the flows
+from typing import List, NamedTuple, Optional, Tuple  # For type hints
+
+import config
+
+
+
+
+
+
+
+
+# Columns of the flows sheet
+FLOW_COLUMNS = ["Protocol", "Source", "Source Port", "Destination", "Destination Port", "Start", "Duration",
+                "Packets", "Bytes", "Packets Back", "Bytes Back", "SYN", "FIN", "RST", "Retransmissions", "MQTT", "End"]
+
+MQTT_PORTS = (1883, 8883)
+MQTT_TYPE_NAMES = ["Reserved", "CONNECT", "CONNACK", "PUBLISH", "PUBACK", "PUBREC", "PUBREL", "PUBCOMP",
+                   "SUBSCRIBE", "SUBACK", "UNSUBSCRIBE", "UNSUBACK", "PINGREQ", "PINGRESP", "DISCONNECT", "AUTH"]
+TCP_SYN, TCP_FIN, TCP_RST = 0x02, 0x01, 0x04
+ETHER_TYPE_NAMES = {0x0806: "ARP", 0x88CC: "LLDP", 0x888E: "EAPOL"}  # Non-IP frames are grouped by MAC addresses
+IP_PROTOCOL_NAMES = {1: "ICMP", 2: "IGMP", 6: "TCP", 17: "UDP", 47: "GRE", 50: "ESP", 58: "ICMPv6", 89: "OSPF", 132: "SCTP"}
+
+unpack_ether_type = struct.Struct("!H").unpack_from
+unpack_ports = struct.Struct("!HH").unpack_from
+unpack_tcp = struct.Struct("!HHIIH").unpack_from  # Ports, sequence, acknowledgment, data offset and flags
+
+
+class FlowPacket(NamedTuple):
+    """
+    The fields of a packet the flow table needs.
+    """
+    key: tuple  # (protocol, address, port, address, port), The same for both directions of a conversation
+    forward: bool  # Sent by the first endpoint of the key
+    length: int  # Bytes of the frame
+    tcp_flags: int  # 0 if not TCP
+    seq: int  # TCP sequence number
+    payload: int  # Bytes of TCP payload
+    mqtt_type: int  # MQTT message type, -1 if none
+
+
+def parse_flow_packet(frame: bytes) -> Optional[FlowPacket]:
+    """
+    Extract the 5-tuple and the TCP/MQTT fields of an Ethernet frame with struct.
+
+    Args:
+    frame (bytes): The Ethernet frame
+
+    Returns:
+    FlowPacket: The fields, or None for a truncated frame
+    """
+    try:
+        length = len(frame)
+        ether_type = unpack_ether_type(frame, 12)[0]
+        offset = 14
+        while ether_type in (0x8100, 0x88A8):  # VLAN tags
+            ether_type = unpack_ether_type(frame, offset + 2)[0]
+            offset += 4
+
+        if ether_type == 0x0800:
+            header_length = (frame[offset] & 15) * 4
+            proto = frame[offset + 9]
+            src, dst = frame[offset + 12:offset + 16], frame[offset + 16:offset + 20]
+            total_length = unpack_ether_type(frame, offset + 2)[0]
+            end = min(length, offset + total_length) if total_length else length  # 0 with segmentation offload
+            fragment = unpack_ether_type(frame, offset + 6)[0] & 0x1FFF
+            transport = offset + header_length if header_length >= 20 and not fragment else None  # No ports in fragments
+        elif ether_type == 0x86DD:
+            proto = frame[offset + 6]
+            src, dst = frame[offset + 8:offset + 24], frame[offset + 24:offset + 40]
+            payload_length = unpack_ether_type(frame, offset + 4)[0]
+            end = min(length, offset + 40 + payload_length) if payload_length else length  # 0 for jumbograms
+            transport = offset + 40
+        else:
+            name = ETHER_TYPE_NAMES.get(ether_type, f"0x{ether_type:04x}")
+            src, dst = frame[6:12], frame[0:6]
+            return _flow_packet(name, src, 0, dst, 0, length)
+        if len(src) != len(dst) or not src:
+            return None
+        name = IP_PROTOCOL_NAMES.get(proto, str(proto))
+
+        if proto == 6 and transport is not None and transport + 14 <= length:
+            sport, dport, seq, _, offset_flags = unpack_tcp(frame, transport)
+            payload_start = transport + (offset_flags >> 12) * 4
+            payload = max(0, end - payload_start)
+            mqtt_type = frame[payload_start] >> 4 if payload and (sport in MQTT_PORTS or dport in MQTT_PORTS) else -1
+            return _flow_packet(name, src, sport, dst, dport, length, offset_flags & 0x1FF, seq, payload, mqtt_type)
+        if proto == 17 and transport is not None and transport + 4 <= length:
+            sport, dport = unpack_ports(frame, transport)
+            return _flow_packet(name, src, sport, dst, dport, length)
+        return _flow_packet(name, src, 0, dst, 0, length)
+    except (struct.error, IndexError):
+        return None
+
+
+def _flow_packet(name, src, sport, dst, dport, length, tcp_flags=0, seq=0, payload=0, mqtt_type=-1):
+    """
+    Build a FlowPacket, Ordering the endpoints so both directions of a conversation get the same key.
+    """
+    forward = (src, sport) <= (dst, dport)
+    key = (name, src, sport, dst, dport) if forward else (name, dst, dport, src, sport)
+    return FlowPacket(key, forward, length, tcp_flags, seq, payload, mqtt_type)
+
+
+def format_address(address: bytes) -> str:
+    """
+    Format an IPv4, IPv6 or MAC address.
+
+    Args:
+    address (bytes): The address
+
+    Returns:
+    str: The address as text
+    """
+    if len(address) == 4:
+        return socket.inet_ntoa(address)
+    if len(address) == 16:
+        return socket.inet_ntop(socket.AF_INET6, address)
+    return address.hex(':')
+
+
+
+
+
+
+
+
+class Flow:
+    """
+    Statistics of one conversation (both directions of a 5-tuple).
+    The source of the flow is the endpoint that sent its first packet.
+    """
+    __slots__ = ("key", "initiator_forward", "first", "last", "packets", "bytes", "packets_back", "bytes_back",
+                 "syn", "fin", "rst", "retransmissions", "next_seq", "mqtt")
+
+    def __init__(self, key: tuple, forward: bool, timestamp: float):
+        """
+        Start a flow.
+
+        Args:
+        key (tuple): Key of the flow
+        forward (bool): Direction of the first packet
+        timestamp (float): Time of the first packet
+        """
+        self.key = key
+        self.initiator_forward = forward
+        self.first = self.last = timestamp
+        self.packets = self.bytes = self.packets_back = self.bytes_back = 0
+        self.syn = self.fin = self.rst = self.retransmissions = 0
+        self.next_seq = [None, None]  # Highest TCP sequence number sent + 1, By direction (initiator, responder)
+        self.mqtt = None  # MQTT message type -> count, Only created for MQTT flows
+
+    def add(self, packet: FlowPacket, timestamp: float):
+        """
+        Account a packet to the flow.
+
+        Args:
+        packet (FlowPacket): The packet
+        timestamp (float): Its capture time
+        """
+        self.last = max(self.last, timestamp)
+        back = packet.forward != self.initiator_forward
+        if back:
+            self.packets_back += 1
+            self.bytes_back += packet.length
+        else:
+            self.packets += 1
+            self.bytes += packet.length
+        flags = packet.tcp_flags
+        if flags:
+            self.syn += bool(flags & TCP_SYN)
+            self.fin += bool(flags & TCP_FIN)
+            self.rst += bool(flags & TCP_RST)
+            # Retransmission heuristic: a segment carrying data (or SYN/FIN) that ends at or before the highest
+            # sequence number already sent in this direction was sent before
+            length = packet.payload + (1 if flags & (TCP_SYN | TCP_FIN) else 0)
+            if length:
+                end = (packet.seq + length) & 0xFFFFFFFF
+                sent = self.next_seq[back]
+                if sent is not None and (sent - end) & 0xFFFFFFFF < 0x80000000:  # end <= sent, Modulo 2^32
+                    self.retransmissions += 1
+                else:
+                    self.next_seq[back] = end
+        if packet.mqtt_type >= 0:
+            if self.mqtt is None:
+                self.mqtt = {}
+            self.mqtt[packet.mqtt_type] = self.mqtt.get(packet.mqtt_type, 0) + 1
+
+    def row(self, start_time: float, reason: str) -> list:
+        """
+        Get the row of the flow in the flows sheet.
+
+        Args:
+        start_time (float): Timestamp of the first packet of the capture
+        reason (str): Why the flow ended (idle, active, evicted, end of capture)
+
+        Returns:
+        list: The row
+        """
+        name, address_a, port_a, address_b, port_b = self.key
+        if not self.initiator_forward:
+            address_a, port_a, address_b, port_b = address_b, port_b, address_a, port_a
+        mqtt = " ".join(f"{MQTT_TYPE_NAMES[kind]}={count}" for kind, count in sorted(self.mqtt.items())) if self.mqtt else ""
+        return [name, format_address(address_a), port_a, format_address(address_b), port_b,
+                f"{self.first - start_time:.6f}", f"{self.last - self.first:.6f}", self.packets, self.bytes,
+                self.packets_back, self.bytes_back, self.syn, self.fin, self.rst, self.retransmissions, mqtt, reason]
+
+
+class FlowTable:
+    """
+    Hash table of the active flows, Aggregating a packet stream into one row per conversation.
+    A flow ends after idle_timeout seconds without packets, and long flows are cut every active_timeout seconds
+    (like NetFlow), So rows come out during the capture. The table never holds more than max_flows flows: above
+    that, the least recently used flow is ended early, So memory stays bounded with any number of conversations.
+    Times are capture timestamps, So a capture file gives the same flows however fast it is read.
+    """
+    def __init__(self, idle_timeout: float = None, active_timeout: float = None, max_flows: int = None):
+        """
+        Initialize the table.
+
+        Args:
+        idle_timeout (float): Seconds without packets ending a flow, Defaults to config.NETWORK_FLOW_IDLE_TIMEOUT
+        active_timeout (float): Longest flow before it is cut, Defaults to config.NETWORK_FLOW_ACTIVE_TIMEOUT
+        max_flows (int): Most flows kept at once, Defaults to config.NETWORK_MAX_FLOWS
+        """
+        self.idle_timeout = idle_timeout or config.NETWORK_FLOW_IDLE_TIMEOUT
+        self.active_timeout = active_timeout or config.NETWORK_FLOW_ACTIVE_TIMEOUT
+        self.max_flows = max_flows or config.NETWORK_MAX_FLOWS
+        self.flows: "OrderedDict[tuple, Flow]" = OrderedDict()  # Least recently used first
+        self.start_time = None
+        self.evicted = 0
+        self.peak_flows = 0
+
+    def add(self, packet: FlowPacket, timestamp: float) -> List[list]:
+        """
+        Account a packet, and end the flows that timed out.
+
+        Args:
+        packet (FlowPacket): The packet
+        timestamp (float): Its capture time
+
+        Returns:
+        list: Rows of the flows that ended
+        """
+        if self.start_time is None:
+            self.start_time = timestamp
+        ended = []
+        while self.flows:  # Idle flows are at the least recently used end
+            oldest = next(iter(self.flows.values()))
+            if timestamp - oldest.last <= self.idle_timeout:
+                break
+            del self.flows[oldest.key]
+            ended.append(oldest.row(self.start_time, "idle"))
+
+        flow = self.flows.get(packet.key)
+        if flow is not None and timestamp - flow.first > self.active_timeout:
+            del self.flows[packet.key]
+            ended.append(flow.row(self.start_time, "active"))
+            flow = None
+        if flow is None:
+            flow = self.flows[packet.key] = Flow(packet.key, packet.forward, timestamp)
+            if len(self.flows) > self.max_flows:
+                _, victim = self.flows.popitem(last=False)
+                ended.append(victim.row(self.start_time, "evicted"))
+                self.evicted += 1
+            self.peak_flows = max(self.peak_flows, len(self.flows))
+        else:
+            self.flows.move_to_end(packet.key)
+        flow.add(packet, timestamp)
+        return ended
+
+    def flush(self) -> List[list]:
+        """
+        End every flow, At the end of the capture.
+
+        Returns:
+        list: Rows of the flows, In the order they started
+        """
+        flows = sorted(self.flows.values(), key=lambda flow: flow.first)
+        self.flows.clear()
+        return [flow.row(self.start_time, "end of capture") for flow in flows]
+
+    def stats(self) -> Tuple[int, int]:
+        """
+        Get the table counters.
+
+        Returns:
+        tuple: (Most flows held at once, Flows ended early to stay within max_flows)
+        """
+        return self.peak_flows, self.evicted
@@ -0,0 +1,194 @@
+import re  # For splitting the utterances into words
+from collections import deque  # For the breadth-first construction of the failure links
+from typing import Callable, Dict, List, NamedTuple, Optional  # For type hints
+
+
+
+
+
+
+
+
+WORD = re.compile(r"[^\W_]+(?:'[^\W_]+)*")  # A word: letters and digits, With inner apostrophes ("what's")
+
+
+
+
+
+
+
+
+class IntentMatch(NamedTuple):
+    """
+    Result of matching an utterance against the registered intents.
+    """
+    handler: Callable  # Handler registered for the intent
+    phrase: str  # Trigger phrase that matched
+    start: int  # Position of the phrase in the utterance
+    end: int  # Position just after the phrase
+    utterance: str  # The whole (lowercased) utterance
+    argument: str  # Text after the phrase, e.g. the city in "get weather of cairo"
+
+
+def intent(*phrases: str, priority: int = 0):
+    """
+    Decorator registering a method as the handler of one or more trigger phrases.
+    The method is only tagged here, IntentMatcher.from_handlers() collects the tagged methods of an object.
+
+    Args:
+    phrases (str): Trigger phrases of the intent, matched as whole words anywhere in the utterance
+    priority (int): Phrases with a higher priority win over longer phrases of a lower priority
+
+    Returns:
+    The decorator
+    """
+    def decorator(function):
+        function.intent_phrases = getattr(function, 'intent_phrases', ()) + tuple(phrases)  # Decorators can be stacked
+        function.intent_priority = priority
+        return function
+    return decorator
+
+
+
+
+
+
+
+
+class IntentMatcher:
+    """
+    Registry of intents compiled into an Aho-Corasick automaton over words.
+    One scan of the words of the utterance finds every trigger phrase in it, So the dispatch cost depends on the length
+    of the utterance and not on the number of intents.
+    Phrases only match whole words ("play" doesn't match "display"), and when several phrases match, the most
+    specific one wins: highest priority, then most words, then earliest position.
+    """
+    def __init__(self):
+        """
+        Initialize an empty registry.
+        """
+        self._phrases: List[tuple] = []  # (phrase, words, handler, priority), Indexed by the automaton outputs
+        self._goto: List[Dict[str, int]] = []  # State -> {word: next state}
+        self._fail: List[int] = []  # State -> failure link (longest proper suffix that is also a prefix of some phrase)
+        self._outputs: List[List[int]] = []  # State -> phrases ending in this state
+        self._compiled = True  # The empty automaton is trivially compiled
+
+    @classmethod
+    def from_handlers(cls, target) -> 'IntentMatcher':
+        """
+        Build a matcher from the methods of an object tagged with the @intent decorator.
+
+        Args:
+        target: Object whose class has @intent methods
+
+        Returns:
+        IntentMatcher: A matcher dispatching to the bound methods
+        """
+        matcher = cls()
+        for name in dir(type(target)):
+            function = getattr(type(target), name)
+            for phrase in getattr(function, 'intent_phrases', ()):
+                matcher.register(phrase, getattr(target, name), function.intent_priority)
+        return matcher
+
+    def register(self, phrase: str, handler: Callable, priority: int = 0):
+        """
+        Register a trigger phrase, The automaton is rebuilt on the next match.
+
+        Args:
+        phrase (str): Trigger phrase
+        handler (callable): Function called with the IntentMatch when the phrase wins
+        priority (int): Priority of the phrase over other matching phrases
+        """
+        words = tuple(WORD.findall(phrase.lower()))
+        if not words:
+            raise ValueError(f"The intent phrase {phrase!r} has no words")
+        self._phrases.append((" ".join(words), words, handler, priority))
+        self._compiled = False
+
+    def __len__(self) -> int:
+        """
+        Count the registered phrases.
+        """
+        return len(self._phrases)
+
+    def _compile(self):
+        """
+        Build the Aho-Corasick automaton: a trie of the phrase words plus failure links computed breadth first.
+        """
+        self._goto, self._fail, self._outputs = [{}], [0], [[]]
+        for index, (_, words, _, _) in enumerate(self._phrases):
+            state = 0
+            for word in words:
+                next_state = self._goto[state].get(word)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][word] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append([])
+                state = next_state
+            self._outputs[state].append(index)
+
+        queue = deque(self._goto[0].values())  # Children of the root fail back to the root
+        while queue:
+            state = queue.popleft()
+            for word, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(word, 0)
+                self._outputs[next_state] += self._outputs[self._fail[next_state]]  # Phrases that are suffixes of this one end here too
+        self._compiled = True
+
+    def match(self, utterance: str) -> Optional[IntentMatch]:
+        """
+        Find the intent of an utterance in a single scan.
+
+        Args:
+        utterance (str): The recognized command
+
+        Returns:
+        IntentMatch: The winning match, or None if no phrase occurs in the utterance
+        """
+        if not self._compiled:
+            self._compile()
+        text = utterance.lower()
+        goto, fail, outputs, phrases = self._goto, self._fail, self._outputs, self._phrases
+        spans = []  # (start, end) of every word, For locating the winning phrase in the text
+        best = None  # (priority, word count, -first word, index)
+        state = 0
+        for found in WORD.finditer(text):  # Whole words only, So "play" doesn't fire inside "display"
+            word = found.group()
+            spans.append(found.span())
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            for index in outputs[state]:
+                length = len(phrases[index][1])
+                candidate = (phrases[index][3], length, length - len(spans), index)
+                if best is None or candidate > best:
+                    best = candidate
+        if best is None:
+            return None
+        phrase, words, handler, _ = phrases[best[3]]
+        first = -best[2]
+        start, end = spans[first][0], spans[first + len(words) - 1][1]
+        return IntentMatch(handler, phrase, start, end, text, text[end:].strip())
+
+    def dispatch(self, utterance: str) -> bool:
+        """
+        Match an utterance and call the handler of the winning intent.
+
+        Args:
+        utterance (str): The recognized command
+
+        Returns:
+        bool: True if a handler was called, False if no intent matched
+        """
+        match = self.match(utterance)
+        if match is None:
+            return False
+        match.handler(match)
+        return True
@@ -0,0 +1,308 @@
+import csv  # For the CSV reports
+import os  # For naming the files of the sheets
+from abc import ABC, abstractmethod  # For the writer interface
+from typing import Dict, List  # For type hints
+
+from openpyxl import Workbook
+
+import config
+
+try:
+    import pyarrow as pa  # Columnar tables for the Parquet reports
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+
+
+
+
+
+
+EXCEL_MAX_ROWS = 1048576  # Rows of an Excel sheet, Header included
+
+
+def sheet_path(filename: str, sheet: str, first: bool) -> str:
+    """
+    Get the file of a sheet, For the formats with one table per file.
+
+    Args:
+    filename (str): Name of the report
+    sheet (str): Name of the sheet
+    first (bool): The first sheet of the report keeps the name of the report
+
+    Returns:
+    str: The path, e.g. network_analysis.csv and network_analysis_Flows.csv
+    """
+    if first:
+        return filename
+    base, extension = os.path.splitext(filename)
+    return f"{base}_{sheet}{extension}"
+
+
+class ReportWriter(ABC):
+    """
+    Base class of the report writers: write(row, sheet) appends one row to a sheet, close() finishes the report.
+    Rows are written as they come (or in bounded batches), So a report never has to fit in memory.
+    """
+    extension = ""
+
+    def __init__(self, filename: str, sheets: Dict[str, List[str]]):
+        """
+        Initialize the writer.
+
+        Args:
+        filename (str): Name of the report
+        sheets (dict): Columns of every sheet, By sheet name, The first one is the main sheet
+        """
+        self.filename = filename
+        self.sheets = sheets
+
+    @abstractmethod
+    def write(self, row: list, sheet: str = None):
+        """
+        Append one row.
+
+        Args:
+        row (list): The row
+        sheet (str): Name of the sheet, Defaults to the main sheet
+        """
+        pass
+
+    @abstractmethod
+    def close(self):
+        """
+        Finish the report, An empty report still gets the header of its main sheet.
+        """
+        pass
+
+
+class ExcelRowWriter(ReportWriter):
+    """
+    Write the report to an Excel file one row at a time.
+    openpyxl's write-only mode streams the rows to disk, So the whole table is never held in memory.
+    Every sheet is created with its header when its first row is written, and continues in a new sheet
+    ("Packets (2)"...) when it reaches the row limit of Excel.
+    """
+    extension = ".xlsx"
+
+    def __init__(self, filename: str, sheets: Dict[str, List[str]], max_rows: int = EXCEL_MAX_ROWS):
+        """
+        Create the workbook.
+
+        Args:
+        filename (str): Name of the Excel file to save
+        sheets (dict): Columns of every sheet, By sheet name
+        max_rows (int): Rows per Excel sheet, Header included
+        """
+        super().__init__(filename, sheets)
+        self.max_rows = max_rows
+        self.workbook = Workbook(write_only=True)
+        self._open = {}  # Sheet name -> [worksheet, rows written, worksheets used]
+
+    def write(self, row: list, sheet: str = None):
+        """
+        Append one row.
+
+        Args:
+        row (list): The row
+        sheet (str): Name of the sheet, Defaults to the main sheet
+        """
+        sheet = sheet or next(iter(self.sheets))
+        current = self._open.get(sheet)
+        if current is None or current[1] >= self.max_rows:
+            part = current[2] + 1 if current else 1
+            worksheet = self.workbook.create_sheet(sheet if part == 1 else f"{sheet} ({part})")
+            worksheet.append(self.sheets[sheet])
+            current = self._open[sheet] = [worksheet, 1, part]
+        current[0].append(row)
+        current[1] += 1
+
+    def close(self):
+        """
+        Save the file.
+        """
+        if not self._open:  # Nothing was captured, Still save a valid (empty) report
+            sheet = next(iter(self.sheets))
+            self.workbook.create_sheet(sheet).append(self.sheets[sheet])
+        self.workbook.save(self.filename)
+
+
+class CsvRowWriter(ReportWriter):
+    """
+    Write the report to CSV files one row at a time, One file per sheet.
+    No row limit and the fastest format to write, Excel and pandas open it directly.
+    """
+    extension = ".csv"
+
+    def __init__(self, filename: str, sheets: Dict[str, List[str]]):
+        """
+        Initialize the writer, The files are created with their first row.
+
+        Args:
+        filename (str): Name of the main CSV file, The other sheets go to <name>_<sheet>.csv
+        sheets (dict): Columns of every sheet, By sheet name
+        """
+        super().__init__(filename, sheets)
+        self._open = {}  # Sheet name -> (file, csv writer)
+
+    def write(self, row: list, sheet: str = None):
+        """
+        Append one row.
+
+        Args:
+        row (list): The row
+        sheet (str): Name of the sheet, Defaults to the main sheet
+        """
+        sheet = sheet or next(iter(self.sheets))
+        if sheet not in self._open:
+            self._create(sheet)
+        self._open[sheet][1].writerow(row)
+
+    def _create(self, sheet: str):
+        """
+        Create the file of a sheet and write its header.
+
+        Args:
+        sheet (str): Name of the sheet
+        """
+        path = sheet_path(self.filename, sheet, sheet == next(iter(self.sheets)))
+        file = open(path, 'w', newline='', encoding='utf-8')
+        self._open[sheet] = (file, csv.writer(file))
+        self._open[sheet][1].writerow(self.sheets[sheet])
+
+    def close(self):
+        """
+        Close the files.
+        """
+        if not self._open:
+            self._create(next(iter(self.sheets)))
+        for file, _ in self._open.values():
+            file.close()
+
+
+class ParquetRowWriter(ReportWriter):
+    """
+    Write the report to Parquet files, One file per sheet.
+    Rows are buffered and written as a row group every row_group_size rows, So memory is bounded by one row group.
+    The column types come from the first row: integers, floats, and text for everything else.
+    """
+    extension = ".parquet"
+
+    def __init__(self, filename: str, sheets: Dict[str, List[str]], row_group_size: int = None):
+        """
+        Initialize the writer, The files are created with their first row group.
+
+        Args:
+        filename (str): Name of the main Parquet file, The other sheets go to <name>_<sheet>.parquet
+        sheets (dict): Columns of every sheet, By sheet name
+        row_group_size (int): Rows per row group, Defaults to config.NETWORK_PARQUET_ROW_GROUP
+        """
+        if pa is None:
+            raise ImportError("The pyarrow package is needed for the Parquet report format")
+        super().__init__(filename, sheets)
+        self.row_group_size = row_group_size or config.NETWORK_PARQUET_ROW_GROUP
+        self._rows = {}  # Sheet name -> rows waiting for the next row group
+        self._open = {}  # Sheet name -> pq.ParquetWriter
+
+    def write(self, row: list, sheet: str = None):
+        """
+        Append one row.
+
+        Args:
+        row (list): The row
+        sheet (str): Name of the sheet, Defaults to the main sheet
+        """
+        sheet = sheet or next(iter(self.sheets))
+        rows = self._rows.setdefault(sheet, [])
+        rows.append(row)
+        if len(rows) >= self.row_group_size:
+            self._write_row_group(sheet)
+
+    def _write_row_group(self, sheet: str):
+        """
+        Write the buffered rows of a sheet as one row group.
+
+        Args:
+        sheet (str): Name of the sheet
+        """
+        rows = self._rows.pop(sheet, [])
+        columns = list(zip(*rows)) if rows else [()] * len(self.sheets[sheet])
+        writer = self._open.get(sheet)
+        if writer is None:
+            schema = pa.schema([(name, self._column_type(values)) for name, values in zip(self.sheets[sheet], columns)])
+            path = sheet_path(self.filename, sheet, sheet == next(iter(self.sheets)))
+            writer = self._open[sheet] = pq.ParquetWriter(path, schema)
+        arrays = [pa.array(list(values) if field.type != pa.string() else [str(value) for value in values], type=field.type)
+                  for field, values in zip(writer.schema, columns)]
+        writer.write_table(pa.Table.from_arrays(arrays, schema=writer.schema))
+
+    @staticmethod
+    def _column_type(values: tuple):
+        """
+        Choose the Parquet type of a column from its first value.
+
+        Args:
+        values (tuple): Values of the column in the first row group
+
+        Returns:
+        pa.DataType: int64, float64 or string
+        """
+        if values and isinstance(values[0], int) and not isinstance(values[0], bool):
+            return pa.int64()
+        if values and isinstance(values[0], float):
+            return pa.float64()
+        return pa.string()
+
+    def close(self):
+        """
+        Write the last row groups and close the files.
+        """
+        for sheet in list(self._rows):
+            self._write_row_group(sheet)
+        if not self._open:
+            self._write_row_group(next(iter(self.sheets)))
+        for writer in self._open.values():
+            writer.close()
+
+
+# Map the report formats (config.NETWORK_REPORT_FORMAT) to the writer classes
+REPORT_WRITERS = {
+    "xlsx": ExcelRowWriter,
+    "csv": CsvRowWriter,
+    "parquet": ParquetRowWriter,
+}
+
+
+def report_path(filename: str, output_format: str = None) -> str:
+    """
+    Give a report name the extension of its format.
+
+    Args:
+    filename (str): Name of the report, e.g. config.NETWORK_ANALYSIS_FILE
+    output_format (str): "xlsx", "csv" or "parquet", Defaults to config.NETWORK_REPORT_FORMAT
+
+    Returns:
+    str: The name, e.g. network_analysis.csv for network_analysis.xlsx in the CSV format
+    """
+    output_format = output_format or config.NETWORK_REPORT_FORMAT
+    if output_format not in REPORT_WRITERS:
+        raise ValueError(f"Unknown report format '{output_format}', Choose one of {', '.join(REPORT_WRITERS)}")
+    return os.path.splitext(filename)[0] + REPORT_WRITERS[output_format].extension
+
+
+def create_report_writer(filename: str, sheets: Dict[str, List[str]], output_format: str = None) -> ReportWriter:
+    """
+    Create the report writer of the format selected in config.py.
+
+    Args:
+    filename (str): Name of the report, Its extension is replaced by the one of the format
+    sheets (dict): Columns of every sheet, By sheet name, The first one is the main sheet
+    output_format (str): "xlsx", "csv" or "parquet", Defaults to config.NETWORK_REPORT_FORMAT
+
+    Returns:
+    ReportWriter: The writer, Its filename is the path of the main file
+    """
+    output_format = output_format or config.NETWORK_REPORT_FORMAT
+    return REPORT_WRITERS[output_format](report_path(filename, output_format), sheets)
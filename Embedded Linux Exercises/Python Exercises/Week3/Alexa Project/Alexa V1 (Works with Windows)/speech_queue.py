@@ -0,0 +1,217 @@
+import heapq  # For the priority queue of the phrases
+import itertools  # For keeping the phrases of the same priority in order
+import threading  # For the synthesis and playback threads
+import time  # For the wait timeouts
+
+
+
+
+
+
+
+
+class Utterance:
+    """
+    A phrase waiting in the speech queue.
+    """
+    def __init__(self, text: str, lang: str, priority: int):
+        """
+        Initialize the phrase.
+
+        Args:
+        text (str): The phrase
+        lang (str): Its language
+        priority (int): Its priority, Lower is spoken first
+        """
+        self.text = text
+        self.lang = lang
+        self.priority = priority
+        self.audio = None  # Result of engine.prepare()
+        self.error = None  # Exception raised by engine.prepare()
+        self.preparing = False  # Picked up by the synthesis thread
+        self.prepared = threading.Event()  # Set when audio or error is available
+        self.done = threading.Event()  # Set when the phrase was spoken, dropped or failed
+        self.cancelled = False  # Dropped by interrupt()
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Wait until the phrase was spoken (or dropped).
+
+        Args:
+        timeout (float): Seconds to wait, None waits forever
+
+        Returns:
+        bool: True if the phrase is done, False on timeout
+        """
+        return self.done.wait(timeout)
+
+
+class SpeechQueue:
+    """
+    Asynchronous speech output in front of a text-to-speech engine.
+    speak() only queues the phrase and returns, So a command handler keeps working (network requests, file I/O...)
+    while the assistant talks. A playback thread speaks the phrases in priority order, and a synthesis thread prepares
+    the next phrases (e.g. downloads the gTTS audio) while the current one is still playing.
+    interrupt() drops the queued phrases and cuts the current one (barge-in), flush() waits until everything was said.
+    speaking is set from the first queued phrase until the queue is empty, So the microphone can ignore the assistant.
+
+    The engine needs prepare(text, lang), play(audio, lang) and stop(), like the TextToSpeech classes of Alexa.py.
+    """
+    HIGH = 0  # Prompts the user has to hear first
+    NORMAL = 1
+    LOW = 2  # Long informational readouts
+
+    def __init__(self, engine, lookahead: int = 2):
+        """
+        Initialize the queue and start its threads.
+
+        Args:
+        engine: The text-to-speech engine
+        lookahead (int): Number of phrases prepared ahead of the one playing
+        """
+        self.engine = engine
+        self.lookahead = lookahead
+        self._condition = threading.Condition()
+        self._heap = []  # (priority, sequence, utterance)
+        self._sequence = itertools.count()
+        self._current = None  # Utterance being played
+        self._closed = False
+        self.speaking = threading.Event()  # Set while phrases are queued or playing
+        self._synthesizer = threading.Thread(target=self._synthesize_loop, name="tts-synthesizer", daemon=True)
+        self._player = threading.Thread(target=self._play_loop, name="tts-player", daemon=True)
+        self._synthesizer.start()
+        self._player.start()
+
+    def speak(self, text: str, lang: str = 'en', priority: int = NORMAL) -> Utterance:
+        """
+        Queue a phrase and return immediately.
+
+        Args:
+        text (str): The phrase
+        lang (str): Its language
+        priority (int): HIGH, NORMAL or LOW, Phrases of the same priority are spoken in order
+
+        Returns:
+        Utterance: The queued phrase, Its wait() blocks until it was spoken
+        """
+        utterance = Utterance(text, lang, priority)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The speech queue is closed")
+            heapq.heappush(self._heap, (priority, next(self._sequence), utterance))
+            self.speaking.set()
+            self._condition.notify_all()
+        return utterance
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Wait until every queued phrase was spoken, For callers that need the speech to end first (e.g. before exiting).
+
+        Args:
+        timeout (float): Seconds to wait, None waits forever
+
+        Returns:
+        bool: True if the queue is empty, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._heap or self._current is not None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def interrupt(self):
+        """
+        Barge-in: drop every queued phrase and stop the one being played.
+        """
+        with self._condition:
+            dropped = [utterance for _, _, utterance in self._heap]
+            self._heap.clear()
+            if self._current is None:
+                self.speaking.clear()
+            current = self._current
+            for utterance in dropped + ([current] if current is not None else []):
+                utterance.cancelled = True
+            self._condition.notify_all()
+        for utterance in dropped:
+            utterance.done.set()
+        if current is not None:
+            self.engine.stop()  # play() returns early, The playback thread then marks the phrase as done
+
+    def close(self, timeout: float = None):
+        """
+        Say the queued phrases and stop the threads.
+
+        Args:
+        timeout (float): Seconds to wait for the queued phrases
+        """
+        self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def _next_to_prepare(self):
+        """
+        Pick the phrase to synthesize next: the one being played if it isn't prepared yet, otherwise the most urgent
+        queued one within the lookahead. Must be called with the condition held.
+
+        Returns:
+        Utterance: The phrase, or None if nothing has to be prepared now
+        """
+        candidates = [self._current] if self._current is not None else []
+        candidates += [utterance for _, _, utterance in sorted(self._heap)[:self.lookahead]]
+        for utterance in candidates:
+            if not utterance.preparing:
+                return utterance
+        return None
+
+    def _synthesize_loop(self):
+        """
+        Body of the synthesis thread: prepare the next phrases while the current one plays.
+        """
+        while True:
+            with self._condition:
+                utterance = self._next_to_prepare()
+                while utterance is None and not self._closed:
+                    self._condition.wait()
+                    utterance = self._next_to_prepare()
+                if utterance is None:
+                    return
+                utterance.preparing = True
+            try:
+                utterance.audio = self.engine.prepare(utterance.text, utterance.lang)
+            except Exception as e:  # Reported by the playback thread, in order
+                utterance.error = e
+            utterance.prepared.set()
+            with self._condition:
+                self._condition.notify_all()
+
+    def _play_loop(self):
+        """
+        Body of the playback thread: speak the phrases one at a time, in priority order.
+        """
+        while True:
+            with self._condition:
+                while not self._heap and not self._closed:
+                    self._condition.wait()
+                if not self._heap:
+                    return
+                _, _, utterance = heapq.heappop(self._heap)
+                self._current = utterance
+                self._condition.notify_all()  # The synthesis thread can now look one phrase further
+            utterance.prepared.wait()
+            try:
+                if utterance.error is not None:
+                    print(f"Could not synthesize '{utterance.text}': {utterance.error}")
+                elif not utterance.cancelled:
+                    self.engine.play(utterance.audio, utterance.lang)
+            except Exception as e:  # A failing phrase must not stop the speech output
+                print(f"Could not say '{utterance.text}': {e}")
+            with self._condition:
+                self._current = None
+                if not self._heap:
+                    self.speaking.clear()
+                self._condition.notify_all()
+            utterance.done.set()
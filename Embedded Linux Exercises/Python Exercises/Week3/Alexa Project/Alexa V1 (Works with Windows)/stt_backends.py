@@ -0,0 +1,227 @@
+import json  # For reading the Vosk results
+from abc import ABC, abstractmethod  # For the backend interface
+from typing import Dict, Optional, Type  # For type hints
+
+import config
+
+try:
+    import speech_recognition as sr  # Google Web Speech and CMU Sphinx recognizers
+except ImportError:
+    sr = None
+
+try:
+    import vosk  # Offline Kaldi-based recognizer
+except ImportError:
+    vosk = None
+
+
+
+
+
+
+
+
+class SpeechNotUnderstood(Exception):
+    """
+    The audio was processed but contained no recognizable speech.
+    """
+
+
+class RecognitionFailed(Exception):
+    """
+    The backend couldn't process the audio (no network, missing model, engine error...).
+    """
+
+
+
+
+
+
+
+
+class SpeechToText(ABC):
+    """
+    Abstract base class for speech-to-text backends.
+    Every backend turns 16-bit mono PCM audio into lowercase text, So SpeechRecognizer doesn't depend on one engine.
+    """
+    name = ""  # Name of the backend in config.STT_BACKEND
+
+    @abstractmethod
+    def transcribe(self, audio: bytes, sample_rate: int, sample_width: int = 2) -> str:
+        """
+        Convert audio to text.
+
+        Args:
+        audio (bytes): PCM audio
+        sample_rate (int): Its sample rate
+        sample_width (int): Bytes per sample
+
+        Returns:
+        str: The recognized text in lowercase
+
+        Raises:
+        SpeechNotUnderstood: If no speech was recognized
+        RecognitionFailed: If the backend couldn't process the audio
+        """
+        pass
+
+
+class GoogleSTT(SpeechToText):
+    """
+    Online backend using the Google Web Speech API, Accurate but needs network access.
+    """
+    name = "google"
+
+    def __init__(self):
+        """
+        Initialize the backend.
+        """
+        if sr is None:
+            raise RecognitionFailed("The SpeechRecognition package is not installed")
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, audio: bytes, sample_rate: int, sample_width: int = 2) -> str:
+        """
+        Convert audio to text with Google Web Speech.
+        """
+        try:
+            return self.recognizer.recognize_google(sr.AudioData(audio, sample_rate, sample_width), language=config.LANGUAGE).lower()
+        except sr.UnknownValueError:
+            raise SpeechNotUnderstood()
+        except sr.RequestError as e:
+            raise RecognitionFailed(f"Google Web Speech request failed: {e}")
+
+
+class SphinxSTT(SpeechToText):
+    """
+    Offline backend using CMU Sphinx (pocketsphinx) through speech_recognition, Fast but less accurate.
+    """
+    name = "sphinx"
+
+    def __init__(self):
+        """
+        Initialize the backend.
+        """
+        if sr is None:
+            raise RecognitionFailed("The SpeechRecognition package is not installed")
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, audio: bytes, sample_rate: int, sample_width: int = 2) -> str:
+        """
+        Convert audio to text with CMU Sphinx.
+        """
+        try:
+            return self.recognizer.recognize_sphinx(sr.AudioData(audio, sample_rate, sample_width), language=config.LANGUAGE).lower()
+        except sr.UnknownValueError:
+            raise SpeechNotUnderstood()
+        except sr.RequestError as e:  # pocketsphinx or the language data is missing
+            raise RecognitionFailed(f"Sphinx failed: {e}")
+
+
+class VoskSTT(SpeechToText):
+    """
+    Offline backend using Vosk (Kaldi), Works on air-gapped machines with a model downloaded once.
+    The model is loaded once, Only a light recognizer object is created per utterance.
+    """
+    name = "vosk"
+
+    def __init__(self, model_path: str = None):
+        """
+        Initialize the backend.
+
+        Args:
+        model_path (str): Directory of the Vosk model, Defaults to config.VOSK_MODEL_PATH
+        """
+        if vosk is None:
+            raise RecognitionFailed("The vosk package is not installed")
+        try:
+            vosk.SetLogLevel(-1)  # Kaldi is very chatty
+            self.model = vosk.Model(model_path or config.VOSK_MODEL_PATH)
+        except Exception as e:  # Vosk raises a bare Exception for a missing or broken model
+            raise RecognitionFailed(f"Can't load the Vosk model from {model_path or config.VOSK_MODEL_PATH}: {e}")
+
+    def transcribe(self, audio: bytes, sample_rate: int, sample_width: int = 2) -> str:
+        """
+        Convert audio to text with Vosk.
+        """
+        if sample_width != 2:
+            raise RecognitionFailed("Vosk needs 16-bit audio")
+        recognizer = vosk.KaldiRecognizer(self.model, sample_rate)
+        recognizer.AcceptWaveform(audio)
+        text = json.loads(recognizer.FinalResult()).get("text", "")
+        if not text:
+            raise SpeechNotUnderstood()
+        return text.lower()
+
+
+class FallbackSTT(SpeechToText):
+    """
+    Use a primary backend and switch to a fallback (normally offline) one when the primary fails, e.g. without network.
+    """
+    name = "fallback"
+
+    def __init__(self, primary: SpeechToText, fallback: SpeechToText):
+        """
+        Initialize the chain.
+
+        Args:
+        primary (SpeechToText): Backend tried first
+        fallback (SpeechToText): Backend used when the primary one fails
+        """
+        self.primary = primary
+        self.fallback = fallback
+
+    def transcribe(self, audio: bytes, sample_rate: int, sample_width: int = 2) -> str:
+        """
+        Convert audio to text with the primary backend, or the fallback if it fails.
+        """
+        try:
+            return self.primary.transcribe(audio, sample_rate, sample_width)
+        except RecognitionFailed as e:
+            print(f"{e}, Using the {self.fallback.name} backend")
+            return self.fallback.transcribe(audio, sample_rate, sample_width)
+
+
+
+
+
+
+
+
+# Map backend names (config.STT_BACKEND) to backend classes
+STT_BACKENDS: Dict[str, Type[SpeechToText]] = {
+    GoogleSTT.name: GoogleSTT,
+    SphinxSTT.name: SphinxSTT,
+    VoskSTT.name: VoskSTT,
+}
+
+
+def create_backend(name: str = None, fallback: Optional[str] = None) -> SpeechToText:
+    """
+    Create the speech-to-text backend selected in config.py.
+
+    Args:
+    name (str): Backend name, Defaults to config.STT_BACKEND
+    fallback (str): Backend used when the first one fails, Defaults to config.STT_FALLBACK_BACKEND (None for no fallback)
+
+    Returns:
+    SpeechToText: The backend
+    """
+    name = name or config.STT_BACKEND
+    fallback = config.STT_FALLBACK_BACKEND if fallback is None else fallback
+    if name not in STT_BACKENDS:
+        raise ValueError(f"Unknown speech-to-text backend '{name}', Choose one of {', '.join(STT_BACKENDS)}")
+    try:
+        backend = STT_BACKENDS[name]()
+    except RecognitionFailed as e:
+        if not fallback or fallback == name:
+            raise
+        print(f"{e}, Using the {fallback} backend")
+        return STT_BACKENDS[fallback]()
+    if not fallback or fallback == name:
+        return backend
+    try:
+        return FallbackSTT(backend, STT_BACKENDS[fallback]())
+    except RecognitionFailed as e:  # The fallback isn't installed, Keep the primary backend alone
+        print(f"The {fallback} fallback backend is not available: {e}")
+        return backend
@@ -0,0 +1,168 @@
+import hashlib  # For the content-addressed file names
+import json  # For a stable encoding of the cache key
+import os  # For the cache files
+import threading  # For sharing the cache between the speaking and the pre-warming threads
+import time  # For the last use of the cached files
+from typing import Callable, Dict, Optional, Tuple  # For type hints
+
+
+
+
+
+
+
+
+class TTSCache:
+    """
+    Content-addressed on-disk cache of synthesized speech.
+    Every phrase is stored under a hash of (text, language, engine settings), So a repeated phrase is played from disk
+    without synthesizing it again. The least recently used files are evicted when the cache grows above its size cap.
+    """
+    def __init__(self, directory: str, max_bytes: int, extension: str = ".mp3"):
+        """
+        Initialize the cache, Indexing the files already on disk.
+
+        Args:
+        directory (str): Directory of the cached audio files
+        max_bytes (int): Size cap of the cache
+        extension (str): Extension of the audio files
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[int, float]] = {}  # Key -> (size, last use), Ordered from least to most recently used
+        os.makedirs(directory, exist_ok=True)
+        files = []
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith(extension):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name[:-len(extension)], stat.st_size))
+            elif entry.is_file() and entry.name.endswith(".tmp"):
+                os.remove(entry.path)  # Left over by a crash during a write
+        for last_use, key, size in sorted(files):
+            self._entries[key] = (size, last_use)
+        self._size = sum(size for size, _ in self._entries.values())
+
+    @staticmethod
+    def key(text: str, **settings) -> str:
+        """
+        Compute the cache key of a phrase.
+
+        Args:
+        text (str): The phrase
+        settings: Everything else that changes the audio (language, engine, speed...)
+
+        Returns:
+        str: The key
+        """
+        return hashlib.sha256(json.dumps([text, settings], sort_keys=True).encode('utf-8')).hexdigest()
+
+    def path(self, key: str) -> str:
+        """
+        Get the path of the file of a key.
+
+        Args:
+        key (str): The key
+
+        Returns:
+        str: The path
+        """
+        return os.path.join(self.directory, key + self.extension)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a phrase and mark it as recently used.
+
+        Args:
+        key (str): The key
+
+        Returns:
+        str: Path of the audio file, or None if the phrase isn't cached
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or not os.path.exists(self.path(key)):
+                if entry is not None:  # Deleted from outside
+                    self._size -= entry[0]
+                self.misses += 1
+                return None
+            self._entries[key] = (entry[0], time.time())  # Move to the most recently used end
+            self.hits += 1
+        try:
+            os.utime(self.path(key))  # The modification time is the last use, So the LRU order survives a restart
+        except OSError:
+            pass
+        return self.path(key)
+
+    def put(self, key: str, write: Callable[[str], None]) -> str:
+        """
+        Add a phrase to the cache, Through a temporary file so a half-written file is never played.
+
+        Args:
+        key (str): The key
+        write (callable): Function writing the audio to the path it is given
+
+        Returns:
+        str: Path of the cached audio file
+        """
+        temporary_path = f"{self.path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            write(temporary_path)
+            os.replace(temporary_path, self.path(key))
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)  # Don't leave a partial file behind (e.g. no network during the synthesis)
+            raise
+        size = os.path.getsize(self.path(key))
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            self._size += size - (previous[0] if previous else 0)
+            self._entries[key] = (size, time.time())
+            self._evict(keep=key)
+        return self.path(key)
+
+    def get_or_create(self, key: str, write: Callable[[str], None]) -> str:
+        """
+        Look up a phrase, Synthesizing and caching it on a miss.
+
+        Args:
+        key (str): The key
+        write (callable): Function writing the audio to the path it is given
+
+        Returns:
+        str: Path of the cached audio file
+        """
+        return self.get(key) or self.put(key, write)
+
+    def _evict(self, keep: str):
+        """
+        Remove the least recently used files until the cache fits its size cap.
+
+        Args:
+        keep (str): Key that must not be evicted (the one just added)
+        """
+        for key in list(self._entries):
+            if self._size <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass
+            except OSError:  # Still playing (Windows locks open files), Try again next time
+                continue
+            self._size -= self._entries.pop(key)[0]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache counters.
+
+        Returns:
+        dict: Hits, misses, number of files and total size
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'files': len(self._entries), 'bytes': self._size}
@@ -0,0 +1,428 @@
+import argparse  # For the enrollment options
+import functools  # For caching the mel filterbanks
+import glob  # For finding the template recordings
+import os  # For building the template paths
+import time  # For the follow-up window after a lone wake word
+import wave  # For reading and writing the WAV templates
+from abc import ABC, abstractmethod  # For the detector interface
+from typing import List, Optional, Tuple  # For type hints
+
+import numpy as np  # For the spectral features and the DTW
+
+import config
+
+
+
+
+
+
+
+
+def read_wav(path: str) -> Tuple[bytes, int]:
+    """
+    Read a 16-bit mono WAV file.
+
+    Args:
+    path (str): Path of the WAV file
+
+    Returns:
+    tuple: The PCM audio and its sample rate
+    """
+    with wave.open(path, 'rb') as file:
+        if file.getsampwidth() != 2 or file.getnchannels() != 1:
+            raise ValueError(f"{path} must be 16-bit mono audio")
+        return file.readframes(file.getnframes()), file.getframerate()
+
+
+def write_wav(path: str, audio: bytes, sample_rate: int):
+    """
+    Write 16-bit mono PCM audio to a WAV file.
+
+    Args:
+    path (str): Path of the WAV file
+    audio (bytes): The PCM audio
+    sample_rate (int): Its sample rate
+    """
+    with wave.open(path, 'wb') as file:
+        file.setnchannels(1)
+        file.setsampwidth(2)
+        file.setframerate(sample_rate)
+        file.writeframes(audio)
+
+
+
+
+
+
+
+
+@functools.lru_cache(maxsize=8)
+def mel_filterbank(sample_rate: int, n_fft: int, bands: int) -> np.ndarray:
+    """
+    Build triangular mel filters up to 8 kHz, So audio captured at different sample rates gives comparable features.
+
+    Args:
+    sample_rate (int): Sample rate of the audio
+    n_fft (int): FFT size
+    bands (int): Number of mel bands
+
+    Returns:
+    np.ndarray: bands x (n_fft // 2 + 1) filter weights
+    """
+    def to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def to_hz(mel):
+        return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+    edges = to_hz(np.linspace(to_mel(80.0), to_mel(min(8000.0, sample_rate / 2)), bands + 2))
+    bins = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+    filters = np.zeros((bands, len(bins)), dtype=np.float32)
+    for band in range(bands):
+        low, center, high = edges[band], edges[band + 1], edges[band + 2]
+        filters[band] = np.clip(np.minimum((bins - low) / (center - low), (high - bins) / (high - center)), 0.0, None)
+    return filters
+
+
+def log_mel_features(audio: bytes, sample_rate: int, frame_ms: int = 25, hop_ms: int = 10, bands: int = 20) -> np.ndarray:
+    """
+    Compute the log-mel spectrum of every frame, With the mean of each frame removed so the loudness doesn't matter.
+
+    Args:
+    audio (bytes): 16-bit PCM audio
+    sample_rate (int): Its sample rate
+    frame_ms (int): Analysis window
+    hop_ms (int): Step between frames
+    bands (int): Number of mel bands
+
+    Returns:
+    np.ndarray: frames x bands features
+    """
+    samples = np.frombuffer(audio[:len(audio) - len(audio) % 2], dtype='<i2').astype(np.float32)
+    frame, hop = sample_rate * frame_ms // 1000, sample_rate * hop_ms // 1000
+    if len(samples) < frame:
+        return np.zeros((0, bands), dtype=np.float32)
+    count = 1 + (len(samples) - frame) // hop
+    frames = samples[np.arange(frame)[None, :] + hop * np.arange(count)[:, None]] * np.hanning(frame).astype(np.float32)
+    n_fft = 1 << (frame - 1).bit_length()
+    power = np.abs(np.fft.rfft(frames, n_fft)) ** 2
+    features = np.log(power @ mel_filterbank(sample_rate, n_fft, bands).T + 1.0)
+    return features - features.mean(axis=1, keepdims=True)
+
+
+def subsequence_dtw(template: np.ndarray, utterance: np.ndarray) -> Tuple[float, int]:
+    """
+    Find where the template fits best inside the utterance, With dynamic time warping.
+    The match may start and end anywhere in the utterance, and the local slope is kept between 1/2 and 2 so a word
+    can be spoken up to twice as fast or as slow as the template.
+
+    Args:
+    template (np.ndarray): m x bands features of the wake word
+    utterance (np.ndarray): n x bands features of the utterance
+
+    Returns:
+    tuple: The mean distance per template frame and the utterance frame where the match ends
+    """
+    cost = np.sqrt(((template[:, None, :] - utterance[None, :, :]) ** 2).sum(axis=2))  # m x n frame distances
+    previous2 = None
+    previous = cost[0].copy()  # Free start: the match can begin at any utterance frame
+    for row in range(1, len(template)):
+        best = np.full(len(previous), np.inf)
+        best[1:] = previous[:-1]  # Step (1, 1)
+        best[2:] = np.minimum(best[2:], previous[:-2])  # Step (1, 2): the utterance is slower
+        if previous2 is not None:
+            best[1:] = np.minimum(best[1:], previous2[:-1] + cost[row - 1, 1:])  # Step (2, 1): the utterance is faster
+        previous2, previous = previous, cost[row] + best
+    end = int(np.argmin(previous))
+    return float(previous[end]) / len(template), end
+
+
+
+
+
+
+
+
+class WakeWordDetector(ABC):
+    """
+    Abstract base class for wake-word detectors.
+    A detector looks for the wake word in an utterance and tells where it ends, So only the rest is sent to the
+    (slow, online) speech recognizer.
+    """
+    @abstractmethod
+    def detect(self, audio: bytes, sample_rate: int) -> Optional[int]:
+        """
+        Look for the wake word in an utterance.
+
+        Args:
+        audio (bytes): 16-bit PCM audio of the utterance
+        sample_rate (int): Its sample rate
+
+        Returns:
+        int: Byte offset just after the wake word, or None if the wake word wasn't heard
+        """
+        pass
+
+
+class TemplateWakeWordDetector(WakeWordDetector):
+    """
+    Small offline keyword model: a few recordings of the wake word matched against the start of every utterance.
+    The recordings are made once with `python wake_word.py --enroll`, Nothing is sent over the network.
+    """
+    def __init__(self, templates: List[np.ndarray], threshold: float = None, search_seconds: float = None,
+                 hop_ms: int = 10, frame_ms: int = 25):
+        """
+        Initialize the detector.
+
+        Args:
+        templates (list): Features of the wake word recordings
+        threshold (float): Highest DTW distance accepted as the wake word, Defaults to config.WAKE_WORD_THRESHOLD
+        search_seconds (float): Only this much of the start of an utterance is searched, Defaults to config.WAKE_WORD_SEARCH_SECONDS
+        hop_ms (int): Step between feature frames
+        frame_ms (int): Analysis window of the feature frames
+        """
+        if not templates:
+            raise ValueError("At least one wake word template is needed")
+        self.templates = templates
+        self.threshold = config.WAKE_WORD_THRESHOLD if threshold is None else threshold
+        self.search_seconds = config.WAKE_WORD_SEARCH_SECONDS if search_seconds is None else search_seconds
+        self.hop_ms = hop_ms
+        self.frame_ms = frame_ms
+        self.min_frames = min(len(template) for template in templates) // 2  # Anything shorter can't contain the wake word
+
+    @classmethod
+    def from_directory(cls, directory: str, **options) -> 'TemplateWakeWordDetector':
+        """
+        Load the wake word recordings (*.wav) of a directory.
+
+        Args:
+        directory (str): Directory of the recordings
+        options: Other arguments of the constructor
+
+        Returns:
+        TemplateWakeWordDetector: The detector
+        """
+        templates = []
+        for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+            audio, sample_rate = read_wav(path)
+            templates.append(log_mel_features(trim_silence(audio, sample_rate), sample_rate))
+        return cls(templates, **options)
+
+    def score(self, audio: bytes, sample_rate: int) -> Tuple[float, int]:
+        """
+        Compute how well the best template matches the start of an utterance.
+
+        Args:
+        audio (bytes): 16-bit PCM audio
+        sample_rate (int): Its sample rate
+
+        Returns:
+        tuple: The lowest DTW distance (inf if the utterance is too short) and the byte offset where that match ends
+        """
+        window = audio[:int(self.search_seconds * sample_rate) * 2]  # The wake word opens the utterance, Don't analyse the command after it
+        features = log_mel_features(window, sample_rate, self.frame_ms, self.hop_ms)
+        if len(features) < max(self.min_frames, 1):
+            return float('inf'), 0
+        best_distance, best_end = float('inf'), 0
+        for template in self.templates:
+            distance, end = subsequence_dtw(template, features)
+            if distance < best_distance:
+                best_distance, best_end = distance, end
+        hop, frame = sample_rate * self.hop_ms // 1000, sample_rate * self.frame_ms // 1000
+        return best_distance, (best_end * hop + frame) * 2
+
+    def detect(self, audio: bytes, sample_rate: int) -> Optional[int]:
+        """
+        Look for the wake word at the start of an utterance.
+
+        Args:
+        audio (bytes): 16-bit PCM audio of the utterance
+        sample_rate (int): Its sample rate
+
+        Returns:
+        int: Byte offset just after the wake word, or None if the wake word wasn't heard
+        """
+        distance, end = self.score(audio, sample_rate)
+        return end if distance <= self.threshold else None
+
+
+
+
+
+
+
+
+def frame_energies(audio: bytes, sample_rate: int, frame_ms: int = 30) -> np.ndarray:
+    """
+    Compute the RMS energy of consecutive frames.
+
+    Args:
+    audio (bytes): 16-bit PCM audio
+    sample_rate (int): Its sample rate
+    frame_ms (int): Frame length
+
+    Returns:
+    np.ndarray: Energy of every whole frame
+    """
+    frame = sample_rate * frame_ms // 1000
+    samples = np.frombuffer(audio[:len(audio) - len(audio) % 2], dtype='<i2').astype(np.float32)
+    count = len(samples) // frame
+    return np.sqrt((samples[:count * frame].reshape(count, frame) ** 2).mean(axis=1)) if count else np.zeros(0)
+
+
+def trim_silence(audio: bytes, sample_rate: int, ratio: float = 3.0) -> bytes:
+    """
+    Cut the silence before and after a recording, So a template only contains the wake word.
+
+    Args:
+    audio (bytes): 16-bit PCM audio
+    sample_rate (int): Its sample rate
+    ratio (float): A frame is speech when it is this many times louder than the quietest frames
+
+    Returns:
+    bytes: The trimmed audio
+    """
+    energies = frame_energies(audio, sample_rate)
+    if not len(energies):
+        return audio
+    speech = np.nonzero(energies > max(np.percentile(energies, 10) * ratio, 1.0))[0]
+    if not len(speech):
+        return audio
+    frame_bytes = sample_rate * 30 // 1000 * 2
+    return audio[speech[0] * frame_bytes:(speech[-1] + 1) * frame_bytes]
+
+
+
+
+
+
+
+
+class WakeWordGate:
+    """
+    Local gate in front of the online recognizer.
+    Utterances that don't start with the wake word are dropped without any network round-trip. When the wake word is
+    followed by a command, only the command audio is passed on. When it is said alone ("Alexa" ... "what time is it"),
+    the next utterance within config.WAKE_WORD_FOLLOW_UP_SECONDS is passed on whole.
+    """
+    def __init__(self, detector: WakeWordDetector, follow_up_seconds: float = None, min_command_seconds: float = 0.2):
+        """
+        Initialize the gate.
+
+        Args:
+        detector (WakeWordDetector): The wake word detector
+        follow_up_seconds (float): How long a lone wake word keeps the gate open, Defaults to config.WAKE_WORD_FOLLOW_UP_SECONDS
+        min_command_seconds (float): Speech needed after the wake word to count as a command
+        """
+        self.detector = detector
+        self.follow_up_seconds = config.WAKE_WORD_FOLLOW_UP_SECONDS if follow_up_seconds is None else follow_up_seconds
+        self.min_command_seconds = min_command_seconds
+        self._open_until = 0.0
+        self.passed = 0  # Utterances sent to the recognizer
+        self.dropped = 0  # Utterances without the wake word
+
+    @classmethod
+    def from_config(cls) -> Optional['WakeWordGate']:
+        """
+        Build the gate for config.WAKE_WORD from its recordings in config.WAKE_WORD_TEMPLATE_DIR.
+
+        Returns:
+        WakeWordGate: The gate, or None if the gate is disabled or the wake word wasn't enrolled yet
+        """
+        if not config.WAKE_WORD_GATE:
+            return None
+        directory = os.path.join(config.WAKE_WORD_TEMPLATE_DIR, config.WAKE_WORD)
+        if not glob.glob(os.path.join(directory, "*.wav")):
+            print(f"No recordings of '{config.WAKE_WORD}' in {directory}, Every utterance goes to the recognizer. Run 'python wake_word.py --enroll' first.")
+            return None
+        return cls(TemplateWakeWordDetector.from_directory(directory))
+
+    @property
+    def is_open(self) -> bool:
+        """
+        True while a lone wake word is waiting for its command.
+        """
+        return time.monotonic() < self._open_until
+
+    def _has_speech(self, audio: bytes, reference: bytes, sample_rate: int) -> bool:
+        """
+        Check if there is enough speech in the audio after the wake word.
+
+        Args:
+        audio (bytes): Audio after the wake word
+        reference (bytes): The whole utterance, Its quietest frames give the noise level
+        sample_rate (int): The sample rate
+
+        Returns:
+        bool: True if the audio contains a command
+        """
+        energies = frame_energies(audio, sample_rate)
+        noise = np.percentile(frame_energies(reference, sample_rate), 10) if len(energies) else 0.0
+        speech_frames = int((energies > max(noise * 3.0, 1.0)).sum())
+        return speech_frames * 0.03 >= self.min_command_seconds
+
+    def process(self, audio: bytes, sample_rate: int) -> Optional[bytes]:
+        """
+        Decide what part of an utterance goes to the recognizer.
+
+        Args:
+        audio (bytes): 16-bit PCM audio of the utterance
+        sample_rate (int): Its sample rate
+
+        Returns:
+        bytes: The audio to recognize, or None if the utterance must not be recognized
+        """
+        if self.is_open:  # The command following a lone wake word
+            self._open_until = 0.0
+            self.passed += 1
+            return audio
+        end = self.detector.detect(audio, sample_rate)
+        if end is None:
+            self.dropped += 1
+            return None
+        command = audio[end:]
+        if self._has_speech(command, audio, sample_rate):
+            self.passed += 1
+            return command
+        self._open_until = time.monotonic() + self.follow_up_seconds  # Wake word alone, Wait for the command
+        return None
+
+
+
+
+
+
+
+
+def main():
+    """
+    Record the wake word a few times, So the gate can recognize it offline.
+    """
+    from audio_capture import ContinuousListener  # Only needed for the enrollment
+
+    parser = argparse.ArgumentParser(description=f"Record the wake word '{config.WAKE_WORD}' for the offline wake word gate.")
+    parser.add_argument('--enroll', type=int, nargs='?', const=3, metavar='COUNT',
+                        help="Record the wake word, COUNT times (3 by default).")
+    args = parser.parse_args()
+    if args.enroll is None:
+        parser.print_help()
+        return
+
+    directory = os.path.join(config.WAKE_WORD_TEMPLATE_DIR, config.WAKE_WORD)
+    os.makedirs(directory, exist_ok=True)
+    listener = ContinuousListener()
+    listener.start()
+    try:
+        for number in range(1, args.enroll + 1):
+            print(f"Say '{config.WAKE_WORD}' ({number}/{args.enroll})...")
+            voice = listener.get()
+            path = os.path.join(directory, f"{config.WAKE_WORD}_{int(time.time())}_{number}.wav")
+            write_wav(path, trim_silence(voice.frame_data, voice.sample_rate), voice.sample_rate)
+            print(f"Saved {path}")
+    finally:
+        listener.stop()
+
+
+# Entry point for the enrollment
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,27 @@
+import argparse  # Import argparse for the command line options (e.g. batch mode)
+import atexit  # Import atexit for flushing the log queue when the program exits
+import bisect  # Import bisect for searching the sorted secondary indexes
 import csv  # Import the csv module for handling CSV file operations
+import io  # Import io for parsing in-memory text with the csv module
+import json  # Import json for reading JSON-lines batch files
 import logging  # Import the logging module for logging information and errors
-from typing import List, Optional, Dict, Any  # Import typing helpers to specify the type of elements, which helps in improving readability and early detection of type-related errors during development.
+import mmap  # Import mmap for loading binary snapshots without reading them
+import os  # Import os for file metadata and atomic file replacement
+import queue  # Import queue for handing log records to the background log writer
+import sqlite3  # Import sqlite3 for the SQLite storage backend
+import struct  # Import struct for the fixed-size records of the binary snapshot format
+import sys  # Import sys for interning repeated strings
+import time  # Import time for measuring the batch throughput
+from array import array  # Import array for compact typed columns
+from itertools import compress  # Import compress for selecting row positions with a mask
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler  # Import the handlers of the non-blocking, size-rotated logging pipeline
+from contextlib import contextmanager  # Import contextmanager for the with-statement lock helpers
+from typing import List, Optional, Dict, Any, Type, Iterable, Iterator, Callable, Tuple  # Import typing helpers to specify the type of elements, which helps in improving readability and early detection of type-related errors during development.
 from abc import ABC, abstractmethod  # Import ABC and abstractmethod for creating abstract base classes
+try:
+    import fcntl  # Import fcntl for advisory file locks between processes (POSIX only)
+except ImportError:  # Windows doesn't have fcntl, The database is then used without file locking
+    fcntl = None
 #Example to understand role of abstractmethod:
 """
 from abc import ABC, abstractmethod
@@ -40,6 +60,24 @@ print("Circle Area:", circle.area())  # Output: Circle Area: 28.26
 CONFIG = {
     'DATABASE_PATH': 'employees_database.csv',  # Path to the CSV file for storing employee data
     'LOG_FILE': 'employee_management.log',  # Path to the log file for logging
+    'LOG_MAX_BYTES': 10 * 1024 * 1024,  # The log file is rotated when it reaches this size
+    'LOG_BACKUP_COUNT': 5,  # Number of rotated log files kept (employee_management.log.1 ... .5)
+    'STORAGE_BACKEND': 'journaled',  # Storage backend used by DatabaseManager, 'csv' rescans the file on every operation, 'indexed' keeps an in-memory ID index, 'journaled' adds an append-only log on top of the index, 'sqlite' stores the employees in a SQLite file
+    'JOURNAL_SUFFIX': '.journal',  # The journal of the 'journaled' backend is stored next to the database file with this suffix
+    'JOURNAL_COMPACTION_THRESHOLD': 1000,  # Number of journal entries after which the journal is folded into the CSV file
+    'JOURNAL_FSYNC': True,  # Force every journal entry to disk, So a crash can't lose an acknowledged mutation
+    'ID_SIDECAR_SUFFIX': '.ids',  # The highest employee ID handed out so far is stored next to the database file with this suffix
+    'SQLITE_SUFFIX': '.sqlite3',  # The SQLite file of the 'sqlite' backend is stored next to the CSV file with this extension
+    'SQLITE_BATCH_SIZE': 5000,  # Number of rows per executemany() batch in multi-row operations
+    'SQLITE_BUSY_TIMEOUT': 5.0,  # Seconds to wait for a lock held by another process before failing
+    'LOCK_SUFFIX': '.lock',  # The advisory lock file shared by all processes using the database is stored next to it with this suffix
+    'CACHE_ENABLED': True,  # Keep the parsed table in memory in DatabaseManager, Revalidated against the file modification time and size on every access
+    'SERVICE_HOST': '127.0.0.1',  # Address the HTTP/JSON service listens on (employee_service.py), Local tools only by default
+    'SERVICE_PORT': 8080,  # Port the HTTP/JSON service listens on
+    'SERVICE_KEEPALIVE_TIMEOUT': 15.0,  # Seconds an idle keep-alive connection of the HTTP/JSON service stays open
+    'REPORT_CHUNK_SIZE': 10000,  # Rows per chunk read by the streaming payroll report (payroll_report.py)
+    'REPORT_TDIGEST_COMPRESSION': 100,  # Accuracy of the payroll report percentiles, Each job title keeps at most about this many t-digest centroids
+    'HISTORY_LIMIT': 100,  # Number of operations kept for undo/redo, Each one stores only the rows it changed
     'INITIAL_EMPLOYEE_DATA': [  # Initial data to populate the database
         ["ID", "Name", "Job Title", "Salary"],  # Header row
         [1, "Ali Mamdouh", "Embedded Linux Engineer", "60000"],  # Example employee data
@@ -53,138 +91,2379 @@ CONFIG = {
 
 
 
-# Initializes the logging system for the application.
-logging.basicConfig(
-    filename = CONFIG['LOG_FILE'],  # Specifies the path to the log file where logs will be written.
-    level = logging.INFO,  # Sets the logging level to INFO, This ensures that only important messages are logged.
-    # Only log messages of level INFO and higher (e.g., WARNING, ERROR, CRITICAL) will be recorded in the log file.
-    # Levels below INFO (like DEBUG) won't be logged.
+# Formatter writing every log record as one JSON object per line, So the log can be filtered and aggregated by tools instead of parsed with regexes.
+# Structured fields passed with extra={...} (e.g. the operation, the employee and the phase timings) become JSON fields.
+class JsonFormatter(logging.Formatter):
+    # Attributes every LogRecord has, Anything else on a record was passed with extra={...}
+    STANDARD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
 
-    format = '%(asctime)s - %(levelname)s - %(message)s'  # Defines the format of each log message.
-    # %(asctime)s: The timestamp of when the log message was created.
-    # %(levelname)s: The level of the log message (e.g., INFO, ERROR).
-    # %(message)s: The actual content of the log message.
-)
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Format a log record as a JSON line.
+
+        The 'log' timing is measured here: it is the time from the creation of the record to its formatting in the listener thread,
+        Which covers handing the record to the queue and waiting in it (the caller only pays for the first part).
+
+        Parameters:
+        record: The log record.
+
+        Returns:
+        The JSON line.
+        """
+        log_ms = round((time.time() - record.created) * 1000, 3)
+        entry: Dict[str, Any] = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + f".{int(record.msecs):03d}",  # The timestamp of when the log record was created
+            'level': record.levelname,  # The level of the log record (e.g. INFO, ERROR)
+            'message': record.getMessage(),  # The actual content of the log record
+        }
+        for key, value in vars(record).items():
+            if key not in self.STANDARD_ATTRIBUTES:
+                entry[key] = value
+        if isinstance(entry.get('timings_ms'), dict):
+            entry['timings_ms'] = dict(entry['timings_ms'], log = log_ms)  # Per-operation breakdown: read / mutate / write / log
+        else:
+            entry['log_ms'] = log_ms
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default = str)  # default = str, So an unexpected value type never breaks logging
+
+
+_log_listener: Optional[QueueListener] = None  # The running log listener, Set by configure_logging()
+
+
+# Function to initialize the logging system for the application
+def configure_logging(log_file: Optional[str] = None) -> QueueListener:
+    """
+    Initialize the logging system: a queue-based pipeline that never blocks the caller on file I/O.
+
+    Logging calls only put the record on an in-memory queue (QueueHandler), and a background thread (QueueListener)
+    formats the records as JSON lines and writes them to a size-rotated log file (RotatingFileHandler).
+    The queue is flushed when the program exits.
+
+    Parameters:
+    log_file: Path to the log file (optional), Defaults to CONFIG['LOG_FILE'].
+
+    Returns:
+    The running QueueListener, Calling configure_logging() again returns the same one.
+    """
+    global _log_listener
+    if _log_listener is not None:  # Already configured
+        return _log_listener
+
+    file_handler = RotatingFileHandler(
+        log_file or CONFIG['LOG_FILE'],  # Specifies the path to the log file where logs will be written.
+        maxBytes = CONFIG['LOG_MAX_BYTES'],  # The file is rotated (renamed to .1, .2, ...) when it reaches this size
+        backupCount = CONFIG['LOG_BACKUP_COUNT'],  # Number of rotated files kept, The oldest one is deleted
+        encoding = 'utf-8',
+    )
+    file_handler.setFormatter(JsonFormatter())
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()  # Unbounded and lock-free on the producer side
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)  # Sets the logging level to INFO, So only INFO and higher (WARNING, ERROR, CRITICAL) are recorded
+    root_logger.addHandler(QueueHandler(log_queue))
+
+    _log_listener = QueueListener(log_queue, file_handler, respect_handler_level = True)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)  # Write the records still in the queue before the program exits
+    return _log_listener
+
+
+
+
+# Class for timing the phases of one operation, So the log shows where the time of each add/update/delete goes.
+# Phases: 'read' (looking up data), 'mutate' (in-memory changes), 'write' (storage I/O), and 'log' (measured by JsonFormatter).
+class OperationTimer:
+    def __init__(self, operation: str):
+        """
+        Start timing an operation.
+
+        Parameters:
+        operation: Name of the operation (e.g. 'add'), Written to the log record.
+        """
+        self.operation = operation
+        self.timings: Dict[str, float] = {}  # Phase -> seconds
+        self._phase_start = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        """
+        End the current phase, The time since the previous lap is added to the given phase.
+
+        Parameters:
+        phase: Name of the phase that just ended.
+        """
+        now = time.perf_counter()
+        self.timings[phase] = self.timings.get(phase, 0.0) + now - self._phase_start
+        self._phase_start = now
+
+    def log(self, message: str, level: int = logging.INFO, **fields: Any) -> None:
+        """
+        Log the operation as one structured record with its phase timings.
+
+        Parameters:
+        message: The log message.
+        level: The log level (optional).
+        fields: Additional structured fields (e.g. employee = [...]).
+        """
+        timings_ms = {phase: round(seconds * 1000, 3) for phase, seconds in self.timings.items()}
+        timings_ms['total'] = round(sum(self.timings.values()) * 1000, 3)
+        logging.log(level, message, extra = dict(fields, operation = self.operation, timings_ms = timings_ms))
+
+
+
+
+
+
+# Advisory file lock shared by all processes working on the same database.
+# Readers take a shared lock and writers take an exclusive lock, So several operators can run the program on the same file
+# without a writer losing the rows of another writer. The lock is taken on a separate lock file next to the database,
+# because full rewrites replace the database file by rename (a lock held on the old file would not protect the new one).
+# The lock is reentrant within a process, So a caller holding the exclusive lock can call methods that lock again.
+class FileLock:
+    def __init__(self, lock_path: str):
+        """
+        Initialize the FileLock, The lock file is created on first use.
+
+        Parameters:
+        lock_path: Path to the lock file.
+        """
+        self.lock_path = lock_path
+        self._file = None  # Lock file handle, Kept open so every acquisition is a single flock() call
+        self._depth = 0  # Number of nested acquisitions in this process
+        self._exclusive = False  # Mode of the lock currently held
+        if fcntl is None:
+            logging.warning("fcntl is not available on this platform, Database file locking is disabled")
+
+    def _acquire(self, exclusive: bool) -> None:
+        """
+        Acquire the lock, Blocking until no other process holds a conflicting lock.
+
+        Parameters:
+        exclusive: Take the exclusive (write) lock instead of the shared (read) lock.
+        """
+        if self._depth:  # Already held by this process
+            if exclusive and not self._exclusive:
+                raise RuntimeError("Can't upgrade a shared database lock to an exclusive lock")
+            self._depth += 1
+            return
+        if fcntl is not None:
+            if self._file is None:
+                self._file = open(self.lock_path, 'a')
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        self._exclusive = exclusive
+        self._depth = 1
+
+    def _release(self) -> None:
+        """
+        Release one acquisition of the lock, The lock is given back to the other processes after the outermost one.
+        """
+        self._depth -= 1
+        if self._depth == 0 and self._file is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        """
+        Hold the shared (read) lock for the duration of a with block, Other readers can hold it at the same time.
+        """
+        self._acquire(False)
+        try:
+            yield
+        finally:
+            self._release()
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """
+        Hold the exclusive (write) lock for the duration of a with block, No other process can read or write meanwhile.
+        """
+        self._acquire(True)
+        try:
+            yield
+        finally:
+            self._release()
+
+
+# Function to replace a file atomically
+def write_file_atomically(path: str, write: Callable[[Any], None], binary: bool = False) -> None:
+    """
+    Write a file through a temporary file that is renamed over it, So readers see either the old or the new content, never a half-written file.
+
+    Parameters:
+    path: Path to the file to replace.
+    write: Function writing the new content to the temporary file handle.
+    binary: Open the temporary file in binary mode instead of text mode (optional).
+    """
+    temporary_path = f"{path}.{os.getpid()}.tmp"  # One temporary file per process, So two processes never write to the same one
+    try:
+        with open(temporary_path, 'wb') if binary else open(temporary_path, 'w', newline = '') as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())  # Make sure the content reached the disk before it becomes visible
+        os.replace(temporary_path, path)  # Atomic on POSIX and Windows
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)  # Don't leave the temporary file behind
+        raise
+
+
+
+
+
+
+# Abstract base class for storage backends, So DatabaseManager can switch between storage strategies without changing its callers.
+class StorageBackend(ABC):
+    keeps_table_in_memory = False  # True for backends that already hold the parsed table, So DatabaseManager doesn't cache a second copy
+    supports_row_cache = True  # False for backends with cheap keyed lookups, So DatabaseManager only tracks their signature instead of loading the whole table
+
+    def __init__(self, database_path: str):
+        """
+        Initialize the storage backend with the path to the database file.
+
+        Parameters:
+        database_path: Path to the database file.
+        """
+        self.database_path = database_path
+
+    @abstractmethod
+    def read_all(self) -> List[List[str]]:
+        """
+        Read all rows (header row included) from the storage.
+
+        Returns:
+        List of rows from the database.
+        """
+        pass
+
+    @abstractmethod
+    def write_all(self, data: List[List[Any]]) -> None:
+        """
+        Replace the whole storage content with the given rows (header row included).
+
+        Parameters:
+        data: List of rows to write to the database.
+        """
+        pass
+
+    @abstractmethod
+    def append_row(self, row: List[Any]) -> None:
+        """
+        Append a single row to the storage.
+
+        Parameters:
+        row: The row to append to the database.
+        """
+        pass
+
+    @abstractmethod
+    def get_row(self, employee_id: int) -> Optional[List[str]]:
+        """
+        Get the row of the employee with the given ID.
+
+        Parameters:
+        employee_id: ID of the employee.
+
+        Returns:
+        The employee row, or None if the employee is not found.
+        """
+        pass
+
+    @abstractmethod
+    def update_row(self, employee_id: int, row: List[Any]) -> bool:
+        """
+        Replace the row of the employee with the given ID.
+
+        Parameters:
+        employee_id: ID of the employee to update.
+        row: The new row of the employee.
+
+        Returns:
+        True if the employee was found and updated, False otherwise.
+        """
+        pass
+
+    @abstractmethod
+    def delete_rows(self, employee_ids: Iterable[int]) -> int:
+        """
+        Delete the rows of the employees with the given IDs in one operation.
+        The other employees keep their IDs, and deleted IDs are never handed out again (see IdAllocator).
+
+        Parameters:
+        employee_ids: IDs of the employees to delete.
+
+        Returns:
+        Number of employees that were found and deleted.
+        """
+        pass
+
+    def delete_row(self, employee_id: int) -> bool:
+        """
+        Delete the row of the employee with the given ID.
+
+        Parameters:
+        employee_id: ID of the employee to delete.
+
+        Returns:
+        True if the employee was found and deleted, False otherwise.
+        """
+        return self.delete_rows([employee_id]) == 1
+
+    @abstractmethod
+    def count(self) -> int:
+        """
+        Count the employees in the storage (header row excluded).
+
+        Returns:
+        Number of employees.
+        """
+        pass
+
+    def max_id(self) -> int:
+        """
+        Get the highest employee ID in the storage.
+
+        Returns:
+        The highest employee ID, or 0 if the storage is empty.
+        """
+        return max((int(row[0]) for row in self.read_all()[1:]), default = 0)
+
+    def compact(self) -> None:
+        """
+        Fold any pending changes into the database file, Backends without pending changes have nothing to do.
+        """
+        pass
+
+    def signature(self) -> Any:
+        """
+        Get a cheap fingerprint of the stored data, It changes whenever the data is changed by anyone (e.g. another process).
+
+        Returns:
+        The modification time and size of the database file, or None if it doesn't exist.
+        """
+        try:
+            stat = os.stat(self.database_path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def invalidate(self) -> None:
+        """
+        Forget any in-memory state, Because the stored data was changed by someone else.
+        """
+        pass
+
+
+# Storage backend that keeps everything in the CSV file, So every operation rescans the whole file (O(N) per operation).
+class CsvStorageBackend(StorageBackend):
+    def read_all(self) -> List[List[str]]: #  Indicates that the function returns a list of lists of strings
+        """
+        Read all rows from the database file.
+
+        Returns:
+        List of rows from the database.
+        """
+        try:
+            with open(self.database_path, 'r') as file:
+                # Open the database file in read mode using a context manager (with statement),
+                # ensuring it is properly closed even if an error occurs.
+                return list(csv.reader(file))
+                # Read all rows from the CSV file (`file`) and convert them into a list of lists of strings.
+                # Each inner list corresponds to a row in the CSV file, where each element is a string.
+        except IOError as e:
+            # Catch IOError exceptions, which occur when there's an issue reading the file (e.g., file not found, permissions issue).
+            logging.error(f"Error reading database: {e}")
+            # Log the specific IOError (`e`) encountered while reading the database.
+            return []
+            # Return an empty list if an error occurs during file reading.
+
+    def write_all(self, data: List[List[Any]]) -> None:
+        """
+        Write a list of rows to the database file.
+
+        Parameters:
+        data: List of rows to write to the database. Which is expected to be a list of lists where each inner list contains elements of any type (Any).
+        """
+        try:
+            # The rows are written to a temporary file that replaces the database file in one step, So a reader or a crash never sees a half-written file.
+            # The temporary file is opened with newline = '', to instruct Python to handle the newline character explicitly, For Example:
+            # Linux Systems: It ensures that Python does not translate \n to \r\n.
+            # Windows: It prevents Python from inserting an extra \r before each \n.
+            write_file_atomically(self.database_path, lambda file: csv.writer(file).writerows(data))  # Write all rows to the file,
+            # Where it creates a CSV writer object csv.writer(file) for file, and uses its writerows() method to write all rows from data into the CSV file.
+
+        except IOError as e:  # Catch IOError exceptions, which occur when there's an issue reading the file (e.g., file not found, permissions issue).
+            logging.error(f"Error writing to database: {e}")  # Log the error
+
+    def append_row(self, row: List[Any]) -> None:
+        """
+        Append a single row to the database file.
+
+        Parameters:
+        row: The row to append to the database.
+        """
+        try:
+            with open(self.database_path, 'a', newline = '') as file:  # Open the database file in append mode
+                csv.writer(file).writerow(row)  # Append the row to the file.
+                # Using the csv.writer object created from the file, the writerow() method appends the row list as a new row at the end of the CSV file.
+        except IOError as e:  # Catch IOError exceptions, which occur when there's an issue reading the file (e.g., file not found, permissions issue).
+            logging.error(f"Error appending to database: {e}")  # Log the error
+
+    def get_row(self, employee_id: int) -> Optional[List[str]]:
+        """
+        Get the row of the employee with the given ID by scanning the whole file.
+
+        Parameters:
+        employee_id: ID of the employee.
+
+        Returns:
+        The employee row, or None if the employee is not found.
+        """
+        for row in self.read_all()[1:]:  # Skip header row and iterate through employees
+            if int(row[0]) == employee_id:  # Check if the employee ID matches
+                return row
+        return None
+
+    def update_row(self, employee_id: int, row: List[Any]) -> bool:
+        """
+        Replace the row of the employee with the given ID, Then rewrite the whole file.
+
+        Parameters:
+        employee_id: ID of the employee to update.
+        row: The new row of the employee.
+
+        Returns:
+        True if the employee was found and updated, False otherwise.
+        """
+        rows = self.read_all()  # Read all employees from the database
+        for index in range(1, len(rows)):  # Iterate through employees (skip header row)
+            if int(rows[index][0]) == employee_id:  # Check if the employee ID matches
+                rows[index] = list(row)  # Replace the old row with the new one
+                self.write_all(rows)  # Write the updated employee list to the database
+                return True
+        return False
+
+    def delete_rows(self, employee_ids: Iterable[int]) -> int:
+        """
+        Delete the rows of the employees with the given IDs, Then rewrite the whole file once.
+
+        Parameters:
+        employee_ids: IDs of the employees to delete.
+
+        Returns:
+        Number of employees that were found and deleted.
+        """
+        rows = self.read_all()  # Read all employees from the database
+        if not rows:
+            return 0
+        deleted_ids = set(employee_ids)
+        remaining = [row for row in rows[1:] if int(row[0]) not in deleted_ids]  # Keep every employee except the deleted ones
+        deleted = len(rows) - 1 - len(remaining)
+        if deleted:
+            self.write_all([rows[0]] + remaining)  # Write the header row and the remaining employees to the database
+        return deleted
+
+    def count(self) -> int:
+        """
+        Count the employees by reading the whole file.
+
+        Returns:
+        Number of employees.
+        """
+        return max(len(self.read_all()) - 1, 0)  # Exclude the header row
+
+
+# Storage backend that loads the CSV file once and keeps an in-memory primary-key index (ID -> record).
+# Point lookups and updates are O(1) dictionary operations, The CSV file is still the import/export format
+# and is kept up to date after every mutation (appends stay O(1) on disk, full rewrites happen only when a row changes in place).
+class IndexedStorageBackend(StorageBackend):
+    keeps_table_in_memory = True
+
+    def __init__(self, database_path: str):
+        """
+        Initialize the indexed backend, The CSV file is loaded lazily on first access.
+
+        Parameters:
+        database_path: Path to the CSV database file.
+        """
+        super().__init__(database_path)
+        self._csv = CsvStorageBackend(database_path)  # CSV backend used for the import/export of the file
+        self._header: List[str] = []  # Header row of the CSV file
+        self._rows: Dict[int, List[str]] = {}  # Primary-key index, Dictionaries keep insertion order so the file order is preserved
+        self._loaded = False  # Flag to load the file only once
+        self._signature: Any = None  # Signature of the file(s) the index was loaded from, Used to notice the writes of other processes
+
+    def _load(self) -> None:
+        """
+        Load the CSV file into the in-memory index if it was not loaded yet, Or if another process changed it since.
+        """
+        if self._loaded:
+            if self.signature() == self._signature:  # One stat() call, The index is still up to date
+                return
+            logging.info(f"Database {self.database_path} changed on disk, Reloading it")
+            self.invalidate()
+        self._read()
+        self._loaded = True
+        self._signature = self.signature()
+
+    def _read(self) -> None:
+        """
+        Parse the CSV file into the in-memory index.
+        """
+        rows = self._csv.read_all()  # Parse the file once
+        self._header = rows[0] if rows else []
+        self._rows = {int(row[0]): row for row in rows[1:]}  # Build the ID -> record index
+
+    def _persist(self) -> None:
+        """
+        Export the in-memory table back to the CSV file.
+        """
+        self._csv.write_all([self._header] + list(self._rows.values()))
+        self._signature = self.signature()  # Our own write, The index is up to date with it
+
+    def read_all(self) -> List[List[str]]:
+        """
+        Read all rows from the in-memory table.
+
+        Returns:
+        List of rows from the database.
+        """
+        self._load()
+        return [list(self._header)] + [list(row) for row in self._rows.values()]  # Return copies, So callers can't corrupt the index
+
+    def write_all(self, data: List[List[Any]]) -> None:
+        """
+        Replace the in-memory table with the given rows and export it to the CSV file.
+
+        Parameters:
+        data: List of rows to write to the database.
+        """
+        self._header = [str(value) for value in data[0]] if data else []
+        self._rows = {int(row[0]): [str(value) for value in row] for row in data[1:]}  # Rebuild the index from the new rows
+        self._loaded = True
+        self._persist()
+
+    def append_row(self, row: List[Any]) -> None:
+        """
+        Add a single row to the index and append it to the CSV file.
+
+        Parameters:
+        row: The row to append to the database.
+        """
+        self._load()
+        self._rows[int(row[0])] = [str(value) for value in row]  # Store the row as strings, exactly like it will be read back from the file
+        self._csv.append_row(row)  # Appending to the file doesn't need a full rewrite
+        self._signature = self.signature()
+
+    def get_row(self, employee_id: int) -> Optional[List[str]]:
+        """
+        Get the row of the employee with the given ID from the index.
+
+        Parameters:
+        employee_id: ID of the employee.
+
+        Returns:
+        The employee row, or None if the employee is not found.
+        """
+        self._load()
+        row = self._rows.get(employee_id)  # O(1) lookup in the primary-key index
+        return list(row) if row is not None else None
+
+    def update_row(self, employee_id: int, row: List[Any]) -> bool:
+        """
+        Replace the row of the employee with the given ID in the index.
+
+        Parameters:
+        employee_id: ID of the employee to update.
+        row: The new row of the employee.
+
+        Returns:
+        True if the employee was found and updated, False otherwise.
+        """
+        self._load()
+        if employee_id not in self._rows:
+            return False
+        self._rows[employee_id] = [str(value) for value in row]  # O(1) in-memory update
+        self._persist()  # Keep the CSV file in sync
+        return True
+
+    def delete_rows(self, employee_ids: Iterable[int]) -> int:
+        """
+        Delete the rows of the employees with the given IDs from the index, Then export the table once.
+
+        Parameters:
+        employee_ids: IDs of the employees to delete.
+
+        Returns:
+        Number of employees that were found and deleted.
+        """
+        self._load()
+        deleted = [employee_id for employee_id in employee_ids if self._rows.pop(employee_id, None) is not None]  # O(1) per employee
+        if deleted:
+            self._persist()
+        return len(deleted)
+
+    def count(self) -> int:
+        """
+        Count the employees in the index.
+
+        Returns:
+        Number of employees.
+        """
+        self._load()
+        return len(self._rows)
+
+    def max_id(self) -> int:
+        """
+        Get the highest employee ID in the index.
+
+        Returns:
+        The highest employee ID, or 0 if the index is empty.
+        """
+        self._load()
+        return max(self._rows, default = 0)
+
+    def invalidate(self) -> None:
+        """
+        Drop the in-memory index, So the file is loaded again on next access.
+        """
+        self._header, self._rows = [], {}
+        self._loaded = False
+
+
+# Storage backend that adds an append-only journal (write-ahead log) on top of the in-memory index.
+# Every mutation is appended to the journal as one compact CSV entry, So single-row edits cost O(1) I/O,
+# and the journal is folded into the base CSV file on demand or when it grows past CONFIG['JOURNAL_COMPACTION_THRESHOLD'].
+# On startup the journal is replayed on top of the base CSV file, which recovers the mutations of a crashed session.
+#
+# Journal format (one CSV entry per line):
+#   B,<base size>,<base mtime_ns>    First line, fingerprint of the base CSV file the journal applies to
+#   A,<id>,<name>,<job title>,<salary>    Employee added
+#   U,<id>,<name>,<job title>,<salary>    Employee updated
+#   D,<id>    Employee deleted (tombstone, The other employees keep their IDs)
+class JournaledStorageBackend(IndexedStorageBackend):
+    def __init__(self, database_path: str, journal_path: Optional[str] = None, compaction_threshold: Optional[int] = None):
+        """
+        Initialize the journaled backend.
+
+        Parameters:
+        database_path: Path to the base CSV database file.
+        journal_path: Path to the journal file (optional), Defaults to the database path plus CONFIG['JOURNAL_SUFFIX'].
+        compaction_threshold: Number of journal entries that triggers a compaction (optional), Defaults to CONFIG['JOURNAL_COMPACTION_THRESHOLD'].
+        """
+        super().__init__(database_path)
+        self.journal_path = journal_path or database_path + CONFIG['JOURNAL_SUFFIX']
+        self.compaction_threshold = compaction_threshold or CONFIG['JOURNAL_COMPACTION_THRESHOLD']
+        self._journal_entries = 0  # Number of entries in the journal that are not folded into the base file yet
+        self._journal_file = None  # Journal file handle, Kept open between mutations so each entry is a single write
+
+    def _base_fingerprint(self) -> List[str]:
+        """
+        Fingerprint the base CSV file, The journal is only valid for the exact base file it was started on.
+
+        Returns:
+        The size and the modification time of the base file, as strings.
+        """
+        try:
+            stat = os.stat(self.database_path)
+            return [str(stat.st_size), str(stat.st_mtime_ns)]
+        except OSError:  # The base file doesn't exist yet
+            return ['0', '0']
+
+    def _read(self) -> None:
+        """
+        Load the base CSV file into the index, Then replay the journal on top of it.
+        """
+        super()._read()
+        self._replay()
+
+    def _replay(self) -> None:
+        """
+        Replay the journal entries on top of the in-memory table (crash recovery).
+        """
+        try:
+            with open(self.journal_path, 'rb') as file:
+                content = file.read()
+        except FileNotFoundError:  # No journal, Nothing to recover
+            return
+        except IOError as e:
+            logging.error(f"Error reading journal: {e}")
+            return
+
+        complete = content[:content.rfind(b'\n') + 1]  # Only entries terminated by a newline were fully written
+        if len(complete) != len(content):
+            logging.warning(f"Discarding a torn entry at the end of the journal {self.journal_path}")
+            try:
+                with open(self.journal_path, 'r+b') as file:
+                    file.truncate(len(complete))  # Drop the partial entry, So new entries don't get glued to it
+            except IOError as e:  # E.g. already fixed by another process
+                logging.error(f"Error truncating journal: {e}")
+
+        entries = csv.reader(io.StringIO(complete.decode(), newline = ''))
+        if next(entries, None) != ['B'] + self._base_fingerprint():
+            # The base file was rewritten after this journal was started (e.g. a compaction finished but the crash
+            # happened before the journal was reset), So the journal entries are already part of the base file.
+            if complete:
+                logging.warning(f"Discarding journal {self.journal_path}, It doesn't belong to the current database file")
+            try:
+                os.remove(self.journal_path)
+            except OSError:  # Already removed by another process
+                pass
+            return
+
+        for entry in entries:
+            try:
+                self._apply(entry)
+            except (ValueError, IndexError) as e:
+                logging.error(f"Stopping journal replay at a corrupted entry {entry}: {e}")
+                break
+            self._journal_entries += 1
+        if self._journal_entries:
+            logging.info(f"Recovered {self._journal_entries} journal entries from {self.journal_path}")
+
+    def _apply(self, entry: List[str]) -> None:
+        """
+        Apply a single journal entry to the in-memory table.
+
+        Parameters:
+        entry: The journal entry, Its first element is the operation code.
+        """
+        operation, employee_id = entry[0], int(entry[1])
+        if operation in ('A', 'U'):
+            self._rows[employee_id] = entry[1:]
+        elif operation == 'D':
+            self._rows.pop(employee_id, None)  # Replaying a tombstone twice is harmless
+        else:
+            raise ValueError(f"Unknown journal operation: {operation}")
+
+    def _journal(self, entries: List[List[Any]]) -> None:
+        """
+        Append entries to the journal with a single write, Then compact if the journal grew past the threshold.
+
+        Parameters:
+        entries: The journal entries to append.
+        """
+        try:
+            if self._journal_file is None:
+                self._journal_file = open(self.journal_path, 'a', newline = '')
+                if self._journal_file.tell() == 0:  # A new journal starts with the fingerprint of its base file
+                    csv.writer(self._journal_file).writerow(['B'] + self._base_fingerprint())
+            csv.writer(self._journal_file).writerows(entries)
+            self._journal_file.flush()  # Hand the entry to the operating system
+            if CONFIG['JOURNAL_FSYNC']:
+                os.fsync(self._journal_file.fileno())  # Make sure the entry reached the disk before reporting success
+        except IOError as e:
+            logging.error(f"Error writing to journal: {e}")
+            return
+
+        self._journal_entries += len(entries)
+        self._signature = self.signature()  # Our own write, The index is up to date with it
+        if self._journal_entries >= self.compaction_threshold:
+            self.compact()
+
+    def signature(self) -> Any:
+        """
+        Fingerprint the base file and the journal, Both change when another process writes.
+
+        Returns:
+        The signatures of the base file and of the journal.
+        """
+        try:
+            stat = os.stat(self.journal_path)
+            journal_signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            journal_signature = None
+        return (super().signature(), journal_signature)
+
+    def invalidate(self) -> None:
+        """
+        Drop the in-memory index and the journal state, So the base file and the journal are loaded again on next access.
+        """
+        self._close_journal()
+        self._journal_entries = 0
+        super().invalidate()
+
+    def _close_journal(self) -> None:
+        """
+        Close the journal file handle if it is open.
+        """
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+
+    def compact(self) -> None:
+        """
+        Fold the journal into the base CSV file, Then start a new empty journal.
+
+        The new base file is written to a temporary file and renamed over the old one, So a crash in the middle
+        leaves either the old base file with its journal, or the new base file with a stale journal that is discarded on startup.
+        """
+        self._load()
+        self._close_journal()
+        try:
+            write_file_atomically(self.database_path, lambda file: csv.writer(file).writerows([self._header] + list(self._rows.values())))  # Atomically switch to the new base file
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)  # The entries are part of the base file now
+        except IOError as e:
+            logging.error(f"Error compacting journal: {e}")
+            return
+        self._journal_entries = 0
+        self._signature = self.signature()
+
+    def write_all(self, data: List[List[Any]]) -> None:
+        """
+        Replace the in-memory table with the given rows, Then write them as the new base file.
+
+        Parameters:
+        data: List of rows to write to the database.
+        """
+        self._header = [str(value) for value in data[0]] if data else []
+        self._rows = {int(row[0]): [str(value) for value in row] for row in data[1:]}
+        self._loaded = True
+        self._signature = self.signature()  # The new rows replace whatever is on disk, So compact() must not reload it
+        self.compact()
+
+    def append_row(self, row: List[Any]) -> None:
+        """
+        Add a single row to the index and record it in the journal.
+
+        Parameters:
+        row: The row to append to the database.
+        """
+        self._load()
+        self._rows[int(row[0])] = [str(value) for value in row]
+        self._journal([['A'] + list(row)])
+
+    def update_row(self, employee_id: int, row: List[Any]) -> bool:
+        """
+        Replace the row of the employee with the given ID and record it in the journal.
+
+        Parameters:
+        employee_id: ID of the employee to update.
+        row: The new row of the employee.
+
+        Returns:
+        True if the employee was found and updated, False otherwise.
+        """
+        self._load()
+        if employee_id not in self._rows:
+            return False
+        self._rows[employee_id] = [str(value) for value in row]
+        self._journal([['U'] + list(row)])
+        return True
+
+    def delete_rows(self, employee_ids: Iterable[int]) -> int:
+        """
+        Delete the rows of the employees with the given IDs and record one tombstone per employee in the journal.
+
+        Parameters:
+        employee_ids: IDs of the employees to delete.
+
+        Returns:
+        Number of employees that were found and deleted.
+        """
+        self._load()
+        deleted = [employee_id for employee_id in employee_ids if self._rows.pop(employee_id, None) is not None]
+        if deleted:
+            self._journal([['D', employee_id] for employee_id in deleted])  # One write (and one fsync) for the whole bulk delete
+        return len(deleted)
+
+
+# Storage backend that keeps the employees in a local SQLite file.
+# ID is the primary key and name / job title have their own indexes, So lookups are B-tree searches instead of file scans.
+# The SQL statements are constants with '?' placeholders, So sqlite3 prepares each one once and reuses it from its statement cache,
+# multi-row operations run in batched transactions, and the WAL journal mode lets other processes read while we write.
+# The CSV file stays the import/export format: an empty SQLite database is bulk-imported from it on first use.
+class SQLiteStorageBackend(StorageBackend):
+    supports_row_cache = False  # Rows are looked up by primary key in SQLite, So caching them would only load the whole table into a dict
+
+    # Schema of the employees table and its secondary indexes
+    SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS employees (id INTEGER PRIMARY KEY, name TEXT NOT NULL, job_title TEXT NOT NULL, salary INTEGER NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS idx_employees_name ON employees (name)",
+        "CREATE INDEX IF NOT EXISTS idx_employees_job_title ON employees (job_title)",
+    ]
+
+    # Prepared statements, Always executed with parameters so the statement cache can reuse them
+    SELECT_ALL = "SELECT id, name, job_title, salary FROM employees ORDER BY id"
+    SELECT_ONE = "SELECT id, name, job_title, salary FROM employees WHERE id = ?"
+    INSERT = "INSERT OR REPLACE INTO employees (id, name, job_title, salary) VALUES (?, ?, ?, ?)"
+    UPDATE = "UPDATE employees SET name = ?, job_title = ?, salary = ? WHERE id = ?"
+    DELETE = "DELETE FROM employees WHERE id = ?"
+    DELETE_ALL = "DELETE FROM employees"
+    COUNT = "SELECT COUNT(*) FROM employees"
+    MAX_ID = "SELECT MAX(id) FROM employees"
+
+    def __init__(self, database_path: str, sqlite_path: Optional[str] = None, batch_size: Optional[int] = None):
+        """
+        Initialize the SQLite backend, The SQLite file is opened lazily on first access.
+
+        Parameters:
+        database_path: Path to the CSV database file, Used as the import/export format.
+        sqlite_path: Path to the SQLite file (optional), Defaults to the CSV path with CONFIG['SQLITE_SUFFIX'] as extension.
+        batch_size: Number of rows per executemany() batch (optional), Defaults to CONFIG['SQLITE_BATCH_SIZE'].
+        """
+        super().__init__(database_path)
+        self.sqlite_path = sqlite_path or os.path.splitext(database_path)[0] + CONFIG['SQLITE_SUFFIX']
+        self.batch_size = batch_size or CONFIG['SQLITE_BATCH_SIZE']
+        self.header = [str(value) for value in CONFIG['INITIAL_EMPLOYEE_DATA'][0]]  # SQLite has a fixed schema, So the CSV header is fixed too
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """
+        Open the SQLite file on first access, Create the schema and import the CSV file if the database is empty.
+
+        Returns:
+        The SQLite connection.
+        """
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.sqlite_path, timeout = CONFIG['SQLITE_BUSY_TIMEOUT'], cached_statements = 64)
+            self._connection.execute("PRAGMA journal_mode = WAL")  # Readers don't block the writer and the writer doesn't block readers
+            self._connection.execute("PRAGMA synchronous = NORMAL")  # Safe with WAL, and avoids an fsync per transaction
+            with self._connection:
+                for statement in self.SCHEMA:
+                    self._connection.execute(statement)
+            if self._connection.execute(self.COUNT).fetchone()[0] == 0 and os.path.exists(self.database_path):
+                self.import_csv(self.database_path)  # First use, Bring the existing CSV data in
+        return self._connection
+
+    @staticmethod
+    def _to_row(record: tuple) -> List[str]:
+        """
+        Convert a SQLite record to a row of strings, exactly like it would be read from the CSV file.
+
+        Parameters:
+        record: The (id, name, job_title, salary) record.
+
+        Returns:
+        The employee row.
+        """
+        return [str(record[0]), record[1], record[2], str(record[3])]
+
+    def _insert_batches(self, rows: Iterable[List[Any]]) -> int:
+        """
+        Insert rows in executemany() batches, The caller is responsible for the surrounding transaction.
+
+        Parameters:
+        rows: The employee rows to insert (without a header row).
+
+        Returns:
+        Number of inserted rows.
+        """
+        inserted = 0
+        batch: List[List[Any]] = []
+        for row in rows:
+            batch.append(row[:4])
+            if len(batch) >= self.batch_size:
+                self.connection.executemany(self.INSERT, batch)
+                inserted += len(batch)
+                batch = []
+        if batch:
+            self.connection.executemany(self.INSERT, batch)
+            inserted += len(batch)
+        return inserted
+
+    def import_csv(self, csv_path: str) -> int:
+        """
+        Stream a CSV file in the existing format into the SQLite database, In batched transactions.
+        The rows are read one batch at a time, So the file is never fully loaded in memory.
+
+        Parameters:
+        csv_path: Path to the CSV file to import.
+
+        Returns:
+        Number of imported employees.
+        """
+        try:
+            with open(csv_path, 'r', newline = '') as file:
+                reader = csv.reader(file)
+                next(reader, None)  # Skip the header row
+                with self.connection:  # One transaction for the whole import, committed at the end
+                    imported = self._insert_batches(reader)
+        except (IOError, sqlite3.Error) as e:
+            logging.error(f"Error importing {csv_path} into SQLite: {e}")
+            return 0
+        logging.info(f"Imported {imported} employees from {csv_path} into {self.sqlite_path}")
+        return imported
+
+    def export_csv(self, csv_path: str) -> None:
+        """
+        Stream the SQLite database into a CSV file in the existing format.
+
+        Parameters:
+        csv_path: Path to the CSV file to write.
+        """
+        def write(file: Any) -> None:
+            writer = csv.writer(file)
+            writer.writerow(self.header)
+            writer.writerows(self.connection.execute(self.SELECT_ALL))  # The cursor is consumed lazily
+
+        try:
+            write_file_atomically(csv_path, write)  # The export may replace the CSV file other processes are reading
+        except (IOError, sqlite3.Error) as e:
+            logging.error(f"Error exporting SQLite to {csv_path}: {e}")
+
+    def read_all(self) -> List[List[str]]:
+        """
+        Read all rows from the SQLite database.
+
+        Returns:
+        List of rows from the database, The header row first.
+        """
+        try:
+            return [list(self.header)] + [self._to_row(record) for record in self.connection.execute(self.SELECT_ALL)]
+        except sqlite3.Error as e:
+            logging.error(f"Error reading database: {e}")
+            return []
+
+    def write_all(self, data: List[List[Any]]) -> None:
+        """
+        Replace all employees with the given rows, In a single transaction.
+
+        Parameters:
+        data: List of rows to write to the database, The first row is the header row.
+        """
+        try:
+            with self.connection:
+                self.connection.execute(self.DELETE_ALL)
+                self._insert_batches(data[1:])
+        except sqlite3.Error as e:
+            logging.error(f"Error writing to database: {e}")
+
+    def append_row(self, row: List[Any]) -> None:
+        """
+        Insert a single row.
+
+        Parameters:
+        row: The row to append to the database.
+        """
+        try:
+            with self.connection:
+                self.connection.execute(self.INSERT, row[:4])
+        except sqlite3.Error as e:
+            logging.error(f"Error appending to database: {e}")
+
+    def get_row(self, employee_id: int) -> Optional[List[str]]:
+        """
+        Get the row of the employee with the given ID through the primary key.
+
+        Parameters:
+        employee_id: ID of the employee.
+
+        Returns:
+        The employee row, or None if the employee is not found.
+        """
+        try:
+            record = self.connection.execute(self.SELECT_ONE, (employee_id,)).fetchone()
+        except sqlite3.Error as e:
+            logging.error(f"Error reading database: {e}")
+            return None
+        return self._to_row(record) if record is not None else None
+
+    def update_row(self, employee_id: int, row: List[Any]) -> bool:
+        """
+        Replace the row of the employee with the given ID.
+
+        Parameters:
+        employee_id: ID of the employee to update.
+        row: The new row of the employee.
+
+        Returns:
+        True if the employee was found and updated, False otherwise.
+        """
+        try:
+            with self.connection:
+                cursor = self.connection.execute(self.UPDATE, (row[1], row[2], row[3], employee_id))
+        except sqlite3.Error as e:
+            logging.error(f"Error updating database: {e}")
+            return False
+        return cursor.rowcount > 0
+
+    def delete_rows(self, employee_ids: Iterable[int]) -> int:
+        """
+        Delete the rows of the employees with the given IDs, In one transaction.
+
+        Parameters:
+        employee_ids: IDs of the employees to delete.
+
+        Returns:
+        Number of employees that were found and deleted.
+        """
+        try:
+            with self.connection:
+                cursor = self.connection.executemany(self.DELETE, ((employee_id,) for employee_id in employee_ids))
+        except sqlite3.Error as e:
+            logging.error(f"Error deleting from database: {e}")
+            return 0
+        return cursor.rowcount
+
+    def count(self) -> int:
+        """
+        Count the employees in the SQLite database.
+
+        Returns:
+        Number of employees.
+        """
+        try:
+            return self.connection.execute(self.COUNT).fetchone()[0]
+        except sqlite3.Error as e:
+            logging.error(f"Error reading database: {e}")
+            return 0
+
+    def max_id(self) -> int:
+        """
+        Get the highest employee ID through the primary key.
+
+        Returns:
+        The highest employee ID, or 0 if the database is empty.
+        """
+        try:
+            return self.connection.execute(self.MAX_ID).fetchone()[0] or 0
+        except sqlite3.Error as e:
+            logging.error(f"Error reading database: {e}")
+            return 0
+
+    def signature(self) -> Any:
+        """
+        Get the SQLite data version, It changes when another connection commits a change.
+
+        Returns:
+        The data version of the database.
+        """
+        try:
+            return self.connection.execute("PRAGMA data_version").fetchone()[0]
+        except sqlite3.Error as e:
+            logging.error(f"Error reading database: {e}")
+            return None
+
+    def close(self) -> None:
+        """
+        Close the SQLite connection if it is open.
+        """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+# Registry of the available storage backends, Selected by name through CONFIG['STORAGE_BACKEND']
+STORAGE_BACKENDS: Dict[str, Type[StorageBackend]] = {
+    'csv': CsvStorageBackend,
+    'indexed': IndexedStorageBackend,
+    'journaled': JournaledStorageBackend,
+    'sqlite': SQLiteStorageBackend,
+}
+
+
+
+
+
+
+# Class for handling database operations, The actual storage is delegated to a pluggable StorageBackend.
+# DatabaseManager also acts as a read-through cache: the parsed table is kept in memory and reused as long as the
+# storage signature (file modification time and size) is unchanged. Our own writes update the cache in place,
+# and a change made by someone else (another process, a text editor) is detected on the next access and reloaded.
+# Every operation runs under the database FileLock, So several processes can safely use the same database file.
+class DatabaseManager:
+    def __init__(self, database_path: str, backend: Optional[StorageBackend] = None, cache_enabled: Optional[bool] = None):
+        """
+        Initialize the DatabaseManager with the path to the database file.
+
+        Parameters:
+        database_path: Path to the database file.
+        backend: Storage backend to use (optional), Defaults to the backend named in CONFIG['STORAGE_BACKEND'].
+        cache_enabled: Keep the parsed table in memory (optional), Defaults to CONFIG['CACHE_ENABLED'].
+        """
+        self.database_path = database_path
+        self.backend = backend or STORAGE_BACKENDS[CONFIG['STORAGE_BACKEND']](database_path)
+        self.cache_enabled = CONFIG['CACHE_ENABLED'] if cache_enabled is None else cache_enabled
+        self.lock = FileLock(database_path + CONFIG['LOCK_SUFFIX'])  # Shared for reads and exclusive for writes, So other processes using the same database never interleave with us
+        self.cache_hits = 0  # Accesses served without reading the storage
+        self.cache_misses = 0  # Accesses that had to (re)load the storage
+        self.generation = 0  # Incremented whenever a change made by someone else is detected, So derived data (e.g. secondary indexes) knows it is stale
+        self._cache_valid = False
+        self._cache_signature: Any = None  # Storage signature the cache was loaded with
+        self._cache_header: List[str] = []
+        self._cache_rows: Dict[int, List[str]] = {}  # ID -> row, Only used for backends that don't keep the table in memory themselves
+
+    @property
+    def _caches_rows(self) -> bool:
+        """
+        Check if the cache holds its own copy of the rows.
+
+        Returns:
+        True if the rows are cached here, False if the backend already serves them from memory or opts out of the row cache.
+        """
+        return self.cache_enabled and self.backend.supports_row_cache and not self.backend.keeps_table_in_memory
+
+    def _revalidate(self, count: bool = True) -> None:
+        """
+        Make sure the cache matches the storage, Reloading it if the storage signature changed.
+
+        Parameters:
+        count: Count this access in the hit/miss counters (optional).
+        """
+        signature = self.backend.signature()
+        if self._cache_valid and signature == self._cache_signature:
+            self.cache_hits += count
+            return
+        self.cache_misses += count
+        if self._cache_valid:  # The storage was changed by someone else
+            logging.info(f"Database {self.database_path} changed on disk, Reloading it")
+            self.backend.invalidate()
+            self.generation += 1
+        if self._caches_rows:
+            rows = self.backend.read_all()
+            self._cache_header = rows[0] if rows else []
+            self._cache_rows = {int(row[0]): row for row in rows[1:]}
+        self._cache_signature = signature
+        self._cache_valid = True
+
+    def _written(self, update_cache: Callable[[], None]) -> None:
+        """
+        Bring the cache up to date after one of our own writes, Without reading the storage again.
+
+        Parameters:
+        update_cache: Function applying the same change to the cached rows.
+        """
+        if self._caches_rows:
+            update_cache()
+        self._cache_signature = self.backend.signature()  # Our own write changed the signature, So adopt the new one
+
+    def refresh(self) -> int:
+        """
+        Check the storage for changes made by someone else.
+
+        Returns:
+        The current generation, It changes whenever such a change was detected.
+        """
+        with self.lock.shared():
+            if self.cache_enabled:
+                self._revalidate(count = False)
+            return self.generation
+
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Get the cache counters.
+
+        Returns:
+        The number of cache hits and misses.
+        """
+        return {'hits': self.cache_hits, 'misses': self.cache_misses}
+
+    def read_all(self) -> List[List[str]]:
+        """
+        Read all rows from the database.
+
+        Returns:
+        List of rows from the database.
+        """
+        with self.lock.shared():
+            if not self.cache_enabled:
+                return self.backend.read_all()
+            self._revalidate()
+            if not self._caches_rows:
+                return self.backend.read_all()
+            if not self._cache_header:
+                return []
+            return [list(self._cache_header)] + [list(row) for row in self._cache_rows.values()]  # Return copies, So callers can't corrupt the cache
+
+    def write_all(self, data: List[List[Any]]) -> None:
+        """
+        Write a list of rows to the database.
+
+        Parameters:
+        data: List of rows to write to the database.
+        """
+        with self.lock.exclusive():
+            if not self.cache_enabled:
+                return self.backend.write_all(data)
+            self.backend.write_all(data)
+            self._cache_valid = True
+
+            def update_cache() -> None:
+                self._cache_header = [str(value) for value in data[0]] if data else []
+                self._cache_rows = {int(row[0]): [str(value) for value in row] for row in data[1:]}
+            self._written(update_cache)
+
+    def append_row(self, row: List[Any]) -> None:
+        """
+        Append a single row to the database.
+
+        Parameters:
+        row: The row to append to the database.
+        """
+        with self.lock.exclusive():
+            if not self.cache_enabled:
+                return self.backend.append_row(row)
+            self._revalidate(count = False)
+            self.backend.append_row(row)
+            self._written(lambda: self._cache_rows.__setitem__(int(row[0]), [str(value) for value in row]))
+
+    def get_row(self, employee_id: int) -> Optional[List[str]]:
+        """
+        Get the row of the employee with the given ID.
+
+        Parameters:
+        employee_id: ID of the employee.
+
+        Returns:
+        The employee row, or None if the employee is not found.
+        """
+        with self.lock.shared():
+            if not self.cache_enabled:
+                return self.backend.get_row(employee_id)
+            self._revalidate()
+            if not self._caches_rows:
+                return self.backend.get_row(employee_id)
+            row = self._cache_rows.get(employee_id)
+            return list(row) if row is not None else None
+
+    def update_row(self, employee_id: int, row: List[Any]) -> bool:
+        """
+        Replace the row of the employee with the given ID.
+
+        Parameters:
+        employee_id: ID of the employee to update.
+        row: The new row of the employee.
+
+        Returns:
+        True if the employee was found and updated, False otherwise.
+        """
+        with self.lock.exclusive():
+            if not self.cache_enabled:
+                return self.backend.update_row(employee_id, row)
+            self._revalidate(count = False)
+            updated = self.backend.update_row(employee_id, row)
+            if updated:
+                self._written(lambda: self._cache_rows.__setitem__(employee_id, [str(value) for value in row]))
+            return updated
+
+    def delete_row(self, employee_id: int) -> bool:
+        """
+        Delete the row of the employee with the given ID, The other employees keep their IDs.
+
+        Parameters:
+        employee_id: ID of the employee to delete.
+
+        Returns:
+        True if the employee was found and deleted, False otherwise.
+        """
+        return self.delete_rows([employee_id]) == 1
+
+    def delete_rows(self, employee_ids: Iterable[int]) -> int:
+        """
+        Delete the rows of the employees with the given IDs in one operation.
+
+        Parameters:
+        employee_ids: IDs of the employees to delete.
+
+        Returns:
+        Number of employees that were found and deleted.
+        """
+        with self.lock.exclusive():
+            if not self.cache_enabled:
+                return self.backend.delete_rows(employee_ids)
+            employee_ids = list(employee_ids)  # The IDs are used twice (storage and cache)
+            self._revalidate(count = False)
+            deleted = self.backend.delete_rows(employee_ids)
+            if deleted:
+                def update_cache() -> None:
+                    for employee_id in employee_ids:
+                        self._cache_rows.pop(employee_id, None)
+                self._written(update_cache)
+            return deleted
+
+    def count(self) -> int:
+        """
+        Count the employees in the database.
+
+        Returns:
+        Number of employees.
+        """
+        with self.lock.shared():
+            if not self.cache_enabled:
+                return self.backend.count()
+            self._revalidate()
+            if self._caches_rows:
+                return len(self._cache_rows)
+            return self.backend.count()
+
+    def max_id(self) -> int:
+        """
+        Get the highest employee ID in the database.
+
+        Returns:
+        The highest employee ID, or 0 if the database is empty.
+        """
+        with self.lock.shared():
+            if not self.cache_enabled:
+                return self.backend.max_id()
+            self._revalidate()
+            if self._caches_rows:
+                return max(self._cache_rows, default = 0)
+            return self.backend.max_id()
+
+    def compact(self) -> None:
+        """
+        Fold any pending changes of the storage backend (e.g. the journal) into the database file.
+        """
+        with self.lock.exclusive():
+            if self.cache_enabled:
+                self._revalidate(count = False)  # Pick up the changes of other processes first, So they aren't mistaken for our compaction
+            self.backend.compact()
+            if self.cache_enabled:
+                self._cache_signature = self.backend.signature()  # Compaction rewrites the file without changing its content
+
+
+
+
+
+
+# DatabaseManager that stores the employees in a local SQLite file, It works with the Command classes and display_menu unchanged.
+class SQLiteDatabaseManager(DatabaseManager):
+    def __init__(self, database_path: str, sqlite_path: Optional[str] = None):
+        """
+        Initialize the SQLiteDatabaseManager.
+
+        Parameters:
+        database_path: Path to the CSV database file, Imported on first use and used for exports.
+        sqlite_path: Path to the SQLite file (optional), Defaults to the CSV path with CONFIG['SQLITE_SUFFIX'] as extension.
+        """
+        super().__init__(database_path, SQLiteStorageBackend(database_path, sqlite_path))
+
+    def import_csv(self, csv_path: str) -> int:
+        """
+        Bulk-import a CSV file in the existing format.
+
+        Parameters:
+        csv_path: Path to the CSV file to import.
+
+        Returns:
+        Number of imported employees.
+        """
+        with self.lock.exclusive():
+            return self.backend.import_csv(csv_path)
+
+    def export_csv(self, csv_path: str) -> None:
+        """
+        Export all employees to a CSV file in the existing format.
+
+        Parameters:
+        csv_path: Path to the CSV file to write.
+        """
+        with self.lock.shared():
+            self.backend.export_csv(csv_path)
+
+
+
+
+
+
+# Class for handing out employee IDs, IDs are never reused, So IDs cached by other systems stay valid after deletions.
+# The highest ID handed out so far (the high-water mark) is kept in a small sidecar file next to the database,
+# So the next ID is computed in O(1) instead of rescanning the database.
+# The sidecar file is read and written under the exclusive database lock, So two processes never hand out the same ID.
+class IdAllocator:
+    def __init__(self, sidecar_path: str, seed: Callable[[], int], lock: Optional[FileLock] = None):
+        """
+        Initialize the IdAllocator.
+
+        Parameters:
+        sidecar_path: Path to the sidecar file holding the high-water mark.
+        seed: Function returning the highest ID in the database, Only called if the sidecar file doesn't exist yet.
+        lock: Lock shared with the other processes (optional), Defaults to a lock file next to the sidecar file.
+        """
+        self.sidecar_path = sidecar_path
+        self._seed = seed
+        self.lock = lock or FileLock(sidecar_path + CONFIG['LOCK_SUFFIX'])
+        self._high_water_mark: Optional[int] = None  # Loaded lazily on first allocation
+        self._pending = False  # True while IDs were handed out but the high-water mark isn't saved yet
+
+    def _load(self) -> int:
+        """
+        Load the high-water mark from the sidecar file, Or seed it from the database if there is no sidecar file yet.
+        The sidecar file is read again unless we have unsaved allocations, Because other processes may have handed out IDs meanwhile.
+
+        Returns:
+        The high-water mark.
+        """
+        if self._high_water_mark is None or not self._pending:
+            try:
+                with open(self.sidecar_path, 'r') as file:
+                    high_water_mark = int(file.read().strip())
+            except (IOError, ValueError):  # Missing or unreadable sidecar, Fall back to the database content
+                high_water_mark = self._seed()
+            self._high_water_mark = max(high_water_mark, self._high_water_mark or 0)  # Never go back below an ID we handed out ourselves
+        return self._high_water_mark
+
+    def allocate(self, persist: bool = True) -> int:
+        """
+        Hand out the next employee ID.
+
+        Parameters:
+        persist: Save the new high-water mark right away (optional), Callers allocating many IDs can save once with persist().
+
+        Returns:
+        The new employee ID.
+        """
+        with self.lock.exclusive():  # Read, increment and save the high-water mark without another process in between
+            self._high_water_mark = self._load() + 1
+            self._pending = True
+            if persist:
+                self.persist()
+            return self._high_water_mark
+
+    def persist(self) -> None:
+        """
+        Save the high-water mark to the sidecar file, Through a temporary file so the sidecar is never half written.
+        """
+        with self.lock.exclusive():
+            high_water_mark = self._load()
+            try:
+                write_file_atomically(self.sidecar_path, lambda file: file.write(str(high_water_mark)))
+            except IOError as e:
+                logging.error(f"Error saving the employee ID high-water mark: {e}")
+                return
+            self._pending = False
+
+
+
+
+
+
+# Class representing an employee
+class Employee:
+    __slots__ = ('id', 'name', 'job_title', 'salary')  # Fixed attributes stored in slots instead of a per-instance __dict__, which saves memory for large rosters
+
+    def __init__(self, id: int, name: str, job_title: str, salary: int):
+        """
+        Initialize an Employee with the given attributes.
+        
+        Parameters:
+        id: Employee ID.
+        name: Employee name.
+        job_title: Employee job title.
+        salary: Employee salary.
+        """
+        self.id = id  # Assign the employee ID
+        self.name = name  # Assign the employee name
+        self.job_title = job_title  # Assign the employee job title
+        self.salary = salary  # Assign the employee salary
+
+    def to_list(self) -> List[Any]:
+        """
+        Convert the Employee object to a list.
+
+        Returns:
+        List representation of the employee.
+        """
+        return [self.id, self.name, self.job_title, self.salary]  # Return the employee attributes as a list
+        #we return it as a list, so that we can make operations such as storing or serializing Employee objects into formats like CSV.
+
+    @classmethod # For situations where we need to create a new instance but don't have an existing instance to call a method on.
+    def from_list(cls, data: List[str]) -> 'Employee':
+        """
+        Create an Employee object from a list.
+        
+        This method is useful for converting data read from CSV files or other text-based sources into structured Employee objects,
+        facilitating further manipulation and usage within the application.
+
+        When you use cls in a class method, it refers to the class that calls the method, not necessarily the class where the method is defined.
+        This allows for more flexible and dynamic object creation, especially when dealing with inheritance and subclasses.
+
+        Parameters:
+        data: List of employee attributes.
+        
+        Returns:
+        An Employee object.
+        """
+        return cls(int(data[0]), data[1], data[2], int(data[3]))  # Create and return an Employee object
+
+
+
+
+
+
+
+# Binary snapshot format of an EmployeeTable, So a large database starts in milliseconds instead of being parsed from CSV.
+# All integers are little-endian and every column starts on an 8-byte boundary, So typed columns can be used straight from an mmap.
+#
+#   Header (24 bytes):   magic b'EMPTABLE', u16 schema version, u16 column count, u32 reserved, u64 row count
+#   Column table:        one 40-byte entry per column: 16-byte name, u8 type, 7 bytes padding, u64 offset, u64 length
+#   Columns:             INT64 / UINT32: one value per row.  STRINGS: u64 count, u64 offsets[count] (from the start of the pool),
+#                        then the pool of length-prefixed strings (u32 byte length + UTF-8 bytes).
+#
+# Columns are found by name, So a reader ignores the columns it doesn't know and new columns can be added without breaking old files.
+# The schema version is only incremented for changes old readers can't handle.
+SNAPSHOT_MAGIC = b'EMPTABLE'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct('<8sHHIQ')
+SNAPSHOT_COLUMN = struct.Struct('<16sB7xQQ')
+SNAPSHOT_INT64, SNAPSHOT_UINT32, SNAPSHOT_STRINGS = 1, 2, 3  # Column types
+SNAPSHOT_STRING_LENGTH = struct.Struct('<I')
+
+
+# Read-only sequence of the strings of a STRINGS snapshot column, Decoded from the mmap on access.
+# Nothing is decoded when the snapshot is loaded, So a million names cost nothing until they are used.
+class SnapshotStrings:
+    def __init__(self, buffer: Any, offset: int):
+        """
+        Initialize the sequence over a STRINGS column.
+
+        Parameters:
+        buffer: The snapshot buffer (an mmap), Kept alive by this object.
+        offset: Offset of the column in the buffer.
+        """
+        self._buffer = buffer
+        count = struct.unpack_from('<Q', buffer, offset)[0]
+        self._offsets = memoryview(buffer)[offset + 8:offset + 8 + count * 8].cast('Q')  # Zero-copy view of the offsets
+        self._pool = offset + 8 + count * 8  # Start of the string pool
+
+    def __len__(self) -> int:
+        """
+        Count the strings.
+
+        Returns:
+        Number of strings.
+        """
+        return len(self._offsets)
+
+    def __getitem__(self, position: int) -> str:
+        """
+        Decode the string at the given position.
+
+        Parameters:
+        position: Position of the string.
+
+        Returns:
+        The string.
+        """
+        start = self._pool + self._offsets[position]
+        length = SNAPSHOT_STRING_LENGTH.unpack_from(self._buffer, start)[0]
+        return self._buffer[start + 4:start + 4 + length].decode('utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Decode the strings in order.
+        """
+        for position in range(len(self)):
+            yield self[position]
+
+
+# Function to encode a STRINGS snapshot column
+def _encode_snapshot_strings(strings: Iterable[str]) -> bytes:
+    """
+    Encode strings as a STRINGS snapshot column: count, offsets, then the length-prefixed pool.
+
+    Parameters:
+    strings: The strings.
+
+    Returns:
+    The encoded column.
+    """
+    pool = bytearray()
+    offsets = array('Q')
+    for string in strings:
+        encoded = string.encode('utf-8')
+        offsets.append(len(pool))
+        pool += SNAPSHOT_STRING_LENGTH.pack(len(encoded))
+        pool += encoded
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+    return struct.pack('<Q', len(offsets)) + offsets.tobytes() + bytes(pool)
+
+
+
+
+
+
+# Column-oriented container for large employee rosters.
+# IDs and salaries live in typed arrays (8 bytes per employee instead of a full int object), job titles are stored once
+# in an interned pool and referenced by a 4-byte code, and only the names stay as one string per employee.
+# Filters work directly on the columns and return row positions, So no Employee object is created until one is asked for.
+class EmployeeTable:
+    def __init__(self):
+        """
+        Initialize an empty EmployeeTable.
+        """
+        self.ids = array('q')  # Employee IDs (signed 64-bit)
+        self.salaries = array('q')  # Employee salaries (signed 64-bit)
+        self.names: List[str] = []  # Employee names
+        self.title_codes = array('I')  # Index of each employee's job title in self.titles
+        self.titles: List[str] = []  # Pool of the distinct (interned) job titles
+        self._title_lookup: Dict[str, int] = {}  # Job title -> code in the pool
+        self.header: List[str] = list(CONFIG['INITIAL_EMPLOYEE_DATA'][0])  # Header row of the CSV format, Kept for lossless conversions
+
+    def __len__(self) -> int:
+        """
+        Count the employees in the table.
+
+        Returns:
+        Number of employees in the table.
+        """
+        return len(self.ids)
+
+    def __getitem__(self, position: int) -> Employee:
+        """
+        Materialize the employee stored at the given row position.
+
+        Parameters:
+        position: Row position in the table.
+
+        Returns:
+        An Employee object.
+        """
+        return Employee(self.ids[position], self.names[position], self.titles[self.title_codes[position]], self.salaries[position])
+
+    def __iter__(self) -> Iterator[Employee]:
+        """
+        Iterate over the employees, Creating one Employee object at a time.
+        """
+        return self.employees(range(len(self)))
+
+    def _title_code(self, job_title: str) -> int:
+        """
+        Get the code of a job title, Adding it to the pool if it is new.
+
+        Parameters:
+        job_title: The job title.
+
+        Returns:
+        The code of the job title in the pool.
+        """
+        code = self._title_lookup.get(job_title)
+        if code is None:
+            code = len(self.titles)
+            self.titles.append(sys.intern(job_title))  # Intern the title, So every reference to it shares one string object
+            self._title_lookup[self.titles[code]] = code
+        return code
+
+    def append(self, employee_id: int, name: str, job_title: str, salary: int) -> None:
+        """
+        Append an employee to the table.
+
+        Parameters:
+        employee_id: Employee ID.
+        name: Employee name.
+        job_title: Employee job title.
+        salary: Employee salary.
+        """
+        if not isinstance(self.names, list):  # Loaded from a snapshot, Decode the names once before the first change
+            self.names = list(self.names)
+        self.ids.append(employee_id)
+        self.names.append(name)
+        self.title_codes.append(self._title_code(job_title))
+        self.salaries.append(salary)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[List[str]], strict: bool = False) -> 'EmployeeTable':
+        """
+        Build a table from rows in the CSV format (without the header row).
+        The rows are consumed one by one, So a csv.reader can be passed directly.
+
+        Parameters:
+        rows: Employee rows.
+        strict: Reject rows that can't be converted back to exactly the same text (optional), E.g. a salary written as "0500".
+
+        Returns:
+        An EmployeeTable.
+        """
+        table = cls()
+        for row in rows:
+            employee_id, salary = int(row[0]), int(row[3])
+            if strict and (len(row) != 4 or str(employee_id) != row[0] or str(salary) != row[3]):
+                raise ValueError(f"Row {row} can't be stored without changing it")
+            table.append(employee_id, row[1], row[2], salary)
+        return table
+
+    @classmethod
+    def from_csv(cls, csv_path: str, strict: bool = False) -> 'EmployeeTable':
+        """
+        Build a table by streaming a CSV database file, Without loading it as a list of rows first.
+
+        Parameters:
+        csv_path: Path to the CSV database file.
+        strict: Reject rows that can't be converted back to exactly the same text (optional).
+
+        Returns:
+        An EmployeeTable.
+        """
+        with open(csv_path, 'r', newline = '') as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            table = cls.from_rows(reader, strict)
+        if header is not None:
+            table.header = header
+        return table
+
+    def to_rows(self) -> Iterator[List[Any]]:
+        """
+        Generate the rows of the table in the CSV format (without the header row).
+        """
+        for position in range(len(self)):
+            yield [self.ids[position], self.names[position], self.titles[self.title_codes[position]], self.salaries[position]]
+
+    def save_snapshot(self, snapshot_path: str) -> None:
+        """
+        Save the table in the binary snapshot format, Through a temporary file so the snapshot is never half written.
+
+        Parameters:
+        snapshot_path: Path to the snapshot file.
+        """
+        def column_bytes(values: array) -> bytes:
+            if sys.byteorder != 'little':
+                values = array(values.typecode, values)
+                values.byteswap()
+            return values.tobytes()
+
+        columns = [
+            (b'id', SNAPSHOT_INT64, column_bytes(self.ids)),
+            (b'name', SNAPSHOT_STRINGS, _encode_snapshot_strings(self.names)),
+            (b'title_code', SNAPSHOT_UINT32, column_bytes(self.title_codes)),
+            (b'salary', SNAPSHOT_INT64, column_bytes(self.salaries)),
+            (b'title', SNAPSHOT_STRINGS, _encode_snapshot_strings(self.titles)),
+            (b'header', SNAPSHOT_STRINGS, _encode_snapshot_strings(self.header)),
+        ]
+        offset = SNAPSHOT_HEADER.size + SNAPSHOT_COLUMN.size * len(columns)
+        entries = []
+        for name, column_type, data in columns:
+            offset += -offset % 8  # Align every column to 8 bytes
+            entries.append((name, column_type, offset, data))
+            offset += len(data)
+
+        def write(file: Any) -> None:
+            file.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(columns), 0, len(self)))
+            for name, column_type, column_offset, data in entries:
+                file.write(SNAPSHOT_COLUMN.pack(name, column_type, column_offset, len(data)))
+            for name, column_type, column_offset, data in entries:
+                file.write(b'\0' * (column_offset - file.tell()))  # Alignment padding
+                file.write(data)
+
+        write_file_atomically(snapshot_path, write, binary = True)
+
+    @classmethod
+    def load_snapshot(cls, snapshot_path: str) -> 'EmployeeTable':
+        """
+        Load a table from a binary snapshot by memory-mapping it.
+        The numeric columns are copied into arrays with one memcpy each, and the names stay in the mmap until they are used.
+
+        Parameters:
+        snapshot_path: Path to the snapshot file.
+
+        Returns:
+        An EmployeeTable.
+        """
+        with open(snapshot_path, 'rb') as file:
+            buffer = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)  # The mapping stays valid after the file is closed
+        if len(buffer) < SNAPSHOT_HEADER.size:
+            raise ValueError(f"{snapshot_path} is not an employee snapshot")
+        magic, version, column_count, _, row_count = SNAPSHOT_HEADER.unpack_from(buffer, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{snapshot_path} is not an employee snapshot")
+        if version > SNAPSHOT_VERSION:
+            raise ValueError(f"{snapshot_path} has schema version {version}, This program only reads up to version {SNAPSHOT_VERSION}")
+        columns: Dict[str, Tuple[int, int, int]] = {}  # Column name -> (type, offset, length)
+        for index in range(column_count):
+            name, column_type, offset, length = SNAPSHOT_COLUMN.unpack_from(buffer, SNAPSHOT_HEADER.size + index * SNAPSHOT_COLUMN.size)
+            columns[name.rstrip(b'\0').decode('ascii')] = (column_type, offset, length)
+
+        def column(name: str, column_type: int) -> Tuple[int, int]:
+            if name not in columns or columns[name][0] != column_type:
+                raise ValueError(f"{snapshot_path} has no valid '{name}' column")
+            return columns[name][1], columns[name][2]
+
+        def typed_column(name: str, column_type: int, typecode: str) -> array:
+            offset, length = column(name, column_type)
+            values = array(typecode)
+            values.frombytes(buffer[offset:offset + length])  # One memcpy
+            if sys.byteorder != 'little':
+                values.byteswap()
+            if len(values) != row_count:
+                raise ValueError(f"{snapshot_path} has a truncated '{name}' column")
+            return values
+
+        table = cls()
+        table.ids = typed_column('id', SNAPSHOT_INT64, 'q')
+        table.salaries = typed_column('salary', SNAPSHOT_INT64, 'q')
+        table.title_codes = typed_column('title_code', SNAPSHOT_UINT32, 'I')
+        table.names = SnapshotStrings(buffer, column('name', SNAPSHOT_STRINGS)[0])
+        for title in SnapshotStrings(buffer, column('title', SNAPSHOT_STRINGS)[0]):
+            table._title_code(title)
+        if 'header' in columns:  # Optional column, Older writers may not have it
+            table.header = list(SnapshotStrings(buffer, column('header', SNAPSHOT_STRINGS)[0]))
+        if len(table.names) != row_count:
+            raise ValueError(f"{snapshot_path} has a truncated 'name' column")
+        return table
+
+    def to_csv(self, csv_path: str) -> None:
+        """
+        Write the table as a CSV database file (header row included), Through a temporary file so it is never half written.
+
+        Parameters:
+        csv_path: Path to the CSV file.
+        """
+        def write(file: Any) -> None:
+            writer = csv.writer(file)
+            writer.writerow(self.header)
+            writer.writerows(self.to_rows())
+
+        write_file_atomically(csv_path, write)
+
+    def filter_salary_range(self, min_salary: Optional[int] = None, max_salary: Optional[int] = None, positions: Optional[Iterable[int]] = None) -> array:
+        """
+        Select the employees whose salary is within [min_salary, max_salary].
+
+        Parameters:
+        min_salary: Lowest salary to keep (optional, no lower bound if None).
+        max_salary: Highest salary to keep (optional, no upper bound if None).
+        positions: Row positions to filter (optional), Used to chain filters. Defaults to the whole table.
+
+        Returns:
+        The matching row positions.
+        """
+        low = min_salary if min_salary is not None else -(1 << 63)
+        high = max_salary if max_salary is not None else (1 << 63) - 1
+        salaries = self.salaries
+        if positions is None:
+            return array('Q', (position for position, salary in enumerate(salaries) if low <= salary <= high))
+        return array('Q', (position for position in positions if low <= salaries[position] <= high))
+
+    def filter_job_title(self, job_title: str, positions: Optional[Iterable[int]] = None) -> array:
+        """
+        Select the employees with the given job title, By comparing the title codes instead of the strings.
+
+        Parameters:
+        job_title: The job title to match.
+        positions: Row positions to filter (optional), Used to chain filters. Defaults to the whole table.
+
+        Returns:
+        The matching row positions.
+        """
+        code = self._title_lookup.get(job_title)
+        if code is None:  # No employee has this title
+            return array('Q')
+        if positions is None:
+            return array('Q', compress(range(len(self)), map(code.__eq__, self.title_codes)))
+        codes = self.title_codes
+        return array('Q', (position for position in positions if codes[position] == code))
+
+    def employees(self, positions: Iterable[int]) -> Iterator[Employee]:
+        """
+        Materialize the employees at the given row positions, One at a time.
+
+        Parameters:
+        positions: Row positions, e.g. the result of a filter.
+        """
+        for position in positions:
+            yield self[position]
+
+
+# Function to convert a CSV database file to a binary snapshot
+def csv_to_snapshot(csv_path: str, snapshot_path: str) -> int:
+    """
+    Convert a CSV database file to a binary snapshot, Refusing rows the snapshot couldn't give back unchanged.
+
+    Parameters:
+    csv_path: Path to the CSV database file.
+    snapshot_path: Path to the snapshot file to write.
+
+    Returns:
+    Number of converted employees.
+    """
+    table = EmployeeTable.from_csv(csv_path, strict = True)
+    table.save_snapshot(snapshot_path)
+    return len(table)
+
+
+# Function to convert a binary snapshot back to a CSV database file
+def snapshot_to_csv(snapshot_path: str, csv_path: str) -> int:
+    """
+    Convert a binary snapshot back to a CSV database file, Byte for byte the file it was made from.
+
+    Parameters:
+    snapshot_path: Path to the snapshot file.
+    csv_path: Path to the CSV database file to write.
+
+    Returns:
+    Number of converted employees.
+    """
+    table = EmployeeTable.load_snapshot(snapshot_path)
+    table.to_csv(csv_path)
+    return len(table)
+
+
+
+
+
+
+
+# Secondary indexes over the employees, Used by EmployeeManagementSystem.find().
+# Salary: sorted list of (salary, ID) searched with bisect.  Job title: hash map title -> set of IDs.
+# Name: sorted list of (lowercase name, ID), So all names with a given prefix are one contiguous range found with bisect.
+class SecondaryIndexes:
+    def __init__(self, rows: Iterable[List[Any]]):
+        """
+        Build the indexes from employee rows in the CSV format (without the header row).
+
+        Parameters:
+        rows: Employee rows.
+        """
+        self._employees: Dict[int, Employee] = {}  # ID -> Employee, Used to check the remaining criteria of a candidate in O(1)
+        for row in rows:
+            employee = Employee.from_list(row)
+            self._employees[employee.id] = employee
+        self._by_salary = sorted((employee.salary, employee.id) for employee in self._employees.values())
+        self._by_name = sorted((employee.name.lower(), employee.id) for employee in self._employees.values())
+        self._by_title: Dict[str, set] = {}
+        for employee in self._employees.values():
+            self._by_title.setdefault(employee.job_title, set()).add(employee.id)
+
+    def __len__(self) -> int:
+        """
+        Count the indexed employees.
+
+        Returns:
+        Number of indexed employees.
+        """
+        return len(self._employees)
+
+    def add(self, employee: Employee) -> None:
+        """
+        Add an employee to all indexes.
+
+        Parameters:
+        employee: The employee to add.
+        """
+        self._employees[employee.id] = employee
+        bisect.insort(self._by_salary, (employee.salary, employee.id))
+        bisect.insort(self._by_name, (employee.name.lower(), employee.id))
+        self._by_title.setdefault(employee.job_title, set()).add(employee.id)
 
+    def remove(self, employee_id: int) -> None:
+        """
+        Remove an employee from all indexes, If it is indexed.
 
+        Parameters:
+        employee_id: ID of the employee to remove.
+        """
+        employee = self._employees.pop(employee_id, None)
+        if employee is None:
+            return
+        for index, key in ((self._by_salary, (employee.salary, employee.id)), (self._by_name, (employee.name.lower(), employee.id))):
+            position = bisect.bisect_left(index, key)
+            if position < len(index) and index[position] == key:
+                del index[position]
+        ids = self._by_title.get(employee.job_title)
+        if ids is not None:
+            ids.discard(employee_id)
+            if not ids:
+                del self._by_title[employee.job_title]  # Don't keep empty buckets for titles nobody has anymore
+
+    def update(self, employee: Employee) -> None:
+        """
+        Re-index an employee after its data changed.
 
+        Parameters:
+        employee: The employee with its new data.
+        """
+        self.remove(employee.id)
+        self.add(employee)
 
+    def _salary_range(self, min_salary: Optional[int], max_salary: Optional[int]) -> Tuple[int, int]:
+        """
+        Find the positions of a salary range in the salary index.
 
+        Parameters:
+        min_salary: Lowest salary (no lower bound if None).
+        max_salary: Highest salary (no upper bound if None).
 
-# Class for handling database operations
-class DatabaseManager:
-    def __init__(self, database_path: str):
+        Returns:
+        The (start, end) positions of the range.
         """
-        Initialize the DatabaseManager with the path to the database file.
-        
+        start = bisect.bisect_left(self._by_salary, (min_salary, -1)) if min_salary is not None else 0
+        end = bisect.bisect_right(self._by_salary, (max_salary, float('inf'))) if max_salary is not None else len(self._by_salary)
+        return start, end
+
+    def _name_range(self, name_prefix: str) -> Tuple[int, int]:
+        """
+        Find the positions of the names starting with a prefix in the name index.
+
         Parameters:
-        database_path: Path to the database file.
+        name_prefix: The name prefix.
+
+        Returns:
+        The (start, end) positions of the range.
         """
-        self.database_path = database_path
+        prefix = name_prefix.lower()
+        start = bisect.bisect_left(self._by_name, (prefix,))
+        end = bisect.bisect_left(self._by_name, (prefix + '\U0010ffff',))  # Every name with the prefix sorts before prefix + the highest character
+        return start, end
 
-    def read_all(self) -> List[List[str]]: #  Indicates that the function returns a list of lists of strings
+    def find(self, name_prefix: Optional[str] = None, job_title: Optional[str] = None,
+             min_salary: Optional[int] = None, max_salary: Optional[int] = None) -> Iterator[Employee]:
         """
-        Read all rows from the database file.
-    
+        Find the employees matching all the given criteria, Driven by the most selective index.
+
+        Parameters:
+        name_prefix: Case-insensitive prefix of the name (optional).
+        job_title: Exact job title (optional).
+        min_salary: Lowest salary (optional).
+        max_salary: Highest salary (optional).
+
         Returns:
-        List of rows from the database.
+        A generator of the matching employees, Produced lazily.
         """
-        try:
-            with open(self.database_path, 'r') as file:
-                # Open the database file in read mode using a context manager (with statement),
-                # ensuring it is properly closed even if an error occurs.
-                return list(csv.reader(file))
-                # Read all rows from the CSV file (`file`) and convert them into a list of lists of strings.
-                # Each inner list corresponds to a row in the CSV file, where each element is a string.
-        except IOError as e:
-            # Catch IOError exceptions, which occur when there's an issue reading the file (e.g., file not found, permissions issue).
-            logging.error(f"Error reading database: {e}")
-            # Log the specific IOError (`e`) encountered while reading the database.
-            return []
-            # Return an empty list if an error occurs during file reading.
+        # Every index can tell how many candidates it would produce without producing them, So start from the smallest one
+        # and only copy its IDs. The copy is taken now, So a mutation while the results are consumed can't break the iteration
+        candidates: List[Tuple[int, Callable[[], List[int]]]] = []
+        if job_title is not None:
+            ids = self._by_title.get(job_title, set())
+            candidates.append((len(ids), lambda: list(ids)))
+        if name_prefix:
+            name_start, name_end = self._name_range(name_prefix)
+            candidates.append((name_end - name_start, lambda: [employee_id for _, employee_id in self._by_name[name_start:name_end]]))
+        if min_salary is not None or max_salary is not None:
+            salary_start, salary_end = self._salary_range(min_salary, max_salary)
+            candidates.append((salary_end - salary_start, lambda: [employee_id for _, employee_id in self._by_salary[salary_start:salary_end]]))
+        driving_ids = min(candidates, key = lambda candidate: candidate[0])[1]() if candidates else list(self._employees)
+
+        prefix = name_prefix.lower() if name_prefix else None
+        for employee_id in driving_ids:
+            employee = self._employees.get(employee_id)
+            if employee is None:  # Deleted while the results were being consumed
+                continue
+            if job_title is not None and employee.job_title != job_title:
+                continue
+            if prefix is not None and not employee.name.lower().startswith(prefix):
+                continue
+            if min_salary is not None and employee.salary < min_salary:
+                continue
+            if max_salary is not None and employee.salary > max_salary:
+                continue
+            yield employee
+
+
+
+
+
+
+# One change of one employee: (ID, row before, row after), A None row means the employee didn't exist on that side
+Change = Tuple[int, Optional[Tuple[str, ...]], Optional[Tuple[str, ...]]]
+
+
+# Function to freeze a row for the history
+def _frozen_row(row: Optional[Iterable[Any]]) -> Optional[Tuple[str, ...]]:
+    """
+    Convert a row to an immutable tuple of strings, The form rows are kept in by the mutation history.
 
-    def write_all(self, data: List[List[Any]]) -> None:
+    Parameters:
+    row: The row, or None.
+
+    Returns:
+    The frozen row, or None.
+    """
+    return tuple(str(value) for value in row) if row is not None else None
+
+
+# One entry of the mutation history: the changes made by one operation (a single add/update/delete, or a whole batch).
+# Only the employees the operation touched are stored, Never a copy of the table.
+class HistoryEntry:
+    __slots__ = ('operation', 'changes')  # Many small entries, So no per-instance __dict__
+
+    def __init__(self, operation: str, changes: Tuple[Change, ...]):
         """
-        Write a list of rows to the database file.
-        
+        Initialize a history entry.
+
         Parameters:
-        data: List of rows to write to the database. Which is expected to be a list of lists where each inner list contains elements of any type (Any). 
+        operation: Name of the operation (e.g. 'add', 'batch').
+        changes: The changes made by the operation, in order.
         """
-        try:
-            with open(self.database_path, 'w', newline = '') as file:  # Open the database file in write mode(so we can overwrite over it)
-            #We specify newline = '' in the open() function, to instruct Python to handle the newline character explicitly, For Example:
-            # Linux Systems: It ensures that Python does not translate \n to \r\n.
-            # Windows: It prevents Python from inserting an extra \r before each \n.
-                csv.writer(file).writerows(data)  # Write all rows to the file,
-                # Where it creates a CSV writer object csv.writer(file) for file, and uses its writerows() method to write all rows from data into the CSV file.
-                  
-        except IOError as e:  # Catch IOError exceptions, which occur when there's an issue reading the file (e.g., file not found, permissions issue).
-            logging.error(f"Error writing to database: {e}")  # Log the error
+        self.operation = operation
+        self.changes = changes
 
-    def append_row(self, row: List[Any]) -> None:
+
+# Bounded, linear history of the mutations applied through EmployeeManagementSystem, Used for undo/redo and point-in-time views.
+# Entries before the cursor are applied, entries after it were undone and can be redone, A new mutation discards them.
+# Version numbers count the applied entries since the history was created, So version 0 is the database as it was loaded.
+class MutationHistory:
+    def __init__(self, limit: int):
         """
-        Append a single row to the database file.
-        
+        Initialize an empty history.
+
         Parameters:
-        row: The row to append to the database.
+        limit: Maximum number of entries kept, The oldest ones are dropped first.
         """
-        try:
-            with open(self.database_path, 'a', newline = '') as file:  # Open the database file in append mode
-                csv.writer(file).writerow(row)  # Append the row to the file.
-                # Using the csv.writer object created from the file, the writerow() method appends the row list as a new row at the end of the CSV file.
-        except IOError as e:  # Catch IOError exceptions, which occur when there's an issue reading the file (e.g., file not found, permissions issue).
-            logging.error(f"Error appending to database: {e}")  # Log the error
+        self.limit = limit
+        self._entries: List[HistoryEntry] = []
+        self._cursor = 0  # Number of applied entries in _entries
+        self._base = 0  # Version of the state before _entries[0], It grows when old entries are dropped
+        self.serial = 0  # Incremented by every record/undo/redo, So point-in-time views know when they are stale
+
+    @property
+    def version(self) -> int:
+        """
+        Get the current version.
 
+        Returns:
+        The version of the current state.
+        """
+        return self._base + self._cursor
 
+    @property
+    def oldest_version(self) -> int:
+        """
+        Get the oldest version that can still be reached.
 
+        Returns:
+        The oldest reachable version.
+        """
+        return self._base
 
+    @property
+    def newest_version(self) -> int:
+        """
+        Get the newest version that can still be reached (through redo).
 
+        Returns:
+        The newest reachable version.
+        """
+        return self._base + len(self._entries)
 
-# Class representing an employee
-class Employee:
-    def __init__(self, id: int, name: str, job_title: str, salary: int):
+    def record(self, operation: str, changes: Iterable[Change]) -> None:
         """
-        Initialize an Employee with the given attributes.
-        
+        Record the changes of a new operation, Discarding the entries that could still have been redone.
+
         Parameters:
-        id: Employee ID.
-        name: Employee name.
-        job_title: Employee job title.
-        salary: Employee salary.
+        operation: Name of the operation.
+        changes: The changes made by the operation.
         """
-        self.id = id  # Assign the employee ID
-        self.name = name  # Assign the employee name
-        self.job_title = job_title  # Assign the employee job title
-        self.salary = salary  # Assign the employee salary
+        changes = tuple(change for change in changes if change[1] != change[2])  # Nothing to undo for an unchanged row
+        if not changes or self.limit <= 0:
+            return
+        del self._entries[self._cursor:]
+        self._entries.append(HistoryEntry(operation, changes))
+        self._cursor += 1
+        if len(self._entries) > self.limit:
+            del self._entries[0]
+            self._base += 1
+            self._cursor -= 1
+        self.serial += 1
+
+    def undo_entry(self) -> Optional[HistoryEntry]:
+        """
+        Get the entry the next undo reverts.
 
-    def to_list(self) -> List[Any]:
+        Returns:
+        The entry, or None if there is nothing to undo.
         """
-        Convert the Employee object to a list.
+        return self._entries[self._cursor - 1] if self._cursor > 0 else None
+
+    def redo_entry(self) -> Optional[HistoryEntry]:
+        """
+        Get the entry the next redo applies again.
 
         Returns:
-        List representation of the employee.
+        The entry, or None if there is nothing to redo.
         """
-        return [self.id, self.name, self.job_title, self.salary]  # Return the employee attributes as a list
-        #we return it as a list, so that we can make operations such as storing or serializing Employee objects into formats like CSV.
+        return self._entries[self._cursor] if self._cursor < len(self._entries) else None
 
-    @classmethod # For situations where we need to create a new instance but don't have an existing instance to call a method on.
-    def from_list(cls, data: List[str]) -> 'Employee':
+    def move(self, steps: int) -> None:
         """
-        Create an Employee object from a list.
-        
-        This method is useful for converting data read from CSV files or other text-based sources into structured Employee objects,
-        facilitating further manipulation and usage within the application.
+        Move the cursor after an undo (-1) or redo (+1) was applied to the database.
 
-        When you use cls in a class method, it refers to the class that calls the method, not necessarily the class where the method is defined.
-        This allows for more flexible and dynamic object creation, especially when dealing with inheritance and subclasses.
+        Parameters:
+        steps: Number of entries to move by.
+        """
+        self._cursor += steps
+        self.serial += 1
+
+    def overlay(self, version: int) -> Dict[int, Optional[Tuple[str, ...]]]:
+        """
+        Compute how the given version differs from the current state, By walking the entries in between.
+        This costs O(number of changes between the two versions), Independent of the size of the table.
 
         Parameters:
-        data: List of employee attributes.
-        
+        version: The version to compute (between oldest_version and newest_version).
+
         Returns:
-        An Employee object.
+        ID -> row at that version (None if the employee didn't exist then), For every employee changed in between.
         """
-        return cls(int(data[0]), data[1], data[2], int(data[3]))  # Create and return an Employee object
+        if not self.oldest_version <= version <= self.newest_version:
+            raise ValueError(f"Version {version} is not in the history (versions {self.oldest_version} to {self.newest_version} are kept)")
+        overlay: Dict[int, Optional[Tuple[str, ...]]] = {}
+        position = version - self._base
+        if position < self._cursor:  # Going back: the oldest 'before' of every employee wins, So walk back to the version
+            for entry in reversed(self._entries[position:self._cursor]):
+                for employee_id, before, _ in reversed(entry.changes):
+                    overlay[employee_id] = before
+        else:  # Going forward through undone entries: the newest 'after' wins
+            for entry in self._entries[self._cursor:position]:
+                for employee_id, _, after in entry.changes:
+                    overlay[employee_id] = after
+        return overlay
+
+
+# Read-only view of the database at a past (or undone) version: the current database with the changes made since then reverted.
+# Creating it costs O(delta), and every lookup is the database lookup plus a dictionary lookup.
+# The view is only valid until the next mutation through the same EmployeeManagementSystem.
+class HistorySnapshot:
+    def __init__(self, ems: 'EmployeeManagementSystem', version: int):
+        """
+        Initialize the view.
+
+        Parameters:
+        ems: The EmployeeManagementSystem whose history and database are used.
+        version: The version to show.
+        """
+        self.ems = ems
+        self.version = version
+        self._overlay = ems.history.overlay(version)
+        self._serial = ems.history.serial
+
+    def _check_fresh(self) -> None:
+        """
+        Make sure no mutation happened since the view was created, Its overlay would no longer match the database.
+        """
+        if self.ems.history.serial != self._serial:
+            raise RuntimeError(f"The snapshot of version {self.version} is stale, The database was changed after it was taken")
+
+    def get_row(self, employee_id: int) -> Optional[List[str]]:
+        """
+        Get the row of an employee at this version.
+
+        Parameters:
+        employee_id: ID of the employee.
+
+        Returns:
+        The employee row, or None if the employee didn't exist at this version.
+        """
+        self._check_fresh()
+        if employee_id in self._overlay:
+            row = self._overlay[employee_id]
+            return list(row) if row is not None else None
+        return self.ems.database_manager.get_row(employee_id)
+
+    def read_all(self) -> List[List[str]]:
+        """
+        Materialize all rows at this version (header row first), Like DatabaseManager.read_all().
+
+        Returns:
+        List of rows at this version.
+        """
+        self._check_fresh()
+        rows = self.ems.database_manager.read_all()
+        header = rows[0] if rows else list(CONFIG['INITIAL_EMPLOYEE_DATA'][0])
+        result = [header]
+        seen = set()
+        for row in rows[1:]:
+            employee_id = int(row[0])
+            seen.add(employee_id)
+            if employee_id not in self._overlay:
+                result.append(row)
+            elif self._overlay[employee_id] is not None:
+                result.append(list(self._overlay[employee_id]))
+        result.extend(list(row) for employee_id, row in self._overlay.items() if row is not None and employee_id not in seen)  # Deleted since
+        return result
 
 
 
@@ -193,26 +2472,71 @@ class Employee:
 
 # Class for managing employee data and operations
 class EmployeeManagementSystem:
-    def __init__(self, database_manager: DatabaseManager):
+    def __init__(self, database_manager: DatabaseManager, verbose: bool = True):
         """
         Initialize the EmployeeManagementSystem with a DatabaseManager.
         
         Parameters:
         database_manager: Instance of DatabaseManager for database operations.
+        verbose: Print the result of every operation for the user (optional), Callers using the return values (e.g. the HTTP service) turn it off.
         """
         self.database_manager = database_manager  # Assign the database manager
+        self.verbose = verbose
+        self.id_allocator = IdAllocator(database_manager.database_path + CONFIG['ID_SIDECAR_SUFFIX'], database_manager.max_id, database_manager.lock)  # Hands out IDs without rescanning the database
+        self._indexes: Optional[SecondaryIndexes] = None  # Secondary indexes for find(), Built on the first search and maintained by every mutation
+        self._indexes_generation = 0  # Database generation the secondary indexes were built from
+        self.history = MutationHistory(CONFIG['HISTORY_LIMIT'])  # Changes made through this instance, For undo/redo
+
+    @property
+    def indexes(self) -> SecondaryIndexes:
+        """
+        Get the secondary indexes, Building them from the database on first use.
+
+        Returns:
+        The secondary indexes.
+        """
+        generation = self.database_manager.refresh()  # Detect changes made to the database by someone else
+        if self._indexes is None or generation != self._indexes_generation:
+            self._indexes = SecondaryIndexes(self.database_manager.read_all()[1:])  # One full read, Then the indexes are kept up to date
+            self._indexes_generation = generation
+        return self._indexes
+
+    def find(self, name_prefix: Optional[str] = None, job_title: Optional[str] = None,
+             min_salary: Optional[int] = None, max_salary: Optional[int] = None) -> Iterator[Employee]:
+        """
+        Find the employees matching all the given criteria, Using the secondary indexes instead of scanning the database.
+        
+        Parameters:
+        name_prefix: Case-insensitive prefix of the employee name (optional).
+        job_title: Exact job title (optional).
+        min_salary: Lowest salary, inclusive (optional).
+        max_salary: Highest salary, inclusive (optional).
+        
+        Returns:
+        A generator of the matching employees, Produced lazily.
+        """
+        return self.indexes.find(name_prefix, job_title, min_salary, max_salary)
+
+    def _report(self, message: str) -> None:
+        """
+        Print a message for the user, Unless the system runs quietly.
+        
+        Parameters:
+        message: The message to print.
+        """
+        if self.verbose:
+            print(message)
 
     def _generate_next_employee_id(self) -> int: # The method name starts with an underscore (_) indicating it is intended for internal use within the class.
         """
-        Generate the next employee ID based on the current number of employees.
+        Generate the next employee ID from the persistent high-water mark, IDs of deleted employees are never reused.
         
         Returns:
         The next employee ID.
         """
-        employees = self.database_manager.read_all()  # Read all employees from the database
-        return len(employees)  # The length of the list corresponds to the number of rows (employees) in the database. The next employee ID is set to this length.
+        return self.id_allocator.allocate()
 
-    def add_employee(self, name: str, job_title: str, salary: int) -> None:
+    def add_employee(self, name: str, job_title: str, salary: int) -> Employee:
         """
         Add a new employee to the database.
         
@@ -220,13 +2544,39 @@ class EmployeeManagementSystem:
         name: Name of the employee.
         job_title: Job title of the employee.
         salary: Salary of the employee.
+        
+        Returns:
+        The new employee, With its ID.
         """
+        timer = OperationTimer('add')
         employee_id = self._generate_next_employee_id()  # Generate the next employee ID
+        timer.lap('read')
         new_employee = Employee(employee_id, name, job_title, salary)  # Create a new Employee object
+        timer.lap('mutate')
         self.database_manager.append_row(new_employee.to_list())  # Append the new employee to the database
-        logging.info(f"Added employee: {new_employee.to_list()}")  # Log the addition of the new employee
-        print("Employee added successfully.")  # Print a success message
-        self.display_employee_data(employee_id)  # Display the newly added employee's data
+        timer.lap('write')
+        self.history.record('add', [(employee_id, None, _frozen_row(new_employee.to_list()))])  # Remember the change for undo
+        if self._indexes is not None:
+            self._indexes.add(new_employee)  # Keep the secondary indexes up to date
+        timer.lap('mutate')
+        timer.log("Added employee", employee = new_employee.to_list())  # Log the addition of the new employee
+        self._report("Employee added successfully.")  # Print a success message
+        if self.verbose:
+            self.display_employee_data(employee_id)  # Display the newly added employee's data
+        return new_employee
+
+    def get_employee(self, employee_id: int) -> Optional[Employee]:
+        """
+        Get the employee with the given ID.
+        
+        Parameters:
+        employee_id: ID of the employee.
+        
+        Returns:
+        The employee, or None if the employee is not found.
+        """
+        row = self.database_manager.get_row(employee_id)  # Look up the employee by ID
+        return Employee.from_list(row) if row is not None else None
 
     def display_employee_data(self, employee_id: int) -> None:
         """
@@ -235,43 +2585,66 @@ class EmployeeManagementSystem:
         Parameters:
         employee_id: ID of the employee.
         """
-        employees = self.database_manager.read_all()  # Read all employees from the database
-        for employee in employees[1:]:  # Skip header row and iterate through employees
-            if int(employee[0]) == employee_id:  # Check if the employee ID matches
-                print(f"ID: {employee[0]}")  # Print employee ID
-                print(f"Name: {employee[1]}")  # Print employee name
-                print(f"Job Title: {employee[2]}")  # Print employee job title
-                print(f"Salary: {employee[3]}")  # Print employee salary
-                return
+        employee = self.database_manager.get_row(employee_id)  # Look up the employee by ID
+        if employee is not None:
+            print(f"ID: {employee[0]}")  # Print employee ID
+            print(f"Name: {employee[1]}")  # Print employee name
+            print(f"Job Title: {employee[2]}")  # Print employee job title
+            print(f"Salary: {employee[3]}")  # Print employee salary
+            return
         print(f"Employee with ID {employee_id} not found.")  # Print a message if the employee is not found
 
-    def delete_employee(self, employee_id: int) -> None:
+    def delete_employee(self, employee_id: int) -> bool:
         """
         Delete an employee from the database based on the provided ID.
         
         Parameters:
         employee_id: ID of the employee to delete.
-        """
-        employees = self.database_manager.read_all()  # Read all employees from the database
-        updated_employees = [employees[0]]  # Keep the header row
-        deleted = False  # Flag to check if an employee was deleted
-        for employee in employees[1:]:  # Iterate through employees
-            if int(employee[0]) != employee_id:  # If employee ID does not match, keep the employee
-                updated_employees.append(employee)
-            else:
-                deleted = True  # Set deleted flag to True if the employee is found and deleted
         
+        Returns:
+        True if the employee was found and deleted, False otherwise.
+        """
+        timer = OperationTimer('delete')
+        with self.database_manager.lock.exclusive():  # The row we remember for undo must be the row we delete
+            employee = self.database_manager.get_row(employee_id)
+            deleted = employee is not None and self.database_manager.delete_row(employee_id)  # Delete the employee, The other employees keep their IDs
         if deleted:
-            # Update IDs to be sequential
-            for i, employee in enumerate(updated_employees[1:], start=1):  # Reassign sequential IDs starting from 1
-                employee[0] = i
-            self.database_manager.write_all(updated_employees)  # Write the updated employee list to the database
-            logging.info(f"Deleted employee with ID: {employee_id}")  # Log the deletion
-            print(f"Employee with ID {employee_id} has been deleted successfully.")  # Print a success message
-        else:
-            print(f"Employee with ID {employee_id} not found.")  # Print a message if the employee is not found
-
-    def update_employee(self, employee_id: int, new_job_title: Optional[str] = None, new_salary: Optional[int] = None) -> None:
+            timer.lap('write')
+            self.history.record('delete', [(employee_id, _frozen_row(employee), None)])  # Remember the change for undo
+            if self._indexes is not None:
+                self._indexes.remove(employee_id)  # Keep the secondary indexes up to date
+            timer.lap('mutate')
+            timer.log("Deleted employee", employee_id = employee_id)  # Log the deletion
+            self._report(f"Employee with ID {employee_id} has been deleted successfully.")  # Print a success message
+            return True
+        self._report(f"Employee with ID {employee_id} not found.")  # Print a message if the employee is not found
+        return False
+
+    def delete_employees(self, employee_ids: List[int]) -> int:
+        """
+        Delete several employees from the database in one operation.
+        
+        Parameters:
+        employee_ids: IDs of the employees to delete.
+        
+        Returns:
+        Number of employees that were found and deleted.
+        """
+        timer = OperationTimer('delete_many')
+        with self.database_manager.lock.exclusive():  # The rows we remember for undo must be the rows we delete
+            employees = {employee_id: self.database_manager.get_row(employee_id) for employee_id in employee_ids}
+            deleted = self.database_manager.delete_rows(employee_ids)  # One rewrite / journal write / transaction for all of them
+        timer.lap('write')
+        self.history.record('delete_many', [(employee_id, _frozen_row(row), None) for employee_id, row in employees.items() if row is not None])  # Remember the changes for undo, As one entry
+        if self._indexes is not None:
+            for employee_id in employee_ids:
+                self._indexes.remove(employee_id)  # Keep the secondary indexes up to date
+        timer.lap('mutate')
+        timer.log("Deleted employees", employee_ids = employee_ids, deleted = deleted)  # Log the deletion
+        self._report(f"{deleted} of {len(employee_ids)} employees have been deleted successfully.")  # Print a summary
+        return deleted
+
+    def update_employee(self, employee_id: int, new_job_title: Optional[str] = None, new_salary: Optional[int] = None) -> Optional[Employee]:
         """
         Update the job title and/or salary of an existing employee.
         
@@ -279,20 +2652,209 @@ class EmployeeManagementSystem:
         employee_id: ID of the employee to update.
         new_job_title: New job title of the employee (optional).
         new_salary: New salary of the employee (optional).
+        
+        Returns:
+        The updated employee, or None if the employee is not found.
         """
-        employees = self.database_manager.read_all()  # Read all employees from the database
-        for employee in employees[1:]:  # Iterate through employees (skip header row)
-            if int(employee[0]) == employee_id:  # Check if the employee ID matches
+        timer = OperationTimer('update')
+        with self.database_manager.lock.exclusive():  # No other process may change the employee between our read and our write
+            employee = self.database_manager.get_row(employee_id)  # Look up the employee by ID
+            timer.lap('read')
+            if employee is not None:
+                before = _frozen_row(employee)  # Remembered for undo
                 if new_job_title:
                     employee[2] = new_job_title  # Update the job title if provided
                 if new_salary is not None:
                     employee[3] = str(new_salary)  # Update the salary if provided
-                self.database_manager.write_all(employees)  # Write the updated employee list to the database
-                logging.info(f"Updated employee: {employee}")  # Log the update
-                print(f"Employee with ID {employee_id} has been updated successfully.")  # Print a success message
+                timer.lap('mutate')
+                self.database_manager.update_row(employee_id, employee)  # Write the updated employee to the database
+                timer.lap('write')
+                self.history.record('update', [(employee_id, before, _frozen_row(employee))])  # Remember the change for undo
+        if employee is not None:
+            updated_employee = Employee.from_list(employee)
+            if self._indexes is not None:
+                self._indexes.update(updated_employee)  # Keep the secondary indexes up to date
+            timer.lap('mutate')
+            timer.log("Updated employee", employee = employee)  # Log the update
+            self._report(f"Employee with ID {employee_id} has been updated successfully.")  # Print a success message
+            if self.verbose:
                 self.display_employee_data(employee_id)  # Display the updated employee data
-                return
-        print(f"Employee with ID {employee_id} not found.")  # Print a message if the employee is not found
+            return updated_employee
+        self._report(f"Employee with ID {employee_id} not found.")  # Print a message if the employee is not found
+        return None
+
+    def apply_batch(self, operations: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Apply a batch of add/update/delete operations in one pass over the data.
+        The database is read once, every operation is applied to an in-memory ID index, and the database is written once at the end.
+        The exclusive database lock is held for the whole batch, So no other process can change the database in between.
+
+        Each operation is a dictionary with an 'op' key ('add', 'update' or 'delete') and the fields it needs:
+        add: name, job_title, salary.  update: id, job_title and/or salary.  delete: id.
+        New employees get their IDs from the ID allocator, and deleted IDs are never reused.
+
+        Parameters:
+        operations: The operations to apply, in order.
+
+        Returns:
+        One result per operation: its number, operation, employee ID, status ('ok' or 'error') and message.
+        """
+        with self.database_manager.lock.exclusive():  # The whole batch is one read-modify-write, So other processes wait until it is written
+            timer = OperationTimer('batch')
+            rows = self.database_manager.read_all()  # The only read of the batch
+            timer.lap('read')
+            header = rows[0] if rows else CONFIG['INITIAL_EMPLOYEE_DATA'][0]
+            employees: Dict[int, List[Any]] = {int(row[0]): row for row in rows[1:]}  # ID -> row, Keeps the file order
+            results: List[Dict[str, Any]] = []
+            before: Dict[int, Optional[Tuple[str, ...]]] = {}  # ID -> row before the batch, For every employee the batch touches (for undo)
+
+            for number, operation in enumerate(operations, start=1):
+                if not isinstance(operation, dict):  # Valid JSON that isn't an object, e.g. [1, 2]
+                    results.append({'number': number, 'op': None, 'id': None, 'status': 'error', 'message': "operation must be a JSON object"})
+                    continue
+                result: Dict[str, Any] = {'number': number, 'op': operation.get('op'), 'id': None, 'status': 'ok', 'message': ''}
+                try:
+                    if operation.get('op') == 'add':
+                        employee = Employee(0, operation['name'], operation['job_title'], int(operation['salary']))  # Validate the fields before using up an ID
+                        employee.id = result['id'] = self.id_allocator.allocate(persist = False)  # The high-water mark is saved once, before the write
+                        before[employee.id] = None
+                        employees[employee.id] = employee.to_list()
+                        logging.info("Added employee", extra = {'operation': 'add', 'employee': employees[employee.id]})
+                    elif operation.get('op') == 'update':
+                        employee_id = int(operation['id'])
+                        if employee_id not in employees:
+                            raise ValueError(f"Employee with ID {employee_id} not found.")
+                        job_title = operation.get('job_title') or None
+                        salary = str(int(operation['salary'])) if operation.get('salary') not in (None, '') else None  # Validate every field first, So a failed update changes nothing
+                        before.setdefault(employee_id, _frozen_row(employees[employee_id]))
+                        if job_title:
+                            employees[employee_id][2] = job_title  # Update the job title if provided
+                        if salary is not None:
+                            employees[employee_id][3] = salary  # Update the salary if provided
+                        result['id'] = employee_id
+                        logging.info("Updated employee", extra = {'operation': 'update', 'employee': employees[employee_id]})
+                    elif operation.get('op') == 'delete':
+                        employee_id = int(operation['id'])
+                        if employee_id not in employees:
+                            raise ValueError(f"Employee with ID {employee_id} not found.")
+                        before.setdefault(employee_id, _frozen_row(employees.pop(employee_id)))
+                        result['id'] = employee_id
+                        logging.info("Deleted employee", extra = {'operation': 'delete', 'employee_id': employee_id})
+                    else:
+                        raise ValueError(f"Unknown operation: {operation.get('op')}")
+                except KeyError as e:  # A field the operation needs is missing
+                    result['status'], result['message'] = 'error', f"Missing field: {e.args[0]}"
+                except (TypeError, ValueError) as e:  # An ID that doesn't exist, or a field with a wrong value (e.g. a salary that isn't a number)
+                    result['status'], result['message'] = 'error', str(e)
+                results.append(result)
+
+            timer.lap('mutate')
+            self.id_allocator.persist()  # Save the high-water mark first, So a crash during the write can't make IDs be handed out twice
+            self.database_manager.write_all([header] + list(employees.values()))  # The only write of the batch
+            timer.lap('write')
+            self.history.record('batch', [(employee_id, row, _frozen_row(employees.get(employee_id))) for employee_id, row in before.items()])  # The whole batch is undone at once
+            self._indexes = None  # The secondary indexes are rebuilt on the next search
+            timer.log("Applied batch", operations = len(results), failed = sum(1 for result in results if result['status'] != 'ok'))
+            return results
+
+    def _apply_history_entry(self, entry: HistoryEntry, undo: bool) -> bool:
+        """
+        Apply the changes of a history entry to the database, Backwards (undo) or forwards (redo).
+        Nothing is changed if an employee no longer looks like the entry expects, E.g. because another process changed it since.
+
+        Parameters:
+        entry: The history entry.
+        undo: Revert the entry instead of applying it again.
+
+        Returns:
+        True if the changes were applied, False if they conflict with the current database.
+        """
+        steps = [(employee_id, after, before) if undo else (employee_id, before, after) for employee_id, before, after in entry.changes]  # (ID, expected current row, target row)
+        with self.database_manager.lock.exclusive():  # No other process may change the employees between our check and our write
+            if len(steps) == 1:  # A single row, Changed in place like the original operation did
+                employee_id, expected, target = steps[0]
+                if _frozen_row(self.database_manager.get_row(employee_id)) != expected:
+                    return False
+                if target is None:
+                    self.database_manager.delete_row(employee_id)
+                elif expected is None:
+                    self.database_manager.append_row(list(target))
+                else:
+                    self.database_manager.update_row(employee_id, list(target))
+            else:  # Many rows, One read and one write like apply_batch
+                rows = self.database_manager.read_all()
+                header = rows[0] if rows else CONFIG['INITIAL_EMPLOYEE_DATA'][0]
+                employees: Dict[int, List[Any]] = {int(row[0]): row for row in rows[1:]}
+                if any(_frozen_row(employees.get(employee_id)) != expected for employee_id, expected, _ in steps):
+                    return False
+                for employee_id, _, target in steps:
+                    if target is None:
+                        employees.pop(employee_id, None)
+                    else:
+                        employees[employee_id] = list(target)
+                self.database_manager.write_all([header] + list(employees.values()))
+        if self._indexes is not None:
+            for employee_id, _, target in steps:
+                self._indexes.remove(employee_id)  # Keep the secondary indexes up to date
+                if target is not None:
+                    self._indexes.add(Employee.from_list(list(target)))
+        return True
+
+    def undo(self) -> bool:
+        """
+        Revert the last operation made through this system (an add, update, delete or a whole batch).
+
+        Returns:
+        True if an operation was reverted, False if there was nothing to undo or the employees were changed since.
+        """
+        entry = self.history.undo_entry()
+        if entry is None:
+            self._report("Nothing to undo.")
+            return False
+        timer = OperationTimer('undo')
+        if not self._apply_history_entry(entry, undo = True):
+            logging.warning("Undo refused, The employees were changed since", extra = {'operation': 'undo', 'undone': entry.operation})
+            self._report(f"Can't undo the last {entry.operation}: the employees it changed were modified since.")
+            return False
+        self.history.move(-1)
+        timer.lap('write')
+        timer.log("Undid operation", undone = entry.operation, changes = len(entry.changes), version = self.history.version)
+        self._report(f"Undid {entry.operation} ({len(entry.changes)} employees), Now at version {self.history.version}.")
+        return True
+
+    def redo(self) -> bool:
+        """
+        Apply again the last operation reverted by undo().
+
+        Returns:
+        True if an operation was applied again, False if there was nothing to redo or the employees were changed since.
+        """
+        entry = self.history.redo_entry()
+        if entry is None:
+            self._report("Nothing to redo.")
+            return False
+        timer = OperationTimer('redo')
+        if not self._apply_history_entry(entry, undo = False):
+            logging.warning("Redo refused, The employees were changed since", extra = {'operation': 'redo', 'redone': entry.operation})
+            self._report(f"Can't redo the {entry.operation}: the employees it changed were modified since.")
+            return False
+        self.history.move(1)
+        timer.lap('write')
+        timer.log("Redid operation", redone = entry.operation, changes = len(entry.changes), version = self.history.version)
+        self._report(f"Redid {entry.operation} ({len(entry.changes)} employees), Now at version {self.history.version}.")
+        return True
+
+    def snapshot_at(self, version: int) -> HistorySnapshot:
+        """
+        Get a read-only view of the database at a past (or undone) version, Without copying the table.
+
+        Parameters:
+        version: The version, Between history.oldest_version and history.newest_version.
+
+        Returns:
+        The view, Valid until the next mutation.
+        """
+        return HistorySnapshot(self, version)
 
 
 
@@ -346,8 +2908,11 @@ class DeleteEmployeeCommand(Command):
         Parameters:
         ems: Instance of EmployeeManagementSystem.
         """
-        employee_id = int(input("Enter the employee ID to delete: "))  # Prompt for employee ID to delete
-        ems.delete_employee(employee_id)  # Delete the employee
+        employee_ids = [int(value) for value in input("Enter the employee ID to delete (Separate several IDs with commas): ").split(',')]  # Prompt for employee ID(s) to delete
+        if len(employee_ids) == 1:
+            ems.delete_employee(employee_ids[0])  # Delete the employee
+        else:
+            ems.delete_employees(employee_ids)  # Delete all of them in one operation
 
 # Command for updating an employee
 class UpdateEmployeeCommand(Command):
@@ -364,6 +2929,47 @@ class UpdateEmployeeCommand(Command):
         new_salary = int(new_salary) if new_salary else None  # Convert new salary to int if provided
         ems.update_employee(employee_id, new_job_title or None, new_salary)  # Update the employee
 
+# Command for searching employees
+class SearchEmployeesCommand(Command):
+    def execute(self, ems: EmployeeManagementSystem) -> None:
+        """
+        Execute the search employees command.
+        
+        Parameters:
+        ems: Instance of EmployeeManagementSystem.
+        """
+        name_prefix = input("Enter the start of the name (Press 'Enter' to skip): ")  # Prompt for name prefix
+        job_title = input("Enter the job title (Press 'Enter' to skip): ")  # Prompt for job title
+        min_salary = input("Enter the minimum salary (Press 'Enter' to skip): ")  # Prompt for minimum salary
+        max_salary = input("Enter the maximum salary (Press 'Enter' to skip): ")  # Prompt for maximum salary
+        found = 0
+        for employee in ems.find(name_prefix or None, job_title or None, int(min_salary) if min_salary else None, int(max_salary) if max_salary else None):
+            print(f"ID: {employee.id} | Name: {employee.name} | Job Title: {employee.job_title} | Salary: {employee.salary}")  # Print each match as it is found
+            found += 1
+        print(f"{found} employees found.")  # Print the number of matches
+
+# Command for undoing the last change
+class UndoCommand(Command):
+    def execute(self, ems: EmployeeManagementSystem) -> None:
+        """
+        Execute the undo command.
+        
+        Parameters:
+        ems: Instance of EmployeeManagementSystem.
+        """
+        ems.undo()  # Revert the last add/update/delete (or batch)
+
+# Command for redoing the last undone change
+class RedoCommand(Command):
+    def execute(self, ems: EmployeeManagementSystem) -> None:
+        """
+        Execute the redo command.
+        
+        Parameters:
+        ems: Instance of EmployeeManagementSystem.
+        """
+        ems.redo()  # Apply the last undone change again
+
 # Command for exiting the program
 class ExitCommand(Command):
     def execute(self, ems: EmployeeManagementSystem) -> None:
@@ -373,6 +2979,7 @@ class ExitCommand(Command):
         Parameters:
         ems: Instance of EmployeeManagementSystem.
         """
+        ems.database_manager.compact()  # Fold any pending journal entries into the database file before leaving
         print("Exiting program.")  # Print exit message
         exit()  # Exit the program
 
@@ -389,29 +2996,99 @@ def display_menu(ems: EmployeeManagementSystem) -> None:
     Parameters:
     ems: Instance of EmployeeManagementSystem.
     """
-    commands: Dict[str, Command] = {  # Map user choices to command classes
-        '1': AddEmployeeCommand(),
-        '2': DisplayEmployeeCommand(),
-        '3': DeleteEmployeeCommand(),
-        '4': UpdateEmployeeCommand(),
-        '5': ExitCommand()
-    }
+    # Menu entries in choice order: (label, command). New commands are appended at the end, So the existing
+    # choices (and scripts typing them) keep their numbers, Exit stays 5.
+    menu: List[Tuple[str, Command]] = [
+        ("Add New Employee", AddEmployeeCommand()),
+        ("Display Employee Data", DisplayEmployeeCommand()),
+        ("Delete Employee", DeleteEmployeeCommand()),
+        ("Update Employee", UpdateEmployeeCommand()),
+        ("Exit", ExitCommand()),
+        ("Search Employees", SearchEmployeesCommand()),
+        ("Undo", UndoCommand()),
+        ("Redo", RedoCommand()),
+    ]
+    commands: Dict[str, Command] = {str(number): command for number, (_, command) in enumerate(menu, start = 1)}  # Map user choices to command classes
 
     while True:
         # Display the menu options
         print("\n===== Employee Management Menu =====")
-        print("1. Add New Employee")
-        print("2. Display Employee Data")
-        print("3. Delete Employee")
-        print("4. Update Employee")
-        print("5. Exit")
+        for number, (label, _) in enumerate(menu, start = 1):
+            print(f"{number}. {label}")
         
-        choice = input("Enter your choice (1-5): ")  # Prompt for user choice
+        choice = input(f"Enter your choice (1-{len(menu)}): ")  # Prompt for user choice
         
         if choice in commands:
             commands[choice].execute(ems)  # Execute the corresponding command
         else:
-            print("Invalid choice. Please enter a number from 1 to 5.")  # Print error message for invalid choice
+            print(f"Invalid choice. Please enter a number from 1 to {len(menu)}.")  # Print error message for invalid choice
+
+
+
+
+
+
+# Function to read a batch file of operations
+def read_batch_operations(batch_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read add/update/delete operations from a JSON-lines file (.jsonl / .json) or a CSV file.
+
+    JSON-lines: one object per line, e.g. {"op": "update", "id": 3, "salary": 45000}
+    CSV: a header row with the field names (op,id,name,job_title,salary), Empty cells mean "not provided".
+
+    Parameters:
+    batch_path: Path to the batch file.
+
+    Returns:
+    A generator of operations, in file order.
+    """
+    with open(batch_path, 'r', newline = '') as file:
+        if os.path.splitext(batch_path)[1].lower() in ('.jsonl', '.json'):
+            for line in file:
+                if line.strip():  # Skip blank lines
+                    yield json.loads(line)
+        else:
+            for operation in csv.DictReader(file):
+                yield {field: value for field, value in operation.items() if value not in (None, '')}  # Drop empty cells
+
+
+# Function to apply a batch file and report the results
+def run_batch(ems: EmployeeManagementSystem, batch_path: str, report_path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Apply a batch file of operations, Then report the per-operation results and the total throughput.
+
+    Parameters:
+    ems: Instance of EmployeeManagementSystem.
+    batch_path: Path to the batch file (JSON-lines or CSV).
+    report_path: Path to a CSV file for the per-operation results (optional), They are printed if not provided.
+
+    Returns:
+    One result per operation.
+    """
+    start = time.perf_counter()
+    try:
+        results = ems.apply_batch(read_batch_operations(batch_path))
+    except (IOError, json.JSONDecodeError) as e:  # The batch file can't be read or isn't valid JSON
+        logging.error(f"Error reading batch file: {e}")
+        print(f"Error reading batch file {batch_path}: {e}")
+        return []
+    elapsed = time.perf_counter() - start
+
+    fields = ['number', 'op', 'id', 'status', 'message']
+    if report_path:
+        with open(report_path, 'w', newline = '') as file:
+            writer = csv.DictWriter(file, fieldnames = fields)
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        for result in results:
+            print(f"#{result['number']} {result['op']} ID {result['id']}: {result['status']} {result['message']}".rstrip())
+
+    failed = sum(1 for result in results if result['status'] != 'ok')
+    throughput = len(results) / elapsed if elapsed > 0 else float('inf')
+    print(f"Applied {len(results) - failed}/{len(results)} operations ({failed} failed) in {elapsed:.3f} s, {throughput:,.0f} operations/s")
+    logging.info("Batch file applied", extra = {'batch_path': batch_path, 'operations': len(results), 'failed': failed, 'elapsed_s': round(elapsed, 3)})
+    return results
 
 
 
@@ -421,8 +3098,14 @@ def display_menu(ems: EmployeeManagementSystem) -> None:
 # Function to initialize the database with initial data
 def initialize_database() -> None:
     """
-    Initialize the database with initial data.
+    Initialize the database with initial data, If the database file doesn't exist yet.
+    An existing database file is kept, So the journaled backend can recover the mutations of a crashed session.
     """
+    if os.path.exists(CONFIG['DATABASE_PATH']):  # Keep the existing data
+        return
+    sidecar_path = CONFIG['DATABASE_PATH'] + CONFIG['ID_SIDECAR_SUFFIX']
+    if os.path.exists(sidecar_path):
+        os.remove(sidecar_path)  # The high-water mark of a previous database doesn't apply to the new one
     try:
         with open(CONFIG['DATABASE_PATH'], 'w', newline = '') as file:  # Open the database file in write mode
             csv.writer(file).writerows(CONFIG['INITIAL_EMPLOYEE_DATA'])  # Write the initial data to the database
@@ -439,10 +3122,20 @@ def initialize_database() -> None:
 def main() -> None:
     """
     Main function to run the Employee Management System program.
+    Runs the interactive menu, or applies a batch file non-interactively when --batch is given.
     """
+    parser = argparse.ArgumentParser(description = "Employee Management System")
+    parser.add_argument('--batch', help = "Apply the add/update/delete operations of a JSON-lines or CSV file, Then exit.")
+    parser.add_argument('--report', help = "Write the per-operation results of --batch to this CSV file instead of printing them.")
+    args = parser.parse_args()
+
+    configure_logging()  # Start the background log writer
     initialize_database()  # Initialize the database
     database_manager = DatabaseManager(CONFIG['DATABASE_PATH'])  # Create a DatabaseManager instance
     ems = EmployeeManagementSystem(database_manager)  # Create an EmployeeManagementSystem instance
+    if args.batch:
+        run_batch(ems, args.batch, args.report)  # Apply the batch file and report the results
+        return
     display_menu(ems)  # Display the menu and start accepting user commands
 
 # Entry point for the program
@@ -0,0 +1,174 @@
+import argparse  # Import argparse for reading the benchmark options from the command line
+import multiprocessing  # Import multiprocessing for running several operators against the same database at once
+import os  # Import os for building paths inside the temporary directory
+import random  # Import random for picking the operations and the IDs they work on
+import tempfile  # Import tempfile so the benchmark never touches the real database file
+import time  # Import time for measuring the throughput
+from typing import Any, Dict, List  # Import typing helpers to specify the type of elements
+
+from Employee_Database import CONFIG, STORAGE_BACKENDS, DatabaseManager, Employee, EmployeeManagementSystem  # Import the classes every operator process uses
+from benchmark_storage import JOB_TITLES, generate_database  # Reuse the synthetic database generator
+
+
+
+
+# Share of each operation in the mixed workload, The rest are point lookups
+ADD_RATIO = 0.4
+UPDATE_RATIO = 0.2
+
+
+
+
+def run_operator(backend_name: str, path: str, rows: int, operations: int, seed: int) -> Dict[str, Any]:
+    """
+    Run one operator process: a random mix of adds, updates of its own employees and lookups on the shared database.
+
+    Parameters:
+    backend_name: Name of the backend in STORAGE_BACKENDS.
+    path: Path of the shared CSV database.
+    rows: Number of employees the database started with.
+    operations: Number of operations to run.
+    seed: Seed of the random generator, So every operator runs a different mix.
+
+    Returns:
+    The IDs this operator added, the last salary it wrote for each of them, and its operation counters.
+    """
+    random.seed(seed)
+    ems = EmployeeManagementSystem(DatabaseManager(path, STORAGE_BACKENDS[backend_name](path)))
+    database_manager = ems.database_manager
+    salaries: Dict[int, int] = {}  # ID -> last salary written by this operator
+    counts = {'add': 0, 'update': 0, 'lookup': 0}
+
+    start = time.perf_counter()
+    for number in range(operations):
+        choice = random.random()
+        if choice < ADD_RATIO or not salaries:
+            employee = Employee(ems.id_allocator.allocate(), f"Operator {seed} Employee {number}", random.choice(JOB_TITLES), number)
+            database_manager.append_row(employee.to_list())  # Same steps as EmployeeManagementSystem.add_employee, Without the printing
+            salaries[employee.id] = employee.salary
+            counts['add'] += 1
+        elif choice < ADD_RATIO + UPDATE_RATIO:
+            employee_id = random.choice(list(salaries))
+            salaries[employee_id] = number
+            with database_manager.lock.exclusive():  # Same read-modify-write as EmployeeManagementSystem.update_employee
+                row = database_manager.get_row(employee_id)
+                row[3] = str(number)
+                database_manager.update_row(employee_id, row)
+            counts['update'] += 1
+        else:
+            database_manager.get_row(random.randint(1, rows))
+            counts['lookup'] += 1
+    elapsed = time.perf_counter() - start
+
+    database_manager.compact()  # Fold our journal entries into the base file, Like the Exit command does
+    return {'salaries': salaries, 'counts': counts, 'elapsed': elapsed}
+
+
+def run_operator_star(arguments: tuple) -> Dict[str, Any]:
+    """
+    Unpack the arguments of run_operator, Pool.imap_unordered passes a single argument.
+
+    Parameters:
+    arguments: The arguments of run_operator.
+
+    Returns:
+    The result of run_operator.
+    """
+    return run_operator(*arguments)
+
+
+def verify(backend_name: str, path: str, rows: int, results: List[Dict[str, Any]]) -> List[str]:
+    """
+    Check that no row was lost, duplicated or overwritten by the concurrent operators.
+
+    Parameters:
+    backend_name: Name of the backend in STORAGE_BACKENDS.
+    path: Path of the shared CSV database.
+    rows: Number of employees the database started with.
+    results: The results of all operators.
+
+    Returns:
+    The problems found, An empty list means the database is consistent.
+    """
+    table = DatabaseManager(path, STORAGE_BACKENDS[backend_name](path)).read_all()[1:]
+    ids = [int(row[0]) for row in table]
+    found = {int(row[0]): row for row in table}
+    expected = {employee_id: salary for result in results for employee_id, salary in result['salaries'].items()}
+
+    problems = []
+    if len(ids) != len(found):
+        problems.append(f"{len(ids) - len(found)} duplicate IDs")
+    if sum(len(result['salaries']) for result in results) != len(expected):
+        problems.append("The same ID was handed out to two operators")
+    missing_initial = [employee_id for employee_id in range(1, rows + 1) if employee_id not in found]
+    if missing_initial:
+        problems.append(f"{len(missing_initial)} initial employees lost")
+    lost = [employee_id for employee_id in expected if employee_id not in found]
+    if lost:
+        problems.append(f"{len(lost)} added employees lost")
+    overwritten = [employee_id for employee_id, salary in expected.items() if employee_id in found and int(found[employee_id][3]) != salary]
+    if overwritten:
+        problems.append(f"{len(overwritten)} updates lost")
+    if len(found) != rows + len(expected):
+        problems.append(f"{len(found)} employees found instead of {rows + len(expected)}")
+    return problems
+
+
+def benchmark_backend(backend_name: str, directory: str, rows: int, processes: int, operations: int) -> List[str]:
+    """
+    Run the operators concurrently on a fresh database, Then verify it and measure the throughput.
+
+    Parameters:
+    backend_name: Name of the backend in STORAGE_BACKENDS.
+    directory: Directory of the temporary database files.
+    rows: Number of employees in the database.
+    processes: Number of operator processes.
+    operations: Number of operations per operator.
+
+    Returns:
+    One result row of the report.
+    """
+    path = os.path.join(directory, f"employees_{backend_name}_{processes}.csv")
+    generate_database(path, rows)
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        results = list(pool.imap_unordered(run_operator_star, [(backend_name, path, rows, operations, seed) for seed in range(processes)]))
+    elapsed = time.perf_counter() - start
+
+    problems = verify(backend_name, path, rows, results)
+    total = processes * operations
+    counts = {operation: sum(result['counts'][operation] for result in results) for operation in ('add', 'update', 'lookup')}
+    return [backend_name, str(processes), f"{total:,}", f"{counts['add']}/{counts['update']}/{counts['lookup']}",
+            f"{elapsed:.2f}", f"{total / elapsed:,.0f}", "; ".join(problems) or "OK"]
+
+
+def main() -> None:
+    """
+    Stress the storage backends with several processes doing mixed reads and writes, And print a report.
+    """
+    parser = argparse.ArgumentParser(description = "Benchmark concurrent multi-process access to the employees database.")
+    parser.add_argument('--processes', type = int, nargs = '+', default = [1, 4, 8], help = "Numbers of concurrent operator processes.")
+    parser.add_argument('--operations', type = int, default = 200, help = "Operations run by each operator.")
+    parser.add_argument('--rows', type = int, default = 1000, help = "Number of employees in the database at the start.")
+    parser.add_argument('--backends', nargs = '+', default = list(STORAGE_BACKENDS), choices = list(STORAGE_BACKENDS), help = "Storage backends to stress.")
+    args = parser.parse_args()
+
+    CONFIG['JOURNAL_FSYNC'] = False  # Measure the locking, Not the disk (the operator processes inherit this when they are forked)
+    report = [["Backend", "Processes", "Operations", "Add/Update/Lookup", "Time (s)", "Operations/s", "Result"]]
+    with tempfile.TemporaryDirectory() as directory:
+        for processes in args.processes:
+            for backend_name in args.backends:
+                report.append(benchmark_backend(backend_name, directory, args.rows, processes, args.operations))
+                print(" | ".join(report[-1]))
+
+    # Print the final report as an aligned table
+    widths = [max(len(row[column]) for row in report) for column in range(len(report[0]))]
+    print()
+    for row in report:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+
+
+# Entry point for the benchmark
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import argparse  # Import argparse for reading the benchmark options from the command line
+import csv  # Import the csv module for reading the synthetic database
+import gc  # Import gc to collect garbage between measurements
+import os  # Import os for building paths inside the temporary directory
+import tempfile  # Import tempfile so the benchmark never touches the real database file
+import time  # Import time for measuring the filter time
+import tracemalloc  # Import tracemalloc for measuring the memory allocated by each representation
+from typing import Any, Callable, List, Tuple  # Import typing helpers to specify the type of elements
+
+from Employee_Database import Employee, EmployeeTable  # Import the representations we want to compare
+from benchmark_storage import generate_database  # Reuse the synthetic database generator
+
+
+
+
+# Employee as it was before __slots__, Kept here only as the baseline of the comparison
+class DictEmployee:
+    def __init__(self, id: int, name: str, job_title: str, salary: int):
+        self.id = id
+        self.name = name
+        self.job_title = job_title
+        self.salary = salary
+
+
+
+
+def read_rows(path: str) -> List[List[str]]:
+    """
+    Load the database like DatabaseManager.read_all() does: a list of lists of strings.
+    """
+    with open(path, 'r', newline = '') as file:
+        reader = csv.reader(file)
+        next(reader, None)  # Skip header row
+        return list(reader)
+
+
+def load_dict_employees(path: str) -> List[DictEmployee]:
+    """
+    Load the database as a list of Employee objects with a per-instance __dict__.
+    """
+    with open(path, 'r', newline = '') as file:
+        reader = csv.reader(file)
+        next(reader, None)
+        return [DictEmployee(int(row[0]), row[1], row[2], int(row[3])) for row in reader]
+
+
+def load_slotted_employees(path: str) -> List[Employee]:
+    """
+    Load the database as a list of slotted Employee objects.
+    """
+    with open(path, 'r', newline = '') as file:
+        reader = csv.reader(file)
+        next(reader, None)
+        return [Employee.from_list(row) for row in reader]
+
+
+def measure(loader: Callable[[str], Any], path: str) -> Tuple[Any, float]:
+    """
+    Load the database with the given loader and measure the memory still held by the result.
+
+    Parameters:
+    loader: Function that loads the database file.
+    path: Path of the synthetic CSV database.
+
+    Returns:
+    The loaded data and the memory it holds in MiB.
+    """
+    gc.collect()
+    tracemalloc.start()
+    data = loader(path)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()  # Memory still allocated after loading, i.e. held by the data
+    tracemalloc.stop()
+    return data, current / (1 << 20)
+
+
+def main() -> None:
+    """
+    Compare the memory held by each employee representation and print a report.
+    """
+    parser = argparse.ArgumentParser(description = "Benchmark the memory used by the employee representations.")
+    parser.add_argument('--rows', type = int, default = 1_000_000, help = "Number of employees in the synthetic database.")
+    args = parser.parse_args()
+
+    representations = [
+        ("read_all() rows", read_rows),
+        ("Employee with __dict__", load_dict_employees),
+        ("Employee with __slots__", load_slotted_employees),
+        ("EmployeeTable", EmployeeTable.from_csv),
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "employees.csv")
+        generate_database(path, args.rows)
+
+        report = [["Representation", "Memory (MiB)", "Bytes/employee", "vs read_all()"]]
+        baseline = None
+        for label, loader in representations:
+            data, mebibytes = measure(loader, path)
+            baseline = baseline or mebibytes
+            report.append([label, f"{mebibytes:.1f}", f"{mebibytes * (1 << 20) / args.rows:.0f}", f"{mebibytes / baseline:.0%}"])
+            print(" | ".join(report[-1]))
+            table = data if isinstance(data, EmployeeTable) else None
+            del data
+
+    # Show that the table can answer queries without creating one object per row
+    start = time.perf_counter()
+    matches = table.filter_job_title("Firmware Engineer", table.filter_salary_range(30000, 40000))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"\nEmployeeTable filter (salary 30000-40000 and title 'Firmware Engineer'): {len(matches):,} matches in {elapsed_ms:.1f} ms")
+
+    # Print the final report as an aligned table
+    widths = [max(len(row[column]) for row in report) for column in range(len(report[0]))]
+    print()
+    for row in report:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+
+
+# Entry point for the benchmark
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse  # Import argparse for reading the benchmark options from the command line
+import filecmp  # Import filecmp for checking that the round trip gives back the same file
+import gc  # Import gc to collect garbage between measurements
+import os  # Import os for building paths inside the temporary directory
+import tempfile  # Import tempfile so the benchmark never touches the real database file
+import time  # Import time for measuring the load times
+from typing import Any, Callable, List, Tuple  # Import typing helpers to specify the type of elements
+
+from Employee_Database import EmployeeTable, IndexedStorageBackend, csv_to_snapshot, snapshot_to_csv  # Import the loaders we want to compare
+from benchmark_storage import generate_database  # Reuse the synthetic database generator
+
+
+
+
+def timed(operation: Callable[[], Any]) -> Tuple[Any, float]:
+    """
+    Run the operation once and measure it.
+
+    Parameters:
+    operation: The operation to measure.
+
+    Returns:
+    The result of the operation and its time in milliseconds.
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = operation()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    """
+    Compare the cold start from the CSV file with the cold start from a binary snapshot, And check the conversion is lossless.
+    """
+    parser = argparse.ArgumentParser(description = "Benchmark loading the employees database from CSV and from a binary snapshot.")
+    parser.add_argument('--rows', type = int, default = 1_000_000, help = "Number of employees in the synthetic database.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "employees.csv")
+        snapshot_path = os.path.join(directory, "employees.snapshot")
+        round_trip_path = os.path.join(directory, "employees_round_trip.csv")
+        generate_database(csv_path, args.rows)
+
+        report = [["Step", "Time (ms)", "Employees"]]
+        steps: List[Tuple[str, Callable[[], Any]]] = [
+            ("Cold start: IndexedStorageBackend (CSV)", lambda: IndexedStorageBackend(csv_path).count()),
+            ("Cold start: EmployeeTable.from_csv", lambda: len(EmployeeTable.from_csv(csv_path))),
+            ("Convert CSV -> snapshot", lambda: csv_to_snapshot(csv_path, snapshot_path)),
+            ("Cold start: EmployeeTable.load_snapshot", lambda: len(EmployeeTable.load_snapshot(snapshot_path))),
+            ("Convert snapshot -> CSV", lambda: snapshot_to_csv(snapshot_path, round_trip_path)),
+        ]
+        for label, operation in steps:
+            count, elapsed_ms = timed(operation)
+            report.append([label, f"{elapsed_ms:,.1f}", f"{count:,}"])
+            print(" | ".join(report[-1]))
+
+        # The snapshot is only useful if nothing is lost on the way, So the round trip must give back the same bytes
+        identical = filecmp.cmp(csv_path, round_trip_path, shallow = False)
+        table = EmployeeTable.load_snapshot(snapshot_path)
+        _, filter_ms = timed(lambda: table.filter_job_title("Firmware Engineer", table.filter_salary_range(30000, 40000)))
+        print(f"\nCSV: {os.path.getsize(csv_path) / (1 << 20):.1f} MiB, Snapshot: {os.path.getsize(snapshot_path) / (1 << 20):.1f} MiB")
+        print(f"Filter on the loaded snapshot (salary 30000-40000 and title 'Firmware Engineer'): {filter_ms:.1f} ms")
+        print(f"Round trip CSV -> snapshot -> CSV: {'identical' if identical else 'DIFFERENT'}")
+        del table  # Release the mapping before the temporary directory is removed
+
+    # Print the final report as an aligned table
+    widths = [max(len(row[column]) for row in report) for column in range(len(report[0]))]
+    print()
+    for row in report:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+
+
+# Entry point for the benchmark
+if __name__ == "__main__":
+    main()
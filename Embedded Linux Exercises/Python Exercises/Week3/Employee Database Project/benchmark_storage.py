@@ -0,0 +1,116 @@
+import argparse  # Import argparse for reading the benchmark options from the command line
+import csv  # Import the csv module for generating the synthetic databases
+import os  # Import os for building paths inside the temporary directory
+import random  # Import random for picking the IDs to look up and update
+import tempfile  # Import tempfile so the benchmark never touches the real database file
+import time  # Import time for measuring the elapsed time of each operation
+from typing import Callable, List  # Import typing helpers to specify the type of elements
+
+from Employee_Database import STORAGE_BACKENDS, DatabaseManager  # Import the storage backends we want to compare
+
+
+
+
+# Default sizes of the synthetic databases
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+# Job titles used for the synthetic employees
+JOB_TITLES = ["Embedded Linux Engineer", "Analog Designer", "Digital Designer", "Verification Engineer", "Firmware Engineer"]
+
+
+
+
+def generate_database(path: str, rows: int) -> None:
+    """
+    Generate a synthetic employees database in the same CSV format used by Employee_Database.py.
+
+    Parameters:
+    path: Path of the CSV file to create.
+    rows: Number of employees to generate.
+    """
+    with open(path, 'w', newline = '') as file:
+        writer = csv.writer(file)
+        writer.writerow(["ID", "Name", "Job Title", "Salary"])  # Header row
+        for employee_id in range(1, rows + 1):
+            writer.writerow([employee_id, f"Employee {employee_id}", JOB_TITLES[employee_id % len(JOB_TITLES)], 20000 + employee_id % 50000])
+
+
+def time_per_operation(operation: Callable[[int], object], employee_ids: List[int]) -> float:
+    """
+    Run the operation once per employee ID and return the mean time of one operation.
+
+    Parameters:
+    operation: The operation to measure, It receives the employee ID.
+    employee_ids: The employee IDs to run the operation on.
+
+    Returns:
+    Mean time of one operation in milliseconds.
+    """
+    start = time.perf_counter()
+    for employee_id in employee_ids:
+        operation(employee_id)
+    return (time.perf_counter() - start) * 1000 / max(len(employee_ids), 1)
+
+
+def benchmark_backend(backend_name: str, path: str, rows: int, lookups: int, updates: int, cache_enabled: bool) -> List[str]:
+    """
+    Measure the load time, point lookups and point updates of one storage backend.
+
+    Parameters:
+    backend_name: Name of the backend in STORAGE_BACKENDS.
+    path: Path of the synthetic CSV database.
+    rows: Number of employees in the database.
+    lookups: Number of point lookups to measure.
+    updates: Number of point updates to measure.
+    cache_enabled: Serve the reads from the read-through cache, Off measures the backend itself (e.g. the csv rescans).
+
+    Returns:
+    One result row of the report.
+    """
+    database_manager = DatabaseManager(path, STORAGE_BACKENDS[backend_name](path), cache_enabled = cache_enabled)
+
+    start = time.perf_counter()
+    database_manager.count()  # The first access loads the file (the indexed backend builds its index here)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    lookup_ids = [random.randint(1, rows) for _ in range(lookups)]
+    lookup_ms = time_per_operation(database_manager.get_row, lookup_ids)
+
+    update_ids = [random.randint(1, rows) for _ in range(updates)]
+    update_ms = time_per_operation(lambda employee_id: database_manager.update_row(employee_id, [employee_id, f"Employee {employee_id}", "Updated Title", 1]), update_ids)
+
+    return [backend_name, "on" if cache_enabled else "off", f"{rows:,}", f"{load_ms:.1f}", f"{lookup_ms:.4f}", f"{update_ms:.1f}"]
+
+
+def main() -> None:
+    """
+    Compare the storage backends on synthetic databases of different sizes and print a report.
+    """
+    parser = argparse.ArgumentParser(description = "Benchmark the DatabaseManager storage backends.")
+    parser.add_argument('--sizes', type = int, nargs = '+', default = DEFAULT_SIZES, help = "Number of employees of each synthetic database.")
+    parser.add_argument('--backends', nargs = '+', default = list(STORAGE_BACKENDS), choices = list(STORAGE_BACKENDS), help = "Storage backends to compare.")
+    parser.add_argument('--lookups', type = int, default = 20, help = "Point lookups measured per backend (the csv backend rescans the file for each one).")
+    parser.add_argument('--updates', type = int, default = 3, help = "Point updates measured per backend.")
+    parser.add_argument('--cache', nargs = '+', default = ["off", "on"], choices = ["off", "on"], help = "Run without and/or with the read-through cache, Each run is a separate row.")
+    args = parser.parse_args()
+
+    report = [["Backend", "Cache", "Rows", "Load (ms)", "Lookup (ms/op)", "Update (ms/op)"]]
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.sizes:
+            for backend_name in args.backends:
+                for cache in args.cache:
+                    path = os.path.join(directory, f"employees_{rows}_{backend_name}_{cache}.csv")
+                    generate_database(path, rows)  # Every run starts from a fresh copy, because the updates modify the file
+                    report.append(benchmark_backend(backend_name, path, rows, args.lookups, args.updates, cache == "on"))
+                    print(" | ".join(report[-1]))
+
+    # Print the final report as an aligned table
+    widths = [max(len(row[column]) for row in report) for column in range(len(report[0]))]
+    print()
+    for row in report:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+
+
+# Entry point for the benchmark
+if __name__ == "__main__":
+    main()
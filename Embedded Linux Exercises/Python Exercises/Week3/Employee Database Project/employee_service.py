@@ -0,0 +1,404 @@
+import argparse  # Import argparse for reading the service options from the command line
+import asyncio  # Import asyncio for serving many keep-alive connections from a single thread
+import json  # Import json for the request and response bodies
+import logging  # Import logging for logging information and errors
+import signal  # Import signal for stopping the service cleanly on SIGINT/SIGTERM
+import time  # Import time for measuring the request latency
+from concurrent.futures import ThreadPoolExecutor  # Import ThreadPoolExecutor for running the database writes off the event loop
+from http import HTTPStatus  # Import HTTPStatus for the reason phrases of the status lines
+from typing import Any, Callable, Dict, List, Optional, Tuple  # Import typing helpers to specify the type of elements
+from urllib.parse import parse_qs, urlsplit  # Import urllib.parse for splitting the request target into path and query
+
+from Employee_Database import CONFIG, DatabaseManager, Employee, EmployeeManagementSystem, configure_logging, initialize_database  # Import the system we serve
+
+
+
+
+# Class for a request latency histogram, Buckets grow by powers of two (1 us, 2 us, 4 us, ...),
+# So a fixed small number of counters covers everything from microseconds to minutes with a bounded relative error.
+class LatencyHistogram:
+    BUCKETS = 40  # 2^40 us is about 12 days, Far above any request
+
+    def __init__(self):
+        """
+        Initialize an empty histogram.
+        """
+        self.counts = [0] * self.BUCKETS  # counts[i] = number of requests that took less than 2^i us (and at least 2^(i-1) us)
+        self.count = 0
+        self.total = 0.0  # Sum of all latencies in seconds, For the mean
+        self.maximum = 0.0
+
+    def record(self, seconds: float) -> None:
+        """
+        Record the latency of one request.
+
+        Parameters:
+        seconds: The latency in seconds.
+        """
+        bucket = min(int(seconds * 1_000_000).bit_length(), self.BUCKETS - 1)  # O(1), No search over the bucket bounds
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Get an upper bound of a latency percentile.
+
+        Parameters:
+        percent: The percentile (e.g. 99 for p99).
+
+        Returns:
+        The upper bound of the bucket holding the percentile, in seconds.
+        """
+        rank = percent / 100 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min((1 << bucket) / 1_000_000, self.maximum)
+        return self.maximum
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Summarize the histogram for the /stats endpoint.
+
+        Returns:
+        The request count, the mean/p50/p90/p99/max latencies in milliseconds, and the non-empty buckets.
+        """
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            'p50_ms': round(self.percentile(50) * 1000, 3),
+            'p90_ms': round(self.percentile(90) * 1000, 3),
+            'p99_ms': round(self.percentile(99) * 1000, 3),
+            'max_ms': round(self.maximum * 1000, 3),
+            'buckets_us': {f"<{1 << bucket}": count for bucket, count in enumerate(self.counts) if count},
+        }
+
+
+
+
+# Exception for requests that can't be served, Turned into a JSON error response with its HTTP status
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        """
+        Initialize the HttpError.
+
+        Parameters:
+        status: The HTTP status of the response.
+        message: The error message sent to the client.
+        """
+        super().__init__(message)
+        self.status = status
+
+
+
+
+# Class serving an EmployeeManagementSystem over HTTP/JSON.
+# All requests share one EmployeeManagementSystem, So the data is loaded once and then served from memory
+# (the in-memory index of the storage backend or the DatabaseManager cache, plus the secondary indexes for searches).
+# Requests are served by one asyncio event loop thread. Reads run on the loop, and writes (add/update/delete) run in a single
+# writer thread, So a write waiting for its fsync doesn't stall the other connections. A lock keeps every EmployeeManagementSystem
+# call alone, So the EmployeeManagementSystem is never used by two requests at the same time and the writes stay serialized.
+#
+# Endpoints:
+#   GET    /employees?name=&job_title=&min_salary=&max_salary=&limit=    Search the employees (all criteria optional)
+#   GET    /employees/<id>    Get one employee
+#   POST   /employees    Add an employee, Body: {"name": ..., "job_title": ..., "salary": ...}
+#   PATCH  /employees/<id>    Update an employee, Body: {"job_title": ...} and/or {"salary": ...}
+#   DELETE /employees/<id>    Delete an employee
+#   GET    /stats    Latency histograms per endpoint and cache counters
+class EmployeeService:
+    MAX_BODY_SIZE = 1 << 20  # Largest accepted request body, 1 MiB
+
+    def __init__(self, ems: EmployeeManagementSystem, keepalive_timeout: Optional[float] = None):
+        """
+        Initialize the EmployeeService.
+
+        Parameters:
+        ems: The EmployeeManagementSystem to serve, It should be created with verbose = False.
+        keepalive_timeout: Seconds an idle connection stays open (optional), Defaults to CONFIG['SERVICE_KEEPALIVE_TIMEOUT'].
+        """
+        self.ems = ems
+        self.keepalive_timeout = keepalive_timeout or CONFIG['SERVICE_KEEPALIVE_TIMEOUT']
+        self.histograms: Dict[str, LatencyHistogram] = {}  # Endpoint (e.g. "GET /employees/{id}") -> latency histogram
+        self.started = time.time()
+        self._writer = ThreadPoolExecutor(max_workers = 1, thread_name_prefix = 'ems-writer')  # One thread, So the writes run one after the other
+        self._ems_lock = asyncio.Lock()  # Held during every EmployeeManagementSystem call, Reads wait while a write runs in the writer thread
+
+    @staticmethod
+    def _employee_to_dict(employee: Employee) -> Dict[str, Any]:
+        """
+        Convert an employee to its JSON representation.
+
+        Parameters:
+        employee: The employee.
+
+        Returns:
+        The employee as a dictionary.
+        """
+        return {'id': employee.id, 'name': employee.name, 'job_title': employee.job_title, 'salary': employee.salary}
+
+    @staticmethod
+    def _parse_int(value: Any, field: str) -> int:
+        """
+        Convert a request field to an integer.
+
+        Parameters:
+        value: The field value.
+        field: The field name, For the error message.
+
+        Returns:
+        The integer value.
+        """
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise HttpError(400, f"{field} must be an integer")
+
+    def _parse_body(self, body: bytes) -> Dict[str, Any]:
+        """
+        Parse a JSON object request body.
+
+        Parameters:
+        body: The raw request body.
+
+        Returns:
+        The parsed object.
+        """
+        try:
+            data = json.loads(body or b'{}')
+        except ValueError:
+            raise HttpError(400, "The request body is not valid JSON")
+        if not isinstance(data, dict):
+            raise HttpError(400, "The request body must be a JSON object")
+        return data
+
+    async def _write(self, function: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a mutating EmployeeManagementSystem call in the writer thread, Without blocking the event loop.
+
+        Parameters:
+        function: The EmployeeManagementSystem method.
+        args: Its arguments.
+
+        Returns:
+        The result of the call.
+        """
+        async with self._ems_lock:
+            return await asyncio.get_running_loop().run_in_executor(self._writer, function, *args)
+
+    async def route(self, method: str, path: str, query: Dict[str, List[str]], body: bytes) -> Tuple[str, int, Any]:
+        """
+        Run a request against the EmployeeManagementSystem.
+
+        Parameters:
+        method: The HTTP method.
+        path: The request path, Without the query string.
+        query: The parsed query string.
+        body: The raw request body.
+
+        Returns:
+        The endpoint name (for the histograms), the HTTP status and the JSON payload (None for an empty body).
+        """
+        parts = [part for part in path.split('/') if part]
+        if parts == ['stats'] and method == 'GET':
+            return 'GET /stats', 200, self.stats()
+        if not parts or parts[0] != 'employees' or len(parts) > 2:
+            raise HttpError(404, f"No endpoint at {path}")
+
+        if len(parts) == 1:
+            if method == 'GET':
+                field = lambda name: query[name][0] if name in query else None  # First value of a query parameter
+                min_salary, max_salary = field('min_salary'), field('max_salary')
+                limit = self._parse_int(field('limit'), 'limit') if field('limit') is not None else None
+                min_salary = self._parse_int(min_salary, 'min_salary') if min_salary is not None else None
+                max_salary = self._parse_int(max_salary, 'max_salary') if max_salary is not None else None
+                results = []
+                async with self._ems_lock:
+                    for employee in self.ems.find(field('name'), field('job_title'), min_salary, max_salary):  # find() is lazy, So a limit stops the search early
+                        if limit is not None and len(results) >= limit:
+                            break
+                        results.append(self._employee_to_dict(employee))
+                return 'GET /employees', 200, {'count': len(results), 'employees': results}
+            if method == 'POST':
+                data = self._parse_body(body)
+                if not data.get('name') or not data.get('job_title') or 'salary' not in data:
+                    raise HttpError(400, "name, job_title and salary are required")
+                employee = await self._write(self.ems.add_employee, str(data['name']), str(data['job_title']), self._parse_int(data['salary'], 'salary'))
+                return 'POST /employees', 201, self._employee_to_dict(employee)
+            raise HttpError(405, f"{method} is not allowed on /employees")
+
+        employee_id = self._parse_int(parts[1], 'The employee ID')
+        endpoint = f"{method} /employees/{{id}}"
+        if method == 'GET':
+            async with self._ems_lock:
+                employee = self.ems.get_employee(employee_id)
+        elif method == 'PATCH':
+            data = self._parse_body(body)
+            salary = self._parse_int(data['salary'], 'salary') if data.get('salary') is not None else None
+            employee = await self._write(self.ems.update_employee, employee_id, data.get('job_title') or None, salary)
+        elif method == 'DELETE':
+            if not await self._write(self.ems.delete_employee, employee_id):
+                raise HttpError(404, f"Employee with ID {employee_id} not found")
+            return endpoint, 204, None
+        else:
+            raise HttpError(405, f"{method} is not allowed on /employees/<id>")
+        if employee is None:
+            raise HttpError(404, f"Employee with ID {employee_id} not found")
+        return endpoint, 200, self._employee_to_dict(employee)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the service statistics.
+
+        Returns:
+        The uptime, the latency histogram of every endpoint and the DatabaseManager cache counters.
+        """
+        return {
+            'uptime_s': round(time.time() - self.started, 1),
+            'endpoints': {endpoint: histogram.to_dict() for endpoint, histogram in sorted(self.histograms.items())},
+            'cache': self.ems.database_manager.cache_stats(),
+        }
+
+    def _response(self, status: int, payload: Any, keep_alive: bool) -> bytes:
+        """
+        Build a complete HTTP/1.1 response.
+
+        Parameters:
+        status: The HTTP status.
+        payload: The JSON payload, or None for an empty body.
+        keep_alive: Keep the connection open after the response.
+
+        Returns:
+        The response bytes, Sent with a single write.
+        """
+        body = json.dumps(payload).encode() if payload is not None else b''
+        head = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}", f"Content-Length: {len(body)}"]
+        if body:
+            head.append("Content-Type: application/json")
+        if keep_alive:
+            head += ["Connection: keep-alive", f"Keep-Alive: timeout={int(self.keepalive_timeout)}"]
+        else:
+            head.append("Connection: close")
+        return ('\r\n'.join(head) + '\r\n\r\n').encode() + body
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serve the requests of one connection, One after the other, Until the client closes it or it stays idle too long.
+
+        Parameters:
+        reader: The stream to read the requests from.
+        writer: The stream to write the responses to.
+        """
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.keepalive_timeout)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):  # Closed by the client, or idle for too long
+                    return
+                except asyncio.LimitOverrunError:
+                    writer.write(self._response(431, {'error': "Request headers too large"}, False))
+                    return
+                start = time.perf_counter()
+
+                request_line, *header_lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = request_line.split(' ')
+                except ValueError:
+                    writer.write(self._response(400, {'error': "Malformed request line"}, False))
+                    return
+                headers = {}
+                for line in header_lines:
+                    if ':' in line:
+                        name, value = line.split(':', 1)
+                        headers[name.strip().lower()] = value.strip()
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'  # HTTP/1.1 keeps connections open by default
+
+                try:
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= self.MAX_BODY_SIZE:
+                    writer.write(self._response(413 if length > 0 else 400, {'error': "Invalid request body length"}, False))
+                    return
+                body = await reader.readexactly(length) if length else b''
+
+                url = urlsplit(target)
+                try:
+                    endpoint, status, payload = await self.route(method, url.path, parse_qs(url.query), body)
+                except HttpError as e:
+                    endpoint, status, payload = f"{method} error", e.status, {'error': str(e)}
+                except Exception as e:  # Never let one bad request take the connection down without an answer
+                    logging.exception(f"Error serving {method} {target}")
+                    endpoint, status, payload = f"{method} error", 500, {'error': f"Internal error: {e}"}
+
+                writer.write(self._response(status, payload, keep_alive))
+                await writer.drain()
+                self.histograms.setdefault(endpoint, LatencyHistogram()).record(time.perf_counter() - start)
+                if not keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):  # The client went away in the middle of a request
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int) -> None:
+        """
+        Accept connections until the task is cancelled, Or until SIGINT/SIGTERM is received.
+
+        Parameters:
+        host: Address to listen on.
+        port: Port to listen on.
+        """
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        addresses = ', '.join(str(sock.getsockname()) for sock in server.sockets)
+        logging.info(f"Employee service listening on {addresses}")
+        print(f"Employee service listening on {addresses}")
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signal_number, server.close)  # Stop accepting and return, So main() can compact the database
+            except (NotImplementedError, RuntimeError):  # Not supported on Windows, Ctrl+C raises KeyboardInterrupt there
+                pass
+        async with server:
+            try:
+                await server.serve_forever()
+            except asyncio.CancelledError:  # server.close() was called by a signal handler
+                logging.info("Employee service stopping")
+            finally:
+                self._writer.shutdown(wait = True)  # Let the last write finish before main() compacts the database
+
+
+
+
+# Main function to run the service
+def main() -> None:
+    """
+    Serve the employee database over HTTP/JSON until interrupted (Ctrl+C).
+    """
+    parser = argparse.ArgumentParser(description = "Serve the employee database over HTTP/JSON.")
+    parser.add_argument('--host', default = CONFIG['SERVICE_HOST'], help = "Address to listen on.")
+    parser.add_argument('--port', type = int, default = CONFIG['SERVICE_PORT'], help = "Port to listen on.")
+    parser.add_argument('--database', default = CONFIG['DATABASE_PATH'], help = "Path to the database file.")
+    args = parser.parse_args()
+
+    CONFIG['DATABASE_PATH'] = args.database
+    configure_logging()  # Logging from the event loop only queues the records, The file is written by a background thread
+    initialize_database()
+    ems = EmployeeManagementSystem(DatabaseManager(CONFIG['DATABASE_PATH']), verbose = False)
+    ems.indexes  # Load the data and build the secondary indexes before the first request, Not during it
+    try:
+        asyncio.run(EmployeeService(ems).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ems.database_manager.compact()  # Same as the Exit command of the menu
+        print("Employee service stopped.")
+
+
+# Entry point for the service
+if __name__ == "__main__":
+    main()
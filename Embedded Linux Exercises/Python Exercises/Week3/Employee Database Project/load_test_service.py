@@ -0,0 +1,176 @@
+import argparse  # Import argparse for reading the load test options from the command line
+import asyncio  # Import asyncio for running many concurrent keep-alive clients from one thread
+import json  # Import json for the request and response bodies
+import os  # Import os for building paths inside the temporary directory
+import random  # Import random for picking the requests and the IDs they work on
+import socket  # Import socket for finding a free port for the test server
+import subprocess  # Import subprocess for starting the service under test
+import sys  # Import sys for starting the service with the same Python interpreter
+import tempfile  # Import tempfile so the load test never touches the real database file
+import time  # Import time for measuring the throughput
+from typing import List, Optional, Tuple  # Import typing helpers to specify the type of elements
+
+from benchmark_storage import JOB_TITLES, generate_database  # Reuse the synthetic database generator
+from employee_service import LatencyHistogram  # Reuse the service histogram for the client-side latencies
+
+
+
+
+# Share of each request in the mixed workload, The rest are point lookups
+SEARCH_RATIO = 0.1
+UPDATE_RATIO = 0.2
+
+
+
+
+async def request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, method: str, path: str, payload: Optional[dict] = None) -> Tuple[int, bytes]:
+    """
+    Send one request on a keep-alive connection and read its response.
+
+    Parameters:
+    reader: The stream to read the response from.
+    writer: The stream to write the request to.
+    method: The HTTP method.
+    path: The request path and query string.
+    payload: The JSON body (optional).
+
+    Returns:
+    The HTTP status and the response body.
+    """
+    body = json.dumps(payload).encode() if payload is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+    length = next((int(line.split(':', 1)[1]) for line in head if line.lower().startswith('content-length:')), 0)
+    return int(head[0].split(' ')[1]), await reader.readexactly(length)
+
+
+async def client(host: str, port: int, rows: int, deadline: float, histogram: LatencyHistogram, errors: List[int]) -> None:
+    """
+    Run one client: a random mix of lookups, searches and updates on a single keep-alive connection until the deadline.
+
+    Parameters:
+    host: Address of the service.
+    port: Port of the service.
+    rows: Number of employees in the database, The IDs requested are 1..rows.
+    deadline: perf_counter() time at which to stop.
+    histogram: Histogram collecting the latency of every request.
+    errors: List collecting the status of every failed request.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            choice = random.random()
+            employee_id = random.randint(1, rows)
+            start = time.perf_counter()
+            if choice < SEARCH_RATIO:
+                status, _ = await request(reader, writer, 'GET', f"/employees?job_title={random.choice(JOB_TITLES).replace(' ', '+')}&limit=10")
+            elif choice < SEARCH_RATIO + UPDATE_RATIO:
+                status, _ = await request(reader, writer, 'PATCH', f"/employees/{employee_id}", {'salary': random.randint(20000, 90000)})
+            else:
+                status, _ = await request(reader, writer, 'GET', f"/employees/{employee_id}")
+            histogram.record(time.perf_counter() - start)
+            if status >= 400:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_level(host: str, port: int, rows: int, concurrency: int, duration: float) -> List[str]:
+    """
+    Run the given number of concurrent clients for a fixed duration.
+
+    Parameters:
+    host: Address of the service.
+    port: Port of the service.
+    rows: Number of employees in the database.
+    concurrency: Number of concurrent clients (connections).
+    duration: Seconds to run.
+
+    Returns:
+    One result row of the report.
+    """
+    histogram = LatencyHistogram()
+    errors: List[int] = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, rows, start + duration, histogram, errors) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    summary = histogram.to_dict()
+    return [str(concurrency), f"{histogram.count:,}", f"{histogram.count / elapsed:,.0f}",
+            f"{summary['p50_ms']:.2f}", f"{summary['p99_ms']:.2f}", f"{summary['max_ms']:.2f}", str(len(errors))]
+
+
+def free_port() -> int:
+    """
+    Find a free local TCP port for the test server.
+
+    Returns:
+    The port number.
+    """
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_port(host: str, port: int, timeout: float = 10.0) -> None:
+    """
+    Wait until the service accepts connections.
+
+    Parameters:
+    host: Address of the service.
+    port: Port of the service.
+    timeout: Seconds to wait before giving up (optional).
+    """
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def main() -> None:
+    """
+    Load-test the HTTP/JSON service at several concurrency levels and print a report.
+    """
+    parser = argparse.ArgumentParser(description = "Load-test the employee HTTP/JSON service on localhost.")
+    parser.add_argument('--concurrency', type = int, nargs = '+', default = [1, 8, 32, 128], help = "Numbers of concurrent keep-alive connections.")
+    parser.add_argument('--duration', type = float, default = 5.0, help = "Seconds to run each concurrency level.")
+    parser.add_argument('--rows', type = int, default = 10_000, help = "Number of employees in the test database.")
+    parser.add_argument('--port', type = int, help = "Test an already running service on this port (its database must have IDs 1..rows), Instead of starting one.")
+    args = parser.parse_args()
+
+    host = '127.0.0.1'
+    with tempfile.TemporaryDirectory() as directory:
+        server = None
+        port = args.port
+        if port is None:
+            path = os.path.join(directory, "employees.csv")
+            generate_database(path, args.rows)
+            port = free_port()
+            server = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "employee_service.py"),
+                                       '--host', host, '--port', str(port), '--database', path], cwd = directory, stdout = subprocess.DEVNULL)
+        try:
+            asyncio.run(wait_for_port(host, port))
+            report = [["Connections", "Requests", "Requests/s", "p50 (ms)", "p99 (ms)", "Max (ms)", "Errors"]]
+            for concurrency in args.concurrency:
+                report.append(asyncio.run(run_level(host, port, args.rows, concurrency, args.duration)))
+                print(" | ".join(report[-1]))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    # Print the final report as an aligned table
+    widths = [max(len(row[column]) for row in report) for column in range(len(report[0]))]
+    print()
+    for row in report:
+        print("  ".join(value.rjust(width) for value, width in zip(row, widths)))
+
+
+# Entry point for the load test
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,484 @@
+import argparse  # Import argparse for reading the report options from the command line
+import csv  # Import the csv module for parsing the database and writing CSV reports
+import io  # Import io for parsing decoded blocks of the database with the csv module
+import logging  # Import logging for logging information and errors
+import math  # Import math for the t-digest scale function
+import os  # Import os for file metadata and picking the output format
+import time  # Import time for measuring the report throughput
+from itertools import islice  # Import islice for cutting the row stream into chunks
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple  # Import typing helpers to specify the type of elements
+
+from Employee_Database import CONFIG, FileLock, SQLiteStorageBackend, configure_logging  # Import the configuration, the database lock, the SQLite backend and the logging setup
+
+try:
+    from openpyxl import Workbook  # Import openpyxl for XLSX reports (optional dependency)
+except ImportError:  # Only CSV reports are available without openpyxl
+    Workbook = None
+
+
+
+
+# Class for a t-digest, A small sketch of a distribution that answers percentile queries with a bounded relative error.
+# Values are buffered, then merged into a sorted list of centroids (mean, weight). The scale function keeps the centroids
+# small near the tails (p1, p99) and large in the middle, So at most about `compression` centroids are kept no matter how many values are added.
+class TDigest:
+    def __init__(self, compression: Optional[int] = None):
+        """
+        Initialize an empty t-digest.
+
+        Parameters:
+        compression: Accuracy / size trade-off (optional), Defaults to CONFIG['REPORT_TDIGEST_COMPRESSION'].
+        """
+        self.compression = compression or CONFIG['REPORT_TDIGEST_COMPRESSION']
+        self.count = 0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self._means: List[float] = []  # Centroid means, Sorted
+        self._weights: List[float] = []  # Centroid weights (number of values merged into each centroid)
+        self._buffer: List[float] = []  # Values added since the last merge
+        self._centroid_buffer: List[Tuple[float, float]] = []  # (mean, weight) centroids of merged digests, Not folded in yet
+        self._buffer_size = self.compression * 10  # Merging in batches amortizes the sort
+
+    def _k(self, q: float) -> float:
+        """
+        Scale function, It maps a quantile to a centroid index space where every centroid spans at most 1.
+
+        Parameters:
+        q: The quantile (0..1).
+
+        Returns:
+        The scaled value.
+        """
+        return self.compression / (2 * math.pi) * math.asin(2 * q - 1)
+
+    def _k_inverse(self, k: float) -> float:
+        """
+        Inverse of the scale function.
+
+        Parameters:
+        k: The scaled value.
+
+        Returns:
+        The quantile (0..1).
+        """
+        return (math.sin(min(k * 2 * math.pi / self.compression, math.pi / 2)) + 1) / 2
+
+    def add(self, value: float) -> None:
+        """
+        Add a value to the digest.
+
+        Parameters:
+        value: The value to add.
+        """
+        self._buffer.append(value)
+        self.count += 1
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+        if len(self._buffer) >= self._buffer_size:
+            self._merge()
+
+    def add_many(self, values: List[float]) -> None:
+        """
+        Add a batch of values to the digest, With the per-value work done by C builtins.
+
+        Parameters:
+        values: The values to add.
+        """
+        if not values:
+            return
+        self._buffer.extend(values)
+        self.count += len(values)
+        self.minimum = min(self.minimum, min(values))
+        self.maximum = max(self.maximum, max(values))
+        if len(self._buffer) >= self._buffer_size:
+            self._merge()
+
+    def _merge(self) -> None:
+        """
+        Merge the buffered values into the centroids, In one pass over the sorted values and centroids.
+        """
+        if not self._buffer and not self._centroid_buffer:
+            return
+        points = sorted(list(zip(self._means, self._weights)) + self._centroid_buffer + [(value, 1) for value in self._buffer])
+        self._buffer, self._centroid_buffer = [], []
+        total = self.count
+        means: List[float] = []
+        weights: List[float] = []
+        merged_weight = 0  # Weight of the centroids already emitted
+        mean, weight = points[0]
+        limit = self._k_inverse(self._k(0) + 1) * total  # Highest cumulative weight the current centroid may reach
+        for point_mean, point_weight in points[1:]:
+            if merged_weight + weight + point_weight <= limit:
+                weight += point_weight
+                mean += (point_mean - mean) * point_weight / weight  # Running weighted mean
+            else:
+                means.append(mean)
+                weights.append(weight)
+                merged_weight += weight
+                limit = self._k_inverse(self._k(merged_weight / total) + 1) * total
+                mean, weight = point_mean, point_weight
+        means.append(mean)
+        weights.append(weight)
+        self._means, self._weights = means, weights
+
+    def merge(self, other: 'TDigest') -> None:
+        """
+        Add all values of another digest to this one, Through its centroids.
+
+        Parameters:
+        other: The digest to merge into this one.
+        """
+        other._merge()
+        self._centroid_buffer.extend(zip(other._means, other._weights))
+        self.count += other.count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._merge()
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+        Estimate a percentile, By interpolating between the centroid centers.
+
+        Parameters:
+        percent: The percentile (e.g. 90 for p90).
+
+        Returns:
+        The estimated value, or None if the digest is empty.
+        """
+        self._merge()
+        if not self.count:
+            return None
+        target = percent / 100 * self.count
+        # Every centroid represents its weight spread around its mean, So its center sits in the middle of its cumulative weight
+        previous_center, previous_mean = 0.0, self.minimum
+        cumulative = 0.0
+        for mean, weight in zip(self._means, self._weights):
+            center = cumulative + weight / 2
+            if target < center:
+                if center == previous_center:
+                    return mean
+                return previous_mean + (mean - previous_mean) * (target - previous_center) / (center - previous_center)
+            cumulative += weight
+            previous_center, previous_mean = center, mean
+        if cumulative == previous_center:
+            return self.maximum
+        return previous_mean + (self.maximum - previous_mean) * (target - previous_center) / (cumulative - previous_center)
+
+    def __len__(self) -> int:
+        """
+        Count the centroids, Which bounds the memory used by the digest.
+
+        Returns:
+        Number of centroids.
+        """
+        self._merge()
+        return len(self._means)
+
+
+
+
+# Class for the aggregates of one group of employees (one job title, or everybody), Updated one salary at a time in O(1) memory
+class SalaryAggregate:
+    __slots__ = ('headcount', 'total', 'minimum', 'maximum', 'digest')
+
+    def __init__(self):
+        """
+        Initialize empty aggregates.
+        """
+        self.headcount = 0
+        self.total = 0  # Python integers never overflow, So the total stays exact for any number of employees
+        self.minimum: Optional[int] = None
+        self.maximum: Optional[int] = None
+        self.digest = TDigest()  # Percentile sketch
+
+    def add(self, salary: int) -> None:
+        """
+        Add the salary of one employee.
+
+        Parameters:
+        salary: The salary.
+        """
+        self.headcount += 1
+        self.total += salary
+        if self.minimum is None or salary < self.minimum:
+            self.minimum = salary
+        if self.maximum is None or salary > self.maximum:
+            self.maximum = salary
+        self.digest.add(salary)
+
+    def add_many(self, salaries: List[int]) -> None:
+        """
+        Add the salaries of a batch of employees.
+
+        Parameters:
+        salaries: The salaries.
+        """
+        if not salaries:
+            return
+        self.headcount += len(salaries)
+        self.total += sum(salaries)
+        low, high = min(salaries), max(salaries)
+        if self.minimum is None or low < self.minimum:
+            self.minimum = low
+        if self.maximum is None or high > self.maximum:
+            self.maximum = high
+        self.digest.add_many(salaries)
+
+    def merge(self, other: 'SalaryAggregate') -> None:
+        """
+        Add the aggregates of another group, E.g. to compute the total over all job titles.
+
+        Parameters:
+        other: The aggregates to add.
+        """
+        self.headcount += other.headcount
+        self.total += other.total
+        if other.minimum is not None and (self.minimum is None or other.minimum < self.minimum):
+            self.minimum = other.minimum
+        if other.maximum is not None and (self.maximum is None or other.maximum > self.maximum):
+            self.maximum = other.maximum
+        self.digest.merge(other.digest)
+
+
+# Function to read the pending changes of the journaled backend
+def read_journal_overlay(journal_path: str, base_file: Any) -> Dict[int, Optional[List[str]]]:
+    """
+    Read the journal of the 'journaled' backend as an overlay over the base CSV file, So the report includes the changes not compacted yet.
+    The journal is bounded by CONFIG['JOURNAL_COMPACTION_THRESHOLD'], So the overlay is small whatever the size of the base file.
+
+    Parameters:
+    journal_path: Path to the journal file.
+    base_file: The open base CSV file, The journal only applies if it was started on exactly this file.
+
+    Returns:
+    Employee ID -> latest row, or None for a deleted employee.
+    """
+    try:
+        with open(journal_path, 'rb') as file:
+            content = file.read()
+    except FileNotFoundError:  # Everything is compacted into the base file
+        return {}
+    stat = os.fstat(base_file.fileno())
+    entries = csv.reader(content[:content.rfind(b'\n') + 1].decode().splitlines())  # Ignore a torn entry at the end
+    if next(entries, None) != ['B', str(stat.st_size), str(stat.st_mtime_ns)]:  # A stale journal, Its entries are part of the base file already
+        return {}
+    overlay: Dict[int, Optional[List[str]]] = {}
+    for entry in entries:
+        try:
+            overlay[int(entry[1])] = entry[1:] if entry[0] in ('A', 'U') else None
+        except (ValueError, IndexError):
+            logging.error(f"Stopping journal overlay at a corrupted entry {entry}")
+            break
+    return overlay
+
+
+# Function to stream the employee rows of a CSV database in chunks
+def read_employee_chunks(csv_path: str, chunk_size: Optional[int] = None, journal_path: Optional[str] = None) -> Iterator[List[List[str]]]:
+    """
+    Read the employee rows of a CSV database in chunks, Without ever holding more than one chunk in memory.
+
+    The file is opened under the shared database lock and only the bytes present at that moment are read, So the report
+    sees a consistent snapshot: rows appended later are ignored, and full rewrites replace the file by rename without touching the open one.
+    The lock is released right after opening, So writers are not blocked while a large file is streamed.
+
+    Parameters:
+    csv_path: Path to the CSV database file.
+    chunk_size: Number of rows per chunk (optional), Defaults to CONFIG['REPORT_CHUNK_SIZE'].
+    journal_path: Path to the journal of the 'journaled' backend (optional), Its pending changes are applied on the fly.
+
+    Returns:
+    A generator of row lists, Header row excluded.
+    """
+    chunk_size = chunk_size or CONFIG['REPORT_CHUNK_SIZE']
+    with FileLock(csv_path + CONFIG['LOCK_SUFFIX']).shared():
+        file = open(csv_path, 'rb')
+        size = os.fstat(file.fileno()).st_size  # The snapshot ends here
+        overlay = read_journal_overlay(journal_path, file) if journal_path else {}
+
+    def snapshot_lines() -> Iterator[str]:
+        # Appends happen under the exclusive lock, So the first `size` bytes were complete when the snapshot was taken.
+        # They are read in large blocks cut at the last newline, Which is much cheaper than decoding line by line.
+        remaining, tail = size, b''
+        while remaining > 0:
+            block = file.read(min(1 << 20, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            block = tail + block
+            cut = block.rfind(b'\n') + 1
+            tail = block[cut:]
+            yield from io.StringIO(block[:cut].decode('utf-8'), newline = '')  # One line per item, Line endings kept for the csv module
+        if tail:  # The last row of a file without a final newline
+            yield tail.decode('utf-8')
+
+    def rows() -> Iterator[List[str]]:
+        reader = csv.reader(snapshot_lines())
+        next(reader, None)  # Skip the header row
+        if not overlay:
+            yield from reader
+            return
+        for row in reader:
+            try:
+                employee_id = int(row[0])
+            except (IndexError, ValueError):  # A blank or malformed row, Passed through so aggregate_payroll counts it as skipped
+                yield row
+                continue
+            if employee_id in overlay:
+                row = overlay.pop(employee_id)  # Updated or deleted since the last compaction
+                if row is None:
+                    continue
+            yield row
+        yield from (row for row in overlay.values() if row is not None)  # Added since the last compaction
+
+    with file:
+        stream = rows()
+        while True:
+            chunk = list(islice(stream, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+# Function to stream the employee rows of the SQLite backend in chunks
+def read_sqlite_chunks(csv_path: str, chunk_size: Optional[int] = None) -> Iterator[List[tuple]]:
+    """
+    Read the employee rows of the 'sqlite' backend in chunks, From a single read transaction (a consistent snapshot in WAL mode).
+
+    Parameters:
+    csv_path: Path to the CSV database file, The SQLite file is found next to it.
+    chunk_size: Number of rows per chunk (optional), Defaults to CONFIG['REPORT_CHUNK_SIZE'].
+
+    Returns:
+    A generator of row lists, Each row is an (id, name, job title, salary) tuple.
+    """
+    backend = SQLiteStorageBackend(csv_path)
+    try:
+        cursor = backend.connection.execute(backend.SELECT_ALL)
+        while True:
+            chunk = cursor.fetchmany(chunk_size or CONFIG['REPORT_CHUNK_SIZE'])
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        backend.close()
+
+
+# Function to compute the payroll aggregates of a stream of employee rows
+def aggregate_payroll(chunks: Iterable[List[List[str]]]) -> Dict[str, SalaryAggregate]:
+    """
+    Compute the per-job-title aggregates incrementally, In memory proportional to the number of job titles only.
+
+    Parameters:
+    chunks: Chunks of employee rows (ID, Name, Job Title, Salary).
+
+    Returns:
+    Job title -> aggregates, Sorted by job title.
+    """
+    groups: Dict[str, SalaryAggregate] = {}
+    skipped = 0
+    for chunk in chunks:
+        salaries_by_title: Dict[str, List[int]] = {}  # The salaries of this chunk grouped by job title, Then added to the aggregates in bulk
+        for row in chunk:
+            try:
+                salary = int(row[3])
+            except (IndexError, ValueError):  # A malformed row, Reported instead of stopping a multi-GB report
+                skipped += 1
+                continue
+            salaries = salaries_by_title.get(row[2])
+            if salaries is None:
+                salaries = salaries_by_title[row[2]] = []
+            salaries.append(salary)
+        for job_title, salaries in salaries_by_title.items():
+            group = groups.get(job_title)
+            if group is None:
+                group = groups[job_title] = SalaryAggregate()
+            group.add_many(salaries)
+    if skipped:
+        logging.warning(f"Skipped {skipped} malformed rows in the payroll report")
+    return dict(sorted(groups.items()))
+
+
+# Function to build the rows of the payroll report
+def report_rows(groups: Dict[str, SalaryAggregate], percentiles: List[float]) -> Iterator[List[Any]]:
+    """
+    Build the report rows: a header, one row per job title, and a total row.
+
+    Parameters:
+    groups: Job title -> aggregates.
+    percentiles: The percentiles to report (e.g. [50, 90, 99]).
+
+    Returns:
+    A generator of report rows.
+    """
+    yield ["Job Title", "Headcount", "Total Salary", "Mean Salary", "Min Salary", "Max Salary"] + [f"P{percent:g} Salary" for percent in percentiles]
+
+    def row(name: str, group: SalaryAggregate) -> List[Any]:
+        return ([name, group.headcount, group.total, round(group.total / group.headcount, 2), group.minimum, group.maximum] +
+                [round(group.digest.percentile(percent), 2) for percent in percentiles])
+
+    total = SalaryAggregate()
+    for job_title, group in groups.items():
+        yield row(job_title, group)
+        total.merge(group)  # O(compression) per job title, The total never looks at the rows again
+    if total.headcount:
+        yield row("All", total)
+
+
+# Function to write the payroll report
+def write_report(rows: Iterable[List[Any]], output_path: str) -> None:
+    """
+    Write the report rows to a CSV file, or to an XLSX file if the path ends with .xlsx.
+
+    Parameters:
+    rows: The report rows, Header row first.
+    output_path: Path to the report file.
+    """
+    if os.path.splitext(output_path)[1].lower() == '.xlsx':
+        if Workbook is None:
+            raise RuntimeError("XLSX reports need openpyxl (pip install openpyxl), Use a .csv output path instead")
+        workbook = Workbook(write_only = True)  # Rows are streamed to the file instead of being kept as cell objects
+        sheet = workbook.create_sheet("Payroll")
+        for row in rows:
+            sheet.append(row)
+        workbook.save(output_path)
+        return
+    with open(output_path, 'w', newline = '') as file:
+        csv.writer(file).writerows(rows)
+
+
+# Main function to generate the report
+def main() -> None:
+    """
+    Generate the payroll report of the employee database.
+    """
+    parser = argparse.ArgumentParser(description = "Generate per-job-title payroll aggregates of the employee database.")
+    parser.add_argument('--database', default = CONFIG['DATABASE_PATH'], help = "Path to the database file.")
+    parser.add_argument('--output', default = 'payroll_report.csv', help = "Path to the report file (.csv, or .xlsx with openpyxl).")
+    parser.add_argument('--percentiles', type = float, nargs = '+', default = [50, 90, 99], help = "Salary percentiles to report.")
+    parser.add_argument('--chunk-size', type = int, default = CONFIG['REPORT_CHUNK_SIZE'], help = "Rows read per chunk.")
+    args = parser.parse_args()
+
+    configure_logging()
+    start = time.perf_counter()
+    if CONFIG['STORAGE_BACKEND'] == 'sqlite':
+        chunks = read_sqlite_chunks(args.database, args.chunk_size)
+    else:
+        chunks = read_employee_chunks(args.database, args.chunk_size, args.database + CONFIG['JOURNAL_SUFFIX'] if CONFIG['STORAGE_BACKEND'] == 'journaled' else None)
+    groups = aggregate_payroll(chunks)
+    try:
+        write_report(report_rows(groups, args.percentiles), args.output)
+    except RuntimeError as e:
+        print(e)
+        return
+    elapsed = time.perf_counter() - start
+
+    headcount = sum(group.headcount for group in groups.values())
+    print(f"Payroll report of {headcount:,} employees in {len(groups)} job titles written to {args.output} in {elapsed:.2f} s ({headcount / elapsed if elapsed > 0 else 0:,.0f} rows/s)")
+    logging.info("Payroll report written", extra = {'output': args.output, 'employees': headcount, 'job_titles': len(groups), 'elapsed_s': round(elapsed, 3)})
+
+
+# Entry point for the report
+if __name__ == "__main__":
+    main()